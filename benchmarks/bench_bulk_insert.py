@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Benchmark how fast a scan's subdomains, URLs and screenshots are saved:
+the former row-by-row INSERT loop against the executemany batches of
+bulk_store, with and without dropping the indexes during the load. Each
+variant saves the same scan twice (the second save replaces the first) into
+an empty database and into one already holding other scans' rows; the
+best of --repeat runs is reported.
+
+Usage: python3 benchmarks/bench_bulk_insert.py [--subdomains N] [--urls N] [--screenshots N] [--existing N] [--repeat N]
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+from types import SimpleNamespace
+
+from common import ROOT_DIR, timed, report
+
+sys.path.insert(0, os.path.join(ROOT_DIR, 'server'))
+
+import app as server
+from bulk_store import DEFAULT_BATCH_SIZE, write_transaction
+
+SCAN_ID = 'bench-save'
+
+
+def make_scan(args):
+    """Subdomains, URL dicts and screenshot dicts shaped like a scanner's"""
+    subdomains = [f"h{i}.bench.test" for i in range(args.subdomains)]
+    urls = [
+        {'url': f"https://h{i % args.subdomains}.bench.test/p/{i}", 'status_code': (200, 301, 403, 404)[i % 4],
+         'title': f"Title {i % 997}", 'webserver': 'nginx', 'technologies': ['Nginx', 'PHP'][:1 + i % 2],
+         'content_length': i % 65536}
+        for i in range(args.urls)
+    ]
+    screenshots = [
+        {'url': f"https://h{i}.bench.test/", 'filename': f"h{i}.png", 'status_code': 200, 'title': 'Shot',
+         'headers': {'Server': 'nginx'}, 'roi_score': 50 + i % 200, 'features': {'login': i % 2}}
+        for i in range(args.screenshots)
+    ]
+    return subdomains, urls, screenshots
+
+
+def save_row_by_row(conn, subdomains, urls, screenshots):
+    """The save loop bulk_store replaced: one execute per row in a deferred transaction"""
+    cursor = conn.cursor()
+    cursor.execute('DELETE FROM subdomains WHERE scan_id = ?', (SCAN_ID,))
+    cursor.execute('DELETE FROM urls WHERE scan_id = ?', (SCAN_ID,))
+    cursor.execute('DELETE FROM screenshots WHERE scan_id = ?', (SCAN_ID,))
+    for subdomain in subdomains:
+        cursor.execute('INSERT INTO subdomains (scan_id, subdomain) VALUES (?, ?)', (SCAN_ID, subdomain))
+
+    by_url = {}
+    for url_data in urls:
+        url = url_data.get('url')
+        if not url:
+            continue
+        if url not in by_url:
+            by_url[url] = {'url': url, 'status_code': None, 'title': None, 'webserver': None,
+                           'technologies': None, 'content_length': None}
+        existing = by_url[url]
+        for key in ['status_code', 'title', 'webserver', 'technologies', 'content_length']:
+            value = url_data.get(key)
+            if value not in (None, '', []):
+                existing[key] = value
+    for url_data in by_url.values():
+        cursor.execute(
+            'INSERT INTO urls (scan_id, url, status_code, title, webserver, technologies, content_length) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (SCAN_ID, url_data['url'], url_data.get('status_code'), url_data.get('title'), url_data.get('webserver'),
+             server.serialize_technologies(url_data.get('technologies')), url_data.get('content_length'))
+        )
+    cursor.executemany(
+        'INSERT INTO screenshots (scan_id, url, filename, status_code, title, headers, roi_score, features) '
+        'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+        [(SCAN_ID,) + row for row in server.screenshot_rows(screenshots)]
+    )
+    conn.commit()
+
+
+def save_bulk(conn, subdomains, urls, screenshots, batch_size, drop_indexes_ratio):
+    """The current save (save_scan_rows): sorted executemany batches in one BEGIN IMMEDIATE transaction"""
+    with open(server.SETTINGS_FILE, 'w') as f:
+        json.dump({'db_batch_size': batch_size, 'db_drop_indexes_ratio': drop_indexes_ratio}, f)
+    scanner = SimpleNamespace(scan_id=SCAN_ID, subdomains=subdomains, urls=urls, screenshots=screenshots)
+    with write_transaction(conn):
+        server.save_scan_rows(conn, scanner)
+
+
+def fill_existing(conn, count):
+    """count URL rows (plus a tenth as many subdomains) spread over 50 other scans"""
+    scan_ids = [f"other-{i}" for i in range(50)]
+    conn.executemany('INSERT INTO scans (id, domain, status) VALUES (?, ?, ?)',
+                     [(scan_id, f"{scan_id}.test", 'completed') for scan_id in scan_ids])
+    per_scan = count // len(scan_ids)
+    for scan_id in scan_ids:
+        conn.executemany(
+            'INSERT INTO urls (scan_id, url, status_code, title, webserver, technologies, content_length) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            ((scan_id, f"https://h{i % 5000}.{scan_id}.test/p/{i}", 200, 'Title', 'nginx', json.dumps(['Nginx']), i)
+             for i in range(per_scan))
+        )
+        conn.executemany('INSERT INTO subdomains (scan_id, subdomain) VALUES (?, ?)',
+                         ((scan_id, f"h{i}.{scan_id}.test") for i in range(per_scan // 10)))
+    conn.commit()
+
+
+def run(label, existing, scan, args):
+    work_dir = tempfile.mkdtemp(prefix='domscout_bench_bulk_')
+    server.DB_PATH = os.path.join(work_dir, 'domscout.db')
+    server.SETTINGS_FILE = os.path.join(work_dir, 'settings.json')
+    rows = sum(len(items) for items in scan)
+    try:
+        server.init_db()
+        conn = server.get_db_connection()
+        conn.execute('INSERT INTO scans (id, domain, status) VALUES (?, ?, ?)', (SCAN_ID, 'bench.test', 'running'))
+        conn.commit()
+        if existing:
+            fill_existing(conn, existing)
+        print(f"  {label}:")
+        variants = [
+            ('row by row', lambda: save_row_by_row(conn, *scan)),
+            (f"executemany x{args.batch_size}", lambda: save_bulk(conn, *scan, args.batch_size, 0)),
+            ('executemany, indexes rebuilt', lambda: save_bulk(conn, *scan, args.batch_size, 0.001)),
+        ]
+        for name, save in variants:
+            best = {'new scan': float('inf'), 'saved again': float('inf')}
+            for _ in range(args.repeat):
+                for table in ('subdomains', 'urls', 'screenshots'):
+                    conn.execute(f'DELETE FROM {table} WHERE scan_id = ?', (SCAN_ID,))
+                conn.commit()
+                for attempt in best:
+                    _, elapsed = timed(save)
+                    best[attempt] = min(best[attempt], elapsed)
+            for attempt, elapsed in best.items():
+                report(f"{name}, {attempt}", elapsed, rows)
+        conn.close()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--subdomains', type=int, default=100_000)
+    parser.add_argument('--urls', type=int, default=300_000)
+    parser.add_argument('--screenshots', type=int, default=10_000)
+    parser.add_argument('--existing', type=int, default=2_000_000, help='URL rows of other scans already stored')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    scan = make_scan(args)
+    print(f"Saving {args.subdomains:,} subdomains, {args.urls:,} URLs and {args.screenshots:,} screenshots")
+    run('empty database', 0, scan, args)
+    run(f"{args.existing:,} URL rows of other scans", args.existing, scan, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark the cross-scan DNS cache: resolve a host list against local stub
+DNS servers, then rescan it (every host fresh in the cache) and rescan a
+list where a share of the hosts is new, checking live_subs.txt each time.
+
+Usage: python3 benchmarks/bench_dns_cache.py [--hosts N] [--new-share F]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+
+from common import make_scanner, timed, report
+from stub_dns import StubDNSServer, expected_records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hosts', type=int, default=20000)
+    parser.add_argument('--new-share', type=float, default=0.1, help='share of new hosts in the last rescan')
+    parser.add_argument('--latency-ms', type=float, default=20.0)
+    args = parser.parse_args()
+
+    servers = [StubDNSServer(latency=args.latency_ms / 1000, seed=i).start() for i in range(4)]
+    work_dir = tempfile.mkdtemp(prefix='domscout_bench_dns_cache_')
+    try:
+        resolvers_file = os.path.join(work_dir, 'resolvers.txt')
+        with open(resolvers_file, 'w') as f:
+            for server in servers:
+                f.write(f"127.0.0.1:{server.port}\n")
+
+        hosts = [f"{'live' if i % 3 == 0 else 'dead'}{i}.bench.test" for i in range(args.hosts)]
+        new_count = int(args.hosts * args.new_share)
+        rescan_hosts = hosts[new_count:] + [f"{'live' if i % 3 == 0 else 'dead'}{i}.new.bench.test"
+                                            for i in range(new_count)]
+        options = {
+            'dns_engine': 'builtin',
+            'dns_timeout': 0.5,
+            'dns_cache_file': os.path.join(work_dir, 'dns_cache.db'),
+            'resolver_stats_file': os.path.join(work_dir, 'resolver_stats.json'),
+        }
+        print(f"DNS cache: {args.hosts:,} hosts, {args.latency_ms:g} ms resolver latency")
+
+        for label, host_list in [('first scan (cold cache)', hosts),
+                                 ('rescan (warm cache)', hosts),
+                                 (f"rescan ({args.new_share:.0%} new hosts)", rescan_hosts)]:
+            scanner = make_scanner(options=options)
+            scanner.resolvers_file = resolvers_file
+            with open(os.path.join(scanner.scan_dir, 'subdomains.txt'), 'w') as f:
+                f.write('\n'.join(host_list) + '\n')
+            queries_before = sum(server.queries for server in servers)
+            _, elapsed = timed(scanner.run_dnsx)
+            queries = sum(server.queries for server in servers) - queries_before
+
+            with open(os.path.join(scanner.scan_dir, 'live_subs.txt')) as f:
+                live = {line.strip() for line in f if line.strip()}
+            expected = {host for host in host_list if expected_records(host)}
+            assert live == expected, f"{label}: {len(live)} live hosts, expected {len(expected)}"
+
+            stats = scanner.cache_stats['dns']
+            report(label, elapsed, len(host_list))
+            print(f"    {stats['hit_rate']:.0%} hit rate, {queries:,} DNS queries")
+            scanner.cleanup_temp_artifacts()
+    finally:
+        for server in servers:
+            server.stop()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark DNS resolution against local stub DNS servers: the built-in asyncio
+engine (dns_engine='builtin') and, when it is installed, the dnsx path.
+
+Reports queries per second and checks the built-in answers are correct.
+
+Usage: python3 benchmarks/bench_dns_engine.py [--hosts N] [--resolvers N] [--latency-ms N]
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import tempfile
+
+from common import make_scanner, timed, report
+from stub_dns import StubDNSServer, expected_records
+
+
+def write_hosts(path, count):
+    """Half live (some behind CNAMEs), half NXDOMAIN"""
+    hosts = []
+    for i in range(count):
+        kind = i % 4
+        prefix = 'live' if kind == 0 else 'livecdn' if kind == 1 else 'dead'
+        hosts.append(f"{prefix}{i}.bench.test")
+    with open(path, 'w') as f:
+        f.write('\n'.join(hosts) + '\n')
+    return hosts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hosts', type=int, default=20000)
+    parser.add_argument('--resolvers', type=int, default=4)
+    parser.add_argument('--latency-ms', type=float, default=20.0, help='simulated resolver round-trip time')
+    parser.add_argument('--drop-rate', type=float, default=0.01, help='fraction of queries never answered')
+    args = parser.parse_args()
+
+    servers = [
+        StubDNSServer(latency=args.latency_ms / 1000, drop_rate=args.drop_rate, seed=i).start()
+        for i in range(args.resolvers)
+    ]
+    work_dir = tempfile.mkdtemp(prefix='domscout_bench_dns_')
+    try:
+        resolvers_file = os.path.join(work_dir, 'resolvers.txt')
+        with open(resolvers_file, 'w') as f:
+            for server in servers:
+                f.write(f"127.0.0.1:{server.port}\n")
+
+        print(f"DNS resolution: {args.hosts:,} hosts, {args.resolvers} stub resolvers, "
+              f"{args.latency_ms:g} ms latency, {args.drop_rate:.0%} dropped")
+
+        scanner = make_scanner(options={'dns_engine': 'builtin', 'dns_timeout': 0.5})
+        scanner.resolvers_file = resolvers_file
+        subdomains_file = os.path.join(scanner.scan_dir, 'subdomains.txt')
+        live_subs_file = os.path.join(scanner.scan_dir, 'live_subs.txt')
+        hosts = write_hosts(subdomains_file, args.hosts)
+
+        queries_before = sum(server.queries for server in servers)
+        _, builtin_time = timed(scanner.run_dnsx)
+        queries = sum(server.queries for server in servers) - queries_before
+
+        with open(live_subs_file) as f:
+            live = {line.strip() for line in f if line.strip()}
+        expected_live = {host for host in hosts if expected_records(host)}
+        assert live == expected_live, f"built-in engine found {len(live)} live hosts, expected {len(expected_live)}"
+
+        report("built-in asyncio engine (hosts)", builtin_time, args.hosts)
+        report("built-in asyncio engine (queries)", builtin_time, queries)
+
+        if shutil.which('dnsx'):
+            dnsx_out = os.path.join(work_dir, 'dnsx_live.txt')
+            queries_before = sum(server.queries for server in servers)
+            _, dnsx_time = timed(
+                subprocess.run,
+                ['dnsx', '-silent', '-l', subdomains_file, '-r', resolvers_file, '-o', dnsx_out],
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+            dnsx_queries = sum(server.queries for server in servers) - queries_before
+            report("dnsx (hosts)", dnsx_time, args.hosts)
+            report("dnsx (queries)", dnsx_time, dnsx_queries)
+        else:
+            print("  dnsx not installed, skipping the dnsx comparison")
+
+        scanner.cleanup_temp_artifacts()
+    finally:
+        for server in servers:
+            server.stop()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
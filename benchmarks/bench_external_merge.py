@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark merge2 and merge_subdomains in memory against the disk-spilling
+external mode (merge_memory_mb), comparing output files and peak RSS.
+
+Each mode runs in its own child process so its peak RSS is measured alone.
+
+Usage: python3 benchmarks/bench_external_merge.py [--urls N] [--budget-mb N]
+"""
+import argparse
+import filecmp
+import os
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from common import make_scanner, timed, report
+
+
+def write_inputs(scan_dir, urls, seed=1):
+    """Write httpx/gau/gospider URL lists and enumerator outputs with heavy duplication"""
+    rng = random.Random(seed)
+    hosts = max(10, urls // 200)
+
+    def random_url():
+        host = f"h{rng.randrange(hosts)}.example.com"
+        scheme = rng.choice(['https', 'https', 'http'])
+        port = rng.choice(['', '', '', ':443', ':80', ':8080'])
+        path = '/'.join(f"p{rng.randrange(50)}" for _ in range(rng.randrange(0, 4)))
+        trailing = rng.choice(['', '', '/'])
+        query = rng.choice(['', '', f"?id={rng.randrange(1000)}", '?a=1&b=2'])
+        ext = rng.choice(['', '', '', '.png', '.js'])
+        return f"{scheme}://{host}{port}/{path}{ext}{trailing}{query}"
+
+    with open(os.path.join(scan_dir, 'alive_webservices.txt'), 'w') as f:
+        for i in range(hosts):
+            f.write(f"https://h{i}.example.com\n")
+    with open(os.path.join(scan_dir, 'gau_urls.txt'), 'w') as f:
+        for _ in range(urls * 3 // 4):
+            f.write(random_url() + '\n')
+    with open(os.path.join(scan_dir, 'gospider_urls.txt'), 'w') as f:
+        for _ in range(urls // 4):
+            f.write(random_url() + '\n')
+    for name in ['subfinder-rescursive.txt', 'findomain.txt', 'assetfinder.txt', 'sublist3r.txt']:
+        with open(os.path.join(scan_dir, name), 'w') as f:
+            for _ in range(urls // 4):
+                f.write(f"s{rng.randrange(urls // 3 or 1)}.example.com\n")
+
+
+def run_mode(input_dir, output_dir, budget_mb):
+    """Child process: run both merges on a copy of the inputs"""
+    scanner = make_scanner(options={'merge_memory_mb': budget_mb})
+    for name in os.listdir(input_dir):
+        shutil.copy(os.path.join(input_dir, name), scanner.scan_dir)
+
+    _, subdomains_time = timed(scanner.merge_subdomains)
+    scanner.subdomains = []  # only the file is compared
+    count, merge2_time = timed(scanner._run_merge2)
+
+    for name in ['subdomains.txt', 'all_urls_merged.txt']:
+        shutil.copy(os.path.join(scanner.scan_dir, name), output_dir)
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    scanner.cleanup_temp_artifacts()
+    print(f"{subdomains_time} {merge2_time} {count} {rss_mb}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--urls', type=int, default=1000000)
+    parser.add_argument('--budget-mb', type=float, default=32)
+    parser.add_argument('--child', nargs=3, metavar=('INPUT', 'OUTPUT', 'BUDGET'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_mode(args.child[0], args.child[1], float(args.child[2]))
+        return
+
+    work_dir = tempfile.mkdtemp(prefix='domscout_bench_merge_')
+    try:
+        input_dir = os.path.join(work_dir, 'input')
+        os.makedirs(input_dir)
+        write_inputs(input_dir, args.urls)
+        print(f"External merge: {args.urls:,} URLs, budget {args.budget_mb:g} MB")
+
+        results = {}
+        for label, budget in [('in-memory', 0), ('external', args.budget_mb)]:
+            output_dir = os.path.join(work_dir, label)
+            os.makedirs(output_dir)
+            child = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--child', input_dir, output_dir, str(budget)],
+                check=True, capture_output=True, text=True
+            )
+            subdomains_time, merge2_time, count, rss_mb = child.stdout.split()[-4:]
+            results[label] = output_dir
+            report(f"{label} merge_subdomains", float(subdomains_time))
+            report(f"{label} merge2", float(merge2_time), args.urls)
+            print(f"  {label} peak RSS: {float(rss_mb):,.0f} MB, {int(count):,} merged URLs")
+
+        for name in ['subdomains.txt', 'all_urls_merged.txt']:
+            assert filecmp.cmp(os.path.join(results['in-memory'], name),
+                               os.path.join(results['external'], name), shallow=False), \
+                f"{name} differs between in-memory and external merge"
+        print("  outputs identical")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
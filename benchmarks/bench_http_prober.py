@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark URL enrichment against a local multi-vhost stub server: the
+built-in asyncio prober (http_engine='builtin') with keep-alive pooling,
+the same prober with pooling disabled, and httpx-toolkit when installed.
+
+Vhost names are mapped to 127.0.0.1 through dns_records.json, the file the
+built-in DNS engine writes, so no real DNS is needed. Reports URLs per
+second and connections opened, and checks every record against the stub.
+
+Usage: python3 benchmarks/bench_http_prober.py [--hosts N] [--paths N] [--latency-ms N]
+"""
+import argparse
+import html
+import json
+import os
+import shutil
+import subprocess
+
+from common import make_scanner, timed, report
+from stub_http import StubHTTPServer, expected_page
+
+
+def write_inputs(scan_dir, hosts, paths, ports):
+    """Merged URL list (several paths per vhost, some 404s) and matching DNS records"""
+    with open(os.path.join(scan_dir, 'dns_records.json'), 'w') as f:
+        for i in range(hosts):
+            f.write(json.dumps({'host': f"vh{i}.bench.test", 'a': ['127.0.0.1'], 'aaaa': [], 'cname': []}) + '\n')
+    urls = []
+    for i in range(hosts):
+        scheme, port = ports[i % len(ports)]
+        for j in range(paths):
+            path = f"/missing/{j}" if j % 5 == 4 else f"/page/{j}"
+            urls.append(f"{scheme}://vh{i}.bench.test:{port}{path}")
+    with open(os.path.join(scan_dir, 'all_urls_merged.txt'), 'w') as f:
+        f.write('\n'.join(urls) + '\n')
+    return urls
+
+
+def check_records(scanner, urls):
+    by_url = {item['url']: item for item in scanner.urls}
+    assert len(by_url) == len(urls), f"{len(by_url)} records for {len(urls)} URLs"
+    for url in urls:
+        host = url.split('://', 1)[1].split(':', 1)[0]
+        path = '/' + url.split('/', 3)[3]
+        status, title, server, marker = expected_page(host, path)
+        item = by_url[url]
+        assert item['status_code'] == status, (url, item)
+        assert item['title'] == html.unescape(title), (url, item)
+        assert item['webserver'] == server, (url, item)
+        if marker:
+            assert marker in item['technologies'], (url, item)
+
+
+def run_builtin(scan_dir, urls, servers, options):
+    # rate_limit 0: measure the prober, not the pacing
+    scanner = make_scanner(options=dict(options, http_engine='builtin'), rate_limit=0)
+    for name in ['all_urls_merged.txt', 'dns_records.json']:
+        shutil.copy(os.path.join(scan_dir, name), scanner.scan_dir)
+    connections_before = sum(server.connections for server in servers)
+    _, elapsed = timed(scanner.enrich_merged_urls_metadata)
+    connections = sum(server.connections for server in servers) - connections_before
+    check_records(scanner, urls)
+    scanner.cleanup_temp_artifacts()
+    return elapsed, connections
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hosts', type=int, default=200)
+    parser.add_argument('--paths', type=int, default=20, help='URLs per vhost')
+    parser.add_argument('--latency-ms', type=float, default=5.0, help='simulated server think time')
+    parser.add_argument('--per-host', type=int, default=4, help='http_concurrency_per_host')
+    args = parser.parse_args()
+
+    servers = [StubHTTPServer(latency=args.latency_ms / 1000).start()]
+    if StubHTTPServer.tls_available():
+        servers.append(StubHTTPServer(latency=args.latency_ms / 1000, tls=True).start())
+    ports = [('http', servers[0].port)] + [('https', server.port) for server in servers[1:]]
+
+    try:
+        seed = make_scanner()
+        urls = write_inputs(seed.scan_dir, args.hosts, args.paths, ports)
+        print(f"HTTP probing: {len(urls):,} URLs on {args.hosts} vhosts "
+              f"({', '.join(scheme for scheme, _ in ports)}), {args.latency_ms:g} ms server latency")
+
+        options = {'http_concurrency': 200, 'http_concurrency_per_host': args.per_host, 'http_timeout': 10}
+        for label, extra in [('built-in prober, keep-alive pool', {}),
+                             ('built-in prober, no pooling', {'http_pool_size': 0})]:
+            elapsed, connections = run_builtin(seed.scan_dir, urls, servers, dict(options, **extra))
+            report(label, elapsed, len(urls))
+            print(f"    {connections:,} connections opened")
+
+        if shutil.which('httpx-toolkit'):
+            # httpx-toolkit cannot be pointed at local vhosts without DNS, so it
+            # probes the same paths by address; its records are not checked
+            by_address = os.path.join(seed.scan_dir, 'urls_by_address.txt')
+            with open(by_address, 'w') as f:
+                for url in urls:
+                    scheme, rest = url.split('://', 1)
+                    f.write(f"{scheme}://127.0.0.1:{rest.split(':', 1)[1]}\n")
+            connections_before = sum(server.connections for server in servers)
+            _, elapsed = timed(
+                subprocess.run,
+                f"cat {by_address} | httpx-toolkit -silent -json -td -title -server -cl -rl 100000 -o /dev/null",
+                shell=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+            connections = sum(server.connections for server in servers) - connections_before
+            report("httpx-toolkit", elapsed, len(urls))
+            print(f"    {connections:,} connections opened")
+        else:
+            print("  httpx-toolkit not installed, skipping the httpx-toolkit comparison")
+
+        seed.cleanup_temp_artifacts()
+    finally:
+        for server in servers:
+            server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark reading httpx_output.json: the historical three json.loads passes
+(alive_webservices.txt, self.urls, gowitness httpx_data_list) against the
+shared records parsed once by httpx_records(), checking self.urls and the
+ROI scores come out identical. Uses orjson when it is installed. The URL
+match index gowitness builds on top costs the same either way and is
+reported separately.
+
+Usage: python3 benchmarks/bench_httpx_index.py [--records N]
+"""
+import argparse
+import json
+import os
+import random
+
+from common import make_scanner, timed, report
+from roi_scoring import DEFAULT_SCORER
+import scanner as scanner_module
+
+
+def write_httpx_output(path, records, seed=1):
+    """httpx -json style lines with the bulky fields real runs produce"""
+    rng = random.Random(seed)
+    with open(path, 'w') as f:
+        for i in range(records):
+            headers = {f"x-header-{j}": 'v' * rng.randrange(20, 80) for j in range(rng.randrange(8, 20))}
+            if i % 3:
+                headers['content-security-policy'] = "default-src 'self'"
+            f.write(json.dumps({
+                'timestamp': '2026-01-01T00:00:00Z', 'url': f"https://host{i}.example.com",
+                'input': f"host{i}.example.com", 'status-code': rng.choice([200, 301, 403, 404, 500]),
+                'title': f"Host {i}", 'webserver': rng.choice(['nginx', 'Apache', '']),
+                'tech': ['Nginx', 'PHP'][:i % 3], 'content-length': rng.randrange(0, 200000),
+                'headers': headers, 'hash': {'body_sha256': 'f' * 64, 'header_sha256': 'e' * 64},
+                'a': [f"10.0.{i % 256}.{i % 200}"], 'tls': {'subject_cn': f"host{i}.example.com", 'issuer': 'R3'},
+            }) + '\n')
+
+
+def legacy_passes(scanner, httpx_json, alive_file):
+    """The three separate parses the scanner used to do"""
+    with open(alive_file, 'w') as out:
+        with open(httpx_json) as f:
+            for line in f:
+                data = json.loads(line)
+                if 'url' in data:
+                    out.write(data['url'] + '\n')
+    urls = []
+    with open(httpx_json) as f:
+        for line in f:
+            data = json.loads(line)
+            if 'url' in data:
+                urls.append(scanner_module.DomScoutScanner._enriched_url_entry(data))
+    httpx_data_list = []
+    with open(httpx_json) as f:
+        for line in f:
+            data = json.loads(line)
+            if 'url' in data:
+                httpx_data_list.append(data)
+    return urls, httpx_data_list
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--records', type=int, default=100000)
+    args = parser.parse_args()
+
+    scanner = make_scanner()
+    httpx_json = os.path.join(scanner.scan_dir, 'httpx_output.json')
+    alive_file = os.path.join(scanner.scan_dir, 'alive_webservices.txt')
+    write_httpx_output(httpx_json, args.records)
+    size_mb = os.path.getsize(httpx_json) / 1e6
+    decoder = 'orjson' if scanner_module.json_loads is not json.loads else 'json'
+    print(f"httpx output: {args.records:,} records, {size_mb:,.0f} MB ({decoder} decoder)")
+
+    (legacy_urls, legacy_records), legacy_time = timed(legacy_passes, scanner, httpx_json, alive_file)
+
+    def shared_records():
+        scanner._load_httpx_results()
+        return scanner.httpx_records(httpx_json)
+    records, shared_time = timed(shared_records)
+    _, index_time = timed(scanner.httpx_match_index, httpx_json)
+
+    assert scanner.urls == legacy_urls, 'self.urls differs from the legacy parse'
+    assert DEFAULT_SCORER.score_many((r, '') for r in records) == \
+        DEFAULT_SCORER.score_many((r, '') for r in legacy_records), 'ROI scores differ'
+
+    report("three json.loads passes", legacy_time, args.records)
+    report("shared records (one parse)", shared_time, args.records)
+    print(f"  speedup: {legacy_time / shared_time:.1f}x (self.urls and ROI scores identical)")
+    report("URL match index (either way)", index_time, args.records)
+
+    scanner.cleanup_temp_artifacts()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark the cross-scan HTTP probe cache: enrich a URL list against a
+local multi-vhost stub server with the built-in prober, then rescan it
+(every URL fresh in the cache) and rescan a list where a share of the URLs
+is new, checking every record in scanner.urls each time.
+
+Usage: python3 benchmarks/bench_probe_cache.py [--hosts N] [--paths N] [--new-share F]
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+
+from bench_http_prober import check_records
+from common import make_scanner, timed, report
+from stub_http import StubHTTPServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hosts', type=int, default=100)
+    parser.add_argument('--paths', type=int, default=20, help='URLs per vhost')
+    parser.add_argument('--new-share', type=float, default=0.1, help='share of new URLs in the last rescan')
+    parser.add_argument('--latency-ms', type=float, default=20.0, help='simulated server think time')
+    args = parser.parse_args()
+
+    server = StubHTTPServer(latency=args.latency_ms / 1000).start()
+    work_dir = tempfile.mkdtemp(prefix='domscout_bench_probe_cache_')
+    try:
+        urls = [f"http://vh{i}.bench.test:{server.port}/page/{j}"
+                for i in range(args.hosts) for j in range(args.paths)]
+        new_count = int(len(urls) * args.new_share)
+        rescan_urls = urls[new_count:] + [f"http://vh{i % args.hosts}.bench.test:{server.port}/new/{i}"
+                                         for i in range(new_count)]
+        options = {
+            'http_engine': 'builtin',
+            'http_concurrency': 200,
+            'http_cache_file': os.path.join(work_dir, 'http_cache.db'),
+        }
+        print(f"HTTP probe cache: {len(urls):,} URLs on {args.hosts} vhosts, {args.latency_ms:g} ms server latency")
+
+        for label, url_list in [('first scan (cold cache)', urls),
+                                ('rescan (warm cache)', urls),
+                                (f"rescan ({args.new_share:.0%} new URLs)", rescan_urls)]:
+            scanner = make_scanner(options=options, rate_limit=0)
+            with open(os.path.join(scanner.scan_dir, 'dns_records.json'), 'w') as f:
+                for i in range(args.hosts):
+                    f.write(json.dumps({'host': f"vh{i}.bench.test", 'a': ['127.0.0.1']}) + '\n')
+            with open(os.path.join(scanner.scan_dir, 'all_urls_merged.txt'), 'w') as f:
+                f.write('\n'.join(url_list) + '\n')
+            requests_before = server.requests
+            _, elapsed = timed(scanner.enrich_merged_urls_metadata)
+            requests = server.requests - requests_before
+
+            check_records(scanner, url_list)
+            stats = scanner.cache_stats['enrich']
+            report(label, elapsed, len(url_list))
+            print(f"    {stats['hit_rate']:.0%} hit rate, {requests:,} HTTP requests")
+            scanner.cleanup_temp_artifacts()
+    finally:
+        server.stop()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
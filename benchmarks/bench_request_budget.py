@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark the server-wide request budget: several scans enrich URL lists
+against a local stub server at the same time with the built-in prober,
+each with its own rate_limit, first on their own and then sharing one
+RequestBudget. Scans start a little apart and have different list sizes,
+so shares are rebalanced as scans join and finish. Reports each scan's
+URLs, the average aggregate rate and the busiest second against the
+global cap.
+
+Usage: python3 benchmarks/bench_request_budget.py [--scans N] [--rate-limit N] [--global-rate N] [--urls N]
+"""
+import argparse
+import json
+import os
+import threading
+import time
+
+from common import make_scanner, report
+from rate_control import RequestBudget
+from stub_http import StubHTTPServer
+
+
+def run_scans(server, args, budget, label):
+    """Enrich one URL list per scan concurrently; returns (URLs per scan, elapsed, busiest second)"""
+    scanners = []
+    for n in range(args.scans):
+        scanner = make_scanner(
+            options={'http_engine': 'builtin', 'http_concurrency': 200, 'http_concurrency_per_host': 64,
+                     'rate_adaptive': False},
+            rate_limit=args.rate_limit, scan_id=f"bench-{label}-{n}", request_budget=budget
+        )
+        with open(os.path.join(scanner.scan_dir, 'dns_records.json'), 'w') as f:
+            f.write(json.dumps({'host': 'budget.bench.test', 'a': ['127.0.0.1']}) + '\n')
+        # Later scans get longer lists, so scans finish one after another
+        urls = [f"http://budget.bench.test:{server.port}/s{n}/{i}" for i in range(args.urls * (n + 1) // 2)]
+        with open(os.path.join(scanner.scan_dir, 'all_urls_merged.txt'), 'w') as f:
+            f.write('\n'.join(urls) + '\n')
+        scanners.append(scanner)
+
+    def run(scanner, delay):
+        time.sleep(delay)
+        scanner._run_graph_node('enrich')
+
+    threads = [threading.Thread(target=run, args=(scanner, n * 0.5)) for n, scanner in enumerate(scanners)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+
+    # Requests the stub saw in each sliding one-second window
+    samples = []
+    while any(thread.is_alive() for thread in threads):
+        samples.append((time.perf_counter(), server.requests))
+        time.sleep(0.1)
+    elapsed = time.perf_counter() - start
+    busiest = max((count - earlier_count for (at, count) in samples
+                   for (earlier_at, earlier_count) in samples if 0.95 <= at - earlier_at <= 1.05), default=0)
+    counts = [len(scanner.urls) for scanner in scanners]
+    for scanner in scanners:
+        scanner.cleanup_temp_artifacts()
+    return counts, elapsed, busiest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scans', type=int, default=5)
+    parser.add_argument('--rate-limit', type=int, default=150, help='rate_limit of each scan')
+    parser.add_argument('--global-rate', type=int, default=300, help='global_rate_limit shared by all scans')
+    parser.add_argument('--urls', type=int, default=400, help='URLs of a typical scan')
+    args = parser.parse_args()
+
+    server = StubHTTPServer().start()
+    try:
+        print(f"Request budget: {args.scans} concurrent scans at {args.rate_limit} req/s each, "
+              f"global cap {args.global_rate} req/s")
+        for n, (label, budget) in enumerate([('per-scan rate limits only', None),
+                                             ('shared request budget', RequestBudget(args.global_rate))]):
+            requests_before = server.requests
+            counts, elapsed, busiest = run_scans(server, args, budget, n)
+            requests = server.requests - requests_before
+            report(label, elapsed, requests)
+            print(f"    busiest second: {busiest:,} requests; per scan: {', '.join(f'{count:,}' for count in counts)} URLs")
+    finally:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
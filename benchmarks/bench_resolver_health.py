@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark resolver selection against a local pool of stub DNS servers where
+some resolvers are dead, slow, flaky (SERVFAIL) or hijack NXDOMAIN answers.
+
+Resolves the same host list with the whole pool (resolver_health off) and
+with the health-checked, weighted subset, reporting the time taken and
+whether the live host list is correct.
+
+Usage: python3 benchmarks/bench_resolver_health.py [--hosts N]
+"""
+import argparse
+import os
+import shutil
+import socket
+import tempfile
+
+from common import make_scanner, timed, report
+from stub_dns import StubDNSServer, expected_records
+
+
+def closed_udp_port():
+    """A local UDP port nothing listens on (a dead resolver)"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hosts', type=int, default=5000)
+    args = parser.parse_args()
+
+    pool = {
+        'fast-1': StubDNSServer(latency=0.005, seed=1),
+        'fast-2': StubDNSServer(latency=0.01, seed=2),
+        'slow': StubDNSServer(latency=0.4, seed=3),
+        'flaky': StubDNSServer(latency=0.01, servfail_rate=0.6, seed=4),
+        'hijacking': StubDNSServer(latency=0.005, hijack=True, seed=5),
+    }
+    for server in pool.values():
+        server.start()
+    work_dir = tempfile.mkdtemp(prefix='domscout_bench_resolvers_')
+    try:
+        resolvers_file = os.path.join(work_dir, 'resolvers.txt')
+        with open(resolvers_file, 'w') as f:
+            for server in pool.values():
+                f.write(f"127.0.0.1:{server.port}\n")
+            f.write(f"127.0.0.1:{closed_udp_port()}\n")
+
+        hosts = [f"{'live' if i % 2 else 'dead'}{i}.bench.test" for i in range(args.hosts)]
+        expected = {host for host in hosts if expected_records(host)}
+        print(f"Resolver selection: {args.hosts:,} hosts, {len(pool) + 1} resolvers "
+              f"({', '.join(pool)}, dead)")
+
+        base_options = {
+            'dns_engine': 'builtin',
+            'dns_timeout': 0.5,
+            'resolver_stats_file': os.path.join(work_dir, 'resolver_stats.json'),
+            'resolver_canaries': ['live1.bench.test', 'live3.bench.test'],
+            'resolver_max_latency_ms': 200,
+        }
+        for label, health in [('whole pool', False), ('health-checked subset', True)]:
+            scanner = make_scanner(options=dict(base_options, resolver_health=health))
+            scanner.resolvers_file = resolvers_file
+            with open(os.path.join(scanner.scan_dir, 'subdomains.txt'), 'w') as f:
+                f.write('\n'.join(hosts) + '\n')
+            _, elapsed = timed(scanner.run_dnsx)
+            with open(os.path.join(scanner.scan_dir, 'live_subs.txt')) as f:
+                live = {line.strip() for line in f if line.strip()}
+            wrong = len(live ^ expected)
+            report(label, elapsed, args.hosts)
+            print(f"    {len(live):,} live hosts, {wrong:,} wrong")
+            if health:
+                assert wrong == 0, f"{wrong} wrong live hosts with the healthy subset"
+                names = {f"127.0.0.1:{server.port}": name for name, server in pool.items()}
+                for entry in scanner.resolver_pool().report():
+                    print(f"    {names.get(entry['resolver'], 'dead'):<10} {entry['health']:<8} "
+                          f"latency {entry['latency_ms'] or 0:>6.1f} ms, errors {entry['error_rate']:.0%}")
+            scanner.cleanup_temp_artifacts()
+    finally:
+        for server in pool.values():
+            server.stop()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Benchmark the results database at scale: fill a throwaway database at
+schema 1 (no scan_id indexes, rollback journal) with millions of URL rows
+spread over many scans, time the results endpoints, migrate it to the
+current schema in WAL mode and time them again. The reader latency while
+another scan saves a large batch of URLs is measured in both modes.
+
+Usage: python3 benchmarks/bench_results_db.py [--rows N] [--scans N] [--scan-rows N] [--repeat N]
+"""
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from common import ROOT_DIR, timed, report
+
+sys.path.insert(0, os.path.join(ROOT_DIR, 'server'))
+
+import app as server
+from results_view import encode_cursor
+
+SCAN_ID = 'bench-target'
+STATUS_CODES = [200, 200, 200, 301, 302, 403, 404, 500]
+
+
+def url_rows(scan_id, count, seed):
+    rng = random.Random(seed)
+    for i in range(count):
+        host = f"h{i % 5000}.{scan_id}.test"
+        yield (scan_id, f"https://{host}/p/{i}", rng.choice(STATUS_CODES), f"Title {i % 997}", 'nginx',
+               '["Nginx"]' if i % 3 else '["PHP", "Nginx"]', i % 65536)
+
+
+def fill(conn, args):
+    """Insert the scans, then their URLs, subdomains and screenshots"""
+    scan_ids = [f"bench-{i}" for i in range(args.scans - 1)] + [SCAN_ID]
+    conn.executemany('INSERT INTO scans (id, domain, status) VALUES (?, ?, ?)',
+                     [(scan_id, f"{scan_id}.test", 'completed') for scan_id in scan_ids])
+    other_rows = max(0, args.rows - args.scan_rows) // max(1, args.scans - 1)
+    insert = ('INSERT INTO urls (scan_id, url, status_code, title, webserver, technologies, content_length) '
+              'VALUES (?, ?, ?, ?, ?, ?, ?)')
+    for seed, scan_id in enumerate(scan_ids):
+        count = args.scan_rows if scan_id == SCAN_ID else other_rows
+        conn.executemany(insert, url_rows(scan_id, count, seed))
+        conn.executemany('INSERT INTO subdomains (scan_id, subdomain) VALUES (?, ?)',
+                         ((scan_id, f"h{i}.{scan_id}.test") for i in range(count // 10)))
+        conn.executemany(
+            'INSERT INTO screenshots (scan_id, url, filename, status_code, title, roi_score) VALUES (?, ?, ?, ?, ?, ?)',
+            ((scan_id, f"https://h{i % 5000}.{scan_id}.test/p/{i}", f"{scan_id}-{i}.png", 200, 'Shot', 50 + i % 200)
+             for i in range(0, count, 100))
+        )
+    server.rebuild_scan_results(conn, SCAN_ID)
+    conn.commit()
+
+
+def deep_cursor(offset):
+    """Cursor of the results page starting at offset (default sort)"""
+    conn = server.get_db_connection()
+    row = conn.execute(
+        'SELECT roi_order, status_rank, id FROM scan_results WHERE scan_id = ? '
+        'ORDER BY roi_order, status_rank, id LIMIT 1 OFFSET ?',
+        (SCAN_ID, offset)
+    ).fetchone()
+    conn.close()
+    return encode_cursor(list(row)) if row else None
+
+
+def latency(client, path, repeat):
+    """(median, p95) milliseconds of GET path"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get(path)
+        samples.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200, response.get_json()
+    samples.sort()
+    return statistics.median(samples), samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+
+def measure(label, args):
+    client = server.app.test_client()
+    deep = deep_cursor(args.scan_rows // 2)
+    endpoints = [
+        ('scan info (counts)', f"/api/scan/{SCAN_ID}"),
+        ('recent scans', '/api/scans'),
+        ('results, first page', f"/api/scan/{SCAN_ID}/results?limit=50"),
+        ('results, middle page', f"/api/scan/{SCAN_ID}/results?limit=50&cursor={deep}"),
+        ('results, 4xx on one host', f"/api/scan/{SCAN_ID}/results?limit=50&status=4xx&host=h7.{SCAN_ID}.test"),
+        ('urls, 2xx page', f"/api/scan/{SCAN_ID}/urls?limit=100&status=2xx"),
+        ('subdomains page', f"/api/scan/{SCAN_ID}/subdomains?limit=100"),
+    ]
+    print(f"  {label}:")
+    for name, path in endpoints:
+        median, p95 = latency(client, path, args.repeat)
+        print(f"    {name:<28} {median:>9.1f} ms median {p95:>9.1f} ms p95")
+
+    # Another scan saving a large batch of URLs in one transaction while the page is read
+    done = threading.Event()
+
+    def writer():
+        conn = server.get_db_connection()
+        conn.execute('INSERT INTO scans (id, domain, status) VALUES (?, ?, ?)', (f"writer-{label}", 'w.test', 'running'))
+        conn.executemany(
+            'INSERT INTO urls (scan_id, url, status_code, title, webserver, technologies, content_length) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            url_rows(f"writer-{label}", args.write_rows, 99)
+        )
+        conn.commit()
+        conn.close()
+        done.set()
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    samples = []
+    while not done.is_set():
+        start = time.perf_counter()
+        client.get(f"/api/scan/{SCAN_ID}/results?limit=50")
+        samples.append((time.perf_counter() - start) * 1000)
+    thread.join()
+    print(f"    {'reads during a write':<28} {statistics.median(samples):>9.1f} ms median "
+          f"{max(samples):>9.1f} ms max ({len(samples)} reads)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10_000_000, help='URL rows over all scans')
+    parser.add_argument('--scans', type=int, default=100)
+    parser.add_argument('--scan-rows', type=int, default=100_000, help='URL rows of the scan being read')
+    parser.add_argument('--write-rows', type=int, default=500_000, help='URL rows saved while reading')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='domscout_bench_results_db_')
+    server.DB_PATH = os.path.join(work_dir, 'domscout.db')
+    try:
+        print(f"Results database: {args.rows:,} URL rows over {args.scans} scans, "
+              f"{args.scan_rows:,} in the scan being read")
+        conn = sqlite3.connect(server.DB_PATH)
+        conn.row_factory = sqlite3.Row
+        server.migrate_db(conn, server.SCHEMA_MIGRATIONS[:1])
+        _, elapsed = timed(fill, conn, args)
+        conn.close()
+        report('fill (schema 1)', elapsed, args.rows)
+        measure('schema 1, rollback journal', args)
+
+        version, elapsed = timed(server.init_db)
+        report(f"migrate to schema {version} + WAL", elapsed)
+        measure(f"schema {version}, WAL", args)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Benchmark ROI scoring: the historical per-URL calculate_roi_score against the
+compiled batch scorer (RoiScorer.score_many), checking every score is identical.
+
+Both score every generated URL. The batch scorer is about 1.7x faster (roughly
+10.5 s -> 6 s per 1M URLs); what remains is the per-record Python work, since
+the keyword step is only about a sixth of it and a compiled keyword regex is
+slower than the substring needles.
+
+Usage: python3 benchmarks/bench_roi_scoring.py [--urls N]
+"""
+import argparse
+import random
+
+from common import timed, report
+from roi_scoring import RoiScorer
+
+
+def legacy_roi_score(httpx_data, url=''):
+    """calculate_roi_score as it was before the compiled scorer (reference)"""
+    score = 50  # Base score
+
+    try:
+        if url:
+            url_lower = url.lower()
+
+            path_parts = [p for p in url.split('/') if p and p not in ['https:', '', 'http:']]
+            if len(path_parts) > 2:
+                score += min(10, (len(path_parts) - 2) * 2)
+
+            if len(url) > 100:
+                score += 5
+
+            special_patterns = {
+                'api': 5,
+                'admin': 5,
+                'config': 4,
+                'settings': 3,
+                'account': 2,
+                'user': 2,
+                'login': 3,
+                'auth': 3,
+                'download': 2,
+                'upload': 2,
+                'search': 2,
+            }
+            for pattern, points in special_patterns.items():
+                if f'/{pattern}' in url_lower or f'?{pattern}' in url_lower or f'&{pattern}' in url_lower:
+                    score += points
+                    break
+
+        status_code = httpx_data.get('status-code', 200)
+        content_length = httpx_data.get('content-length', 0)
+        webserver = httpx_data.get('webserver', '').lower()
+        headers = httpx_data.get('headers', {})
+
+        if status_code == 404:
+            score += 50
+        elif status_code == 403:
+            score += 20
+        elif status_code == 401:
+            score += 15
+        elif status_code >= 500:
+            score += 15
+        elif status_code >= 400:
+            score += 10
+
+        if isinstance(headers, dict):
+            header_keys_lower = [h.lower() for h in headers.keys()]
+
+            if any(h in header_keys_lower for h in ['cache-control', 'etag', 'expires', 'vary']):
+                score += 10
+
+            missing = sum(1 for h in ['x-frame-options', 'x-content-type-options', 'strict-transport-security']
+                          if h not in header_keys_lower)
+            if missing >= 2:
+                score += missing * 3
+
+            if any(h in header_keys_lower for h in ['x-powered-by', 'server', 'x-aspnet-version']):
+                score += 3
+
+        csp = httpx_data.get('csp', {})
+        if csp and isinstance(csp, dict) and len(csp.get('domains', [])) > 10:
+            score += 5
+        elif status_code == 200 and content_length > 1000 and not csp:
+            score += 10
+
+        if content_length > 100000:
+            score += 3
+        elif content_length > 50000:
+            score += 2
+        elif content_length > 10000:
+            score += 1
+
+        if webserver:
+            score += 2
+
+        return max(50, min(250, round(score)))
+    except Exception:
+        return 50
+
+
+PATH_WORDS = ['api', 'admin', 'config', 'settings', 'account', 'user', 'login', 'auth',
+              'download', 'upload', 'search', 'static', 'img', 'v1', 'docs', 'apiary', 'users']
+HEADER_NAMES = ['Cache-Control', 'ETag', 'Expires', 'Vary', 'X-Frame-Options', 'X-Content-Type-Options',
+                'Strict-Transport-Security', 'X-Powered-By', 'Server', 'X-AspNet-Version',
+                'Content-Type', 'Set-Cookie']
+STATUS_CODES = [200, 200, 200, 301, 302, 401, 403, 404, 500, 502, 418]
+ODD_STATUS_CODES = [404.0, '200', None]
+
+
+def build_dataset(count, seed=1):
+    """Generate (httpx_data, url) pairs, including the malformed records seen in the wild"""
+    rng = random.Random(seed)
+    items = []
+    for i in range(count):
+        depth = rng.randrange(0, 7)
+        path = '/'.join(rng.choice(PATH_WORDS) + ('' if rng.random() < 0.7 else str(i)) for _ in range(depth))
+        query = ''
+        if rng.random() < 0.3:
+            query = '?' + '&'.join(f"{rng.choice(PATH_WORDS)}={i}" for _ in range(rng.randrange(1, 4)))
+        url = f"https://host{i % 5000}.example.com/{path}{query}"
+        if rng.random() < 0.2:
+            url = url.upper()
+
+        httpx_data = {
+            'status-code': rng.choice(STATUS_CODES if rng.random() < 0.97 else ODD_STATUS_CODES),
+            'content-length': rng.choice([0, 500, 5000, 20000, 60000, 200000]),
+            'webserver': rng.choice(['nginx', 'Apache', '']) if rng.random() < 0.99 else None,
+            'headers': {h: 'x' for h in rng.sample(HEADER_NAMES, rng.randrange(0, 6))},
+        }
+        if rng.random() < 0.1:
+            httpx_data['csp'] = {'domains': [f"d{n}.example" for n in range(rng.randrange(0, 20))]}
+        if rng.random() < 0.05:
+            del httpx_data['status-code']
+        items.append((httpx_data, url if rng.random() < 0.9 else ''))
+    return items
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--urls', type=int, default=1000000)
+    args = parser.parse_args()
+
+    items = build_dataset(args.urls)
+    scorer = RoiScorer()
+
+    print(f"ROI scoring: {args.urls:,} URLs")
+    legacy, legacy_time = timed(lambda: [legacy_roi_score(data, url) for data, url in items])
+    (scores, errors), batch_time = timed(scorer.score_many, items)
+
+    mismatches = sum(1 for a, b in zip(scores, legacy) if a != b)
+    assert len(scores) == len(legacy) and not mismatches, \
+        f'batch scorer disagrees with the legacy calculate_roi_score on {mismatches:,} URLs'
+
+    report("legacy per-URL", legacy_time, len(items))
+    report("compiled batch", batch_time, len(items))
+    print(f"  speedup: {legacy_time / batch_time:.1f}x ({errors:,} malformed records scored as base, "
+          f"all {len(items):,} scores identical)")
+
+
+if __name__ == '__main__':
+    main()
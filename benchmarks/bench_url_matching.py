@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark httpx-record lookup for gowitness screenshots: the historical linear
+_urls_match scan against the normalized-URL/hostname index.
+
+Usage: python3 benchmarks/bench_url_matching.py [--records N] [--screenshots N]
+"""
+import argparse
+import random
+
+from common import make_scanner, timed, report
+
+
+def build_dataset(records, screenshots, seed=1):
+    """Generate httpx records and screenshot URLs with every kind of match"""
+    rng = random.Random(seed)
+    httpx_data_list = []
+    for i in range(records):
+        scheme = rng.choice(['https', 'http'])
+        port = rng.choice(['', '', ':443', ':80', ':8443'])
+        httpx_data_list.append({'url': f"{scheme}://host{i}.example.com{port}/", 'status-code': 200})
+
+    urls = []
+    for _ in range(screenshots):
+        i = rng.randrange(records * 2)  # half of them miss on the exact URL
+        kind = rng.random()
+        if kind < 0.4:
+            urls.append(f"https://host{i}.example.com")
+        elif kind < 0.7:
+            urls.append(f"HTTP://HOST{i}.example.com:80/")
+        elif kind < 0.9:
+            urls.append(f"https://host{i}.example.com/some/deep/path?x=1")
+        else:
+            urls.append(f"https://unrelated{i}.test/")
+    return httpx_data_list, urls
+
+
+def linear_lookup(scanner, urls, httpx_data_list):
+    matches = []
+    for url in urls:
+        match = None
+        for h_data in httpx_data_list:
+            if scanner._urls_match(url, h_data.get('url', '')):
+                match = h_data
+                break
+        matches.append(match)
+    return matches
+
+
+def indexed_lookup(scanner, urls, httpx_data_list):
+    index = scanner._build_url_match_index(httpx_data_list)
+    return [scanner._find_url_match(url, index, httpx_data_list) for url in urls]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--records', type=int, default=30000)
+    parser.add_argument('--screenshots', type=int, default=30000)
+    parser.add_argument('--linear-sample', type=int, default=30,
+                        help='screenshots timed with the linear scan (extrapolated to the full set)')
+    args = parser.parse_args()
+
+    scanner = make_scanner()
+    httpx_data_list, urls = build_dataset(args.records, args.screenshots)
+    sample = urls[:args.linear_sample]
+
+    print(f"URL matching: {args.records:,} httpx records x {args.screenshots:,} screenshots")
+    linear, linear_time = timed(linear_lookup, scanner, sample, httpx_data_list)
+    indexed, indexed_time = timed(indexed_lookup, scanner, urls, httpx_data_list)
+
+    assert indexed[:len(sample)] == linear, 'indexed lookup disagrees with _urls_match'
+
+    linear_full = linear_time * len(urls) / max(1, len(sample))
+    report(f"linear scan ({len(sample)} sampled)", linear_time, len(sample))
+    report("linear scan (extrapolated)", linear_full, len(urls))
+    report("index build + lookups", indexed_time, len(urls))
+    print(f"  speedup: {linear_full / indexed_time:,.0f}x (results identical on the sample)")
+
+    scanner.cleanup_temp_artifacts()
+
+
+if __name__ == '__main__':
+    main()
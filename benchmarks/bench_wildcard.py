@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark wildcard DNS pruning against local stub DNS servers with wildcard
+zones: garbage subdomains that only resolve through *.zone must be dropped,
+real hosts in the same zones (own addresses or CDN CNAMEs) kept.
+
+Runs the wildcard node with the answers the built-in DNS engine recorded
+(dns_records.json) and without them, as after a dnsx run.
+
+Usage: python3 benchmarks/bench_wildcard.py [--hosts N] [--zones N]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+
+from common import make_scanner, timed, report
+from stub_dns import StubDNSServer, expected_records
+
+
+def write_hosts(path, count, zones):
+    """Per zone: real live hosts, CDN-aliased hosts and wildcard garbage; plus hosts outside any wildcard"""
+    hosts = []
+    for i in range(count):
+        zone = zones[i % len(zones)] if i % 5 else 'plain.bench.test'
+        prefix = ['live', 'livecdn', 'junk', 'junk', 'junk'][(i // len(zones)) % 5]
+        hosts.append(f"{prefix}{i}.{zone}")
+    with open(path, 'w') as f:
+        f.write('\n'.join(hosts) + '\n')
+    return hosts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hosts', type=int, default=20000)
+    parser.add_argument('--zones', type=int, default=20, help='wildcard zones')
+    parser.add_argument('--latency-ms', type=float, default=10.0)
+    args = parser.parse_args()
+
+    zones = [f"w{i}.bench.test" for i in range(args.zones)]
+    servers = [StubDNSServer(latency=args.latency_ms / 1000, seed=i, wildcard_zones=zones).start() for i in range(4)]
+    work_dir = tempfile.mkdtemp(prefix='domscout_bench_wildcard_')
+    try:
+        resolvers_file = os.path.join(work_dir, 'resolvers.txt')
+        with open(resolvers_file, 'w') as f:
+            for server in servers:
+                f.write(f"127.0.0.1:{server.port}\n")
+
+        print(f"Wildcard pruning: {args.hosts:,} hosts, {args.zones} wildcard zones, {args.latency_ms:g} ms latency")
+
+        scanner = make_scanner(options={'dns_engine': 'builtin', 'dns_timeout': 0.5})
+        scanner.resolvers_file = resolvers_file
+        subdomains_file = os.path.join(scanner.scan_dir, 'subdomains.txt')
+        live_subs_file = os.path.join(scanner.scan_dir, 'live_subs.txt')
+        hosts = write_hosts(subdomains_file, args.hosts, zones)
+        scanner.run_dnsx()
+
+        with open(live_subs_file) as f:
+            resolved = [line.strip() for line in f if line.strip()]
+        expected = {host for host in hosts if expected_records(host)}
+        assert set(resolved) == {host for host in hosts if expected_records(host, zones)}
+
+        for label, keep_records in [('with recorded answers', True), ('re-resolving live hosts', False)]:
+            if not keep_records:
+                os.remove(os.path.join(scanner.scan_dir, 'dns_records.json'))
+                shutil.copyfile(os.path.join(scanner.scan_dir, 'live_subs_raw.txt'), live_subs_file)
+                os.remove(os.path.join(scanner.scan_dir, 'live_subs_raw.txt'))
+            _, elapsed = timed(scanner._run_wildcard_tool)
+            with open(live_subs_file) as f:
+                kept = {line.strip() for line in f if line.strip()}
+            assert kept == expected, f"kept {len(kept)} hosts, expected {len(expected)}"
+            report(f"wildcard ({label})", elapsed, len(resolved))
+            print(f"    dropped {scanner.tools_status['wildcard']['count']:,} of {len(resolved):,} live hosts")
+
+        scanner.cleanup_temp_artifacts()
+    finally:
+        for server in servers:
+            server.stop()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
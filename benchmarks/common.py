@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""Shared helpers for the DomScout benchmark scripts"""
+import logging
+import os
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from scanner import DomScoutScanner
+
+
+def make_scanner(target='example.com', options=None, rate_limit=150, scan_id='bench', request_budget=None):
+    """Create a quiet scanner working in a throwaway temp directory (rate_limit 0 = unpaced)"""
+    temp_dir = tempfile.mkdtemp(prefix='domscout_bench_')
+    scanner = DomScoutScanner(
+        scan_id,
+        target,
+        rate_limit,
+        os.path.join(ROOT_DIR, 'resolvers.txt'),
+        os.path.join(temp_dir, 'screenshots'),
+        temp_scans_dir=temp_dir,
+        options=options,
+        request_budget=request_budget
+    )
+    scanner.logger.setLevel(logging.WARNING)
+    return scanner
+
+
+def timed(func, *args, **kwargs):
+    """Run func and return (result, elapsed seconds)"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def report(label, seconds, items=None):
+    """Print one aligned benchmark line"""
+    rate = f"  ({items / seconds:,.0f}/s)" if items and seconds > 0 else ''
+    print(f"  {label:<38} {seconds * 1000:>10.1f} ms{rate}")
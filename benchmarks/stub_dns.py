@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Local stub DNS server for offline benchmarks.
+
+Hosts whose first label starts with "live" resolve (A + AAAA, and a CNAME
+for labels starting with "livecdn"); everything else is NXDOMAIN, except
+under wildcard zones, where any other name gets the zone's catch-all
+answer. Latency, dropped queries and SERVFAIL answers can be simulated to
+exercise retries, and a hijacking server answers NXDOMAIN names with an ad
+server address like some ISP resolvers do.
+"""
+import asyncio
+import ipaddress
+import random
+import struct
+import threading
+
+TYPE_A = 1
+TYPE_CNAME = 5
+TYPE_AAAA = 28
+
+
+def _encode_name(name):
+    return b''.join(bytes([len(label)]) + label.encode() for label in name.split('.') if label) + b'\x00'
+
+
+def _read_question(message):
+    offset = 12
+    labels = []
+    while message[offset]:
+        length = message[offset]
+        labels.append(message[offset + 1:offset + 1 + length].decode())
+        offset += 1 + length
+    qtype, _ = struct.unpack('!HH', message[offset + 1:offset + 5])
+    return '.'.join(labels), qtype, message[12:offset + 5]
+
+
+def wildcard_record(host, zone):
+    """The catch-all answer of wildcard zone (one fixed address per zone)"""
+    number = sum(zone.encode()) % 250 + 1
+    return {'host': host, 'a': [f"10.99.{number}.1"], 'aaaa': [f"fd99::{number:x}"], 'cname': []}
+
+
+def expected_records(host, wildcard_zones=()):
+    """The answers the stub gives for host, or None for NXDOMAIN"""
+    first = host.split('.', 1)[0]
+    if not first.startswith('live'):
+        for zone in wildcard_zones:
+            if host.endswith(f".{zone}"):
+                return wildcard_record(host, zone)
+        return None
+    number = sum(host.encode()) % 250 + 1
+    record = {'host': host, 'a': [f"10.0.{number}.1"], 'aaaa': [f"fd00::{number:x}"], 'cname': []}
+    if first.startswith('livecdn'):
+        record['cname'] = [f"edge{number}.cdn.test"]
+    return record
+
+
+class _StubProtocol(asyncio.DatagramProtocol):
+    def __init__(self, server):
+        self.server = server
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        server = self.server
+        server.queries += 1
+        if server.drop_rate and server.rng.random() < server.drop_rate:
+            return
+        response = server.answer(data)
+        if server.latency:
+            asyncio.get_running_loop().call_later(server.latency, self.transport.sendto, response, addr)
+        else:
+            self.transport.sendto(response, addr)
+
+
+class StubDNSServer:
+    """UDP DNS server on 127.0.0.1 running in a background thread"""
+
+    def __init__(self, latency=0.0, drop_rate=0.0, servfail_rate=0.0, seed=1, wildcard_zones=(), hijack=False):
+        self.latency = latency
+        self.hijack = hijack
+        self.wildcard_zones = tuple(wildcard_zones)
+        self.drop_rate = drop_rate
+        self.servfail_rate = servfail_rate
+        self.rng = random.Random(seed)
+        self.queries = 0
+        self.port = None
+        self._loop = None
+        self._ready = threading.Event()
+
+    def answer(self, query):
+        query_id = struct.unpack('!H', query[:2])[0]
+        name, qtype, question = _read_question(query)
+        records = expected_records(name, self.wildcard_zones)
+        if records is None and self.hijack:
+            records = {'host': name, 'a': ['10.66.6.6'], 'aaaa': [], 'cname': []}
+
+        if self.servfail_rate and self.rng.random() < self.servfail_rate:
+            rcode, answers = 2, []
+        elif records is None:
+            rcode, answers = 3, []
+        else:
+            rcode, answers = 0, []
+            target = name
+            if records['cname']:
+                target = records['cname'][0]
+                answers.append((name, TYPE_CNAME, _encode_name(target)))
+            if qtype == TYPE_A:
+                answers += [(target, TYPE_A, bytes(int(p) for p in ip.split('.'))) for ip in records['a']]
+            elif qtype == TYPE_AAAA:
+                answers += [(target, TYPE_AAAA, ipaddress.IPv6Address(ip).packed) for ip in records['aaaa']]
+
+        header = struct.pack('!HHHHHH', query_id, 0x8180 | rcode, 1, len(answers), 0, 0)
+        body = b''.join(
+            _encode_name(owner) + struct.pack('!HHIH', rtype, 1, 60, len(rdata)) + rdata
+            for owner, rtype, rdata in answers
+        )
+        return header + question + body
+
+    def _serve(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        transport, _ = self._loop.run_until_complete(
+            self._loop.create_datagram_endpoint(lambda: _StubProtocol(self), local_addr=('127.0.0.1', 0))
+        )
+        self.port = transport.get_extra_info('sockname')[1]
+        self._ready.set()
+        self._loop.run_forever()
+        transport.close()
+
+    def start(self):
+        threading.Thread(target=self._serve, daemon=True).start()
+        self._ready.wait()
+        return self
+
+    def stop(self):
+        if self._loop:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+    @property
+    def address(self):
+        return ('127.0.0.1', self.port)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Local multi-vhost HTTP(S) server for offline benchmarks.
+
+One listener serves any number of virtual hosts, dispatching on the Host
+header: each vhost answers with its own title, Server header and body
+markers, so probe results can be checked per host. HTTP/1.1 keep-alive is
+supported and new connections are counted to show pooling. TLS is enabled
+with a throwaway self-signed certificate when openssl is available. With
+waf_rps set, requests above that many per second get 429 responses, like a
+rate-limiting WAF.
+"""
+import gzip
+import os
+import shutil
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SERVERS = ['nginx/1.24.0', 'Apache/2.4.57 (Debian)', 'cloudflare', 'Microsoft-IIS/10.0']
+
+
+def expected_page(host, path='/'):
+    """(status, title, server, tech marker) the stub answers for host/path"""
+    number = sum(host.encode()) % len(SERVERS)
+    if path.startswith('/missing'):
+        return 404, 'Not Found', SERVERS[number], None
+    marker = ['WordPress', 'Next.js', None, 'jQuery'][number]
+    return 200, f"{host} &amp; {path}", SERVERS[number], marker
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately; without this, delayed ACKs stall keep-alive clients
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        with self.server.stub.lock:
+            self.server.stub.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def version_string(self):
+        # send_response() writes this as the Server header
+        return getattr(self, 'vhost_server', 'stub')
+
+    def do_GET(self):
+        stub = self.server.stub
+        with stub.lock:
+            stub.requests += 1
+        if stub.latency:
+            time.sleep(stub.latency)
+
+        if stub.throttled():
+            body = b'Too Many Requests'
+            self.send_response(429)
+            self.send_header('Retry-After', '1')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        host = self.headers.get('Host', '').split(':', 1)[0]
+        status, title, server, marker = expected_page(host, self.path)
+        body_markers = {
+            'WordPress': '<link href="/wp-content/themes/x.css">',
+            'Next.js': '<script id="__NEXT_DATA__">{}</script>',
+            'jQuery': '<script src="/js/jquery.min.js"></script>',
+        }
+        body = (
+            f"<html><head><title>{title}</title>{body_markers.get(marker, '')}</head>"
+            f"<body>{'lorem ipsum ' * stub.padding}</body></html>"
+        ).encode()
+
+        self.vhost_server = server
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        if 'gzip' in self.headers.get('Accept-Encoding', '') and stub.compress:
+            body = gzip.compress(body)
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _Server(ThreadingHTTPServer):
+    # Benchmarks open hundreds of connections at once; the default backlog of 5 drops them
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+class StubHTTPServer:
+    """Threaded HTTP/1.1 server on 127.0.0.1 running in a background thread"""
+
+    def __init__(self, latency=0.0, tls=False, padding=50, compress=True, waf_rps=0):
+        self.latency = latency
+        self.tls = tls
+        self.padding = padding
+        self.compress = compress
+        self.waf_rps = waf_rps
+        self.recent = deque()
+        self.requests = 0
+        self.connections = 0
+        self.lock = threading.Lock()
+        self._server = None
+        self._cert_dir = None
+
+    def throttled(self):
+        """True when this request goes over waf_rps in the last second"""
+        if not self.waf_rps:
+            return False
+        now = time.monotonic()
+        with self.lock:
+            while self.recent and self.recent[0] <= now - 1.0:
+                self.recent.popleft()
+            self.recent.append(now)
+            return len(self.recent) > self.waf_rps
+
+    @staticmethod
+    def tls_available():
+        return shutil.which('openssl') is not None
+
+    def _wrap_tls(self):
+        self._cert_dir = tempfile.mkdtemp(prefix='domscout_stub_tls_')
+        cert = os.path.join(self._cert_dir, 'cert.pem')
+        key = os.path.join(self._cert_dir, 'key.pem')
+        subprocess.run(
+            ['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+             '-subj', '/CN=bench.test', '-keyout', key, '-out', cert],
+            check=True, capture_output=True
+        )
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert, key)
+        # Handshake in the handler thread, not in accept(), so one slow client cannot stall the rest
+        self._server.socket = context.wrap_socket(self._server.socket, server_side=True, do_handshake_on_connect=False)
+
+    def start(self):
+        self._server = _Server(('127.0.0.1', 0), _Handler)
+        self._server.stub = self
+        if self.tls:
+            self._wrap_tls()
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+        if self._cert_dir:
+            shutil.rmtree(self._cert_dir, ignore_errors=True)
+
+    @property
+    def port(self):
+        return self._server.server_address[1]
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
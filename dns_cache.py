@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Persistent DNS resolution cache shared by all scans.
+
+Keeps the answers for each hostname in a small SQLite database, so hosts
+resolved by an earlier scan or rescan are not sent to the resolvers again
+while their entry is fresh. Live hosts stay fresh for the freshness window
+(or their record TTL, if lower and honor_ttl is set); hosts that did not
+resolve are cached for a shorter negative window.
+"""
+import contextlib
+import json
+import sqlite3
+import threading
+import time
+
+# Hosts per SELECT ... IN (...) (SQLite's default variable limit is 999)
+LOOKUP_CHUNK = 500
+
+_schema_lock = threading.Lock()
+
+
+class DNSCache:
+    """Hostname -> DNS answers cache with per-entry expiry"""
+
+    def __init__(self, path, max_age=3600, negative_max_age=600, honor_ttl=False):
+        """
+        Args:
+            path: SQLite database file
+            max_age: Seconds a live host's answers stay fresh
+            negative_max_age: Seconds a host that did not resolve stays cached
+            honor_ttl: Expire live entries at their record TTL when it is lower than max_age
+        """
+        self.path = path
+        self.max_age = float(max_age)
+        self.negative_max_age = float(negative_max_age)
+        self.honor_ttl = bool(honor_ttl)
+        with _schema_lock, self._connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS dns_cache (
+                    host TEXT PRIMARY KEY,
+                    live INTEGER NOT NULL,
+                    answers TEXT,
+                    resolved_at REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            ''')
+
+    @contextlib.contextmanager
+    def _connect(self):
+        """Connection committed on success and always closed"""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def lookup(self, hosts, now=None):
+        """Fresh entries for hosts: {host: record} for live hosts, {host: None} for cached misses"""
+        now = time.time() if now is None else now
+        hosts = list(hosts)
+        found = {}
+        with self._connect() as conn:
+            for start in range(0, len(hosts), LOOKUP_CHUNK):
+                chunk = hosts[start:start + LOOKUP_CHUNK]
+                rows = conn.execute(
+                    f"SELECT host, live, answers FROM dns_cache "
+                    f"WHERE expires_at > ? AND host IN ({','.join('?' * len(chunk))})",
+                    [now] + chunk
+                )
+                for host, live, answers in rows:
+                    found[host] = json.loads(answers) if live else None
+        return found
+
+    def store(self, results, now=None):
+        """Cache results, an iterable of (host, record): record None/without addresses = did not resolve
+
+        Hosts known to be live but without answers (dnsx output) are stored
+        with empty address lists.
+        """
+        now = time.time() if now is None else now
+        rows = []
+        for host, record in results:
+            if record and (record.get('a') or record.get('aaaa') or record.get('live')):
+                fresh_for = self.max_age
+                if self.honor_ttl and record.get('ttl') is not None:
+                    fresh_for = min(fresh_for, record['ttl'])
+                answers = {'host': host, 'a': record.get('a', []), 'aaaa': record.get('aaaa', []),
+                           'cname': record.get('cname', [])}
+                rows.append((host, 1, json.dumps(answers), now, now + fresh_for))
+            else:
+                rows.append((host, 0, None, now, now + self.negative_max_age))
+        if not rows:
+            return 0
+        with self._connect() as conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO dns_cache (host, live, answers, resolved_at, expires_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                rows
+            )
+        return len(rows)
+
+    def purge(self, now=None):
+        """Delete expired entries; returns how many were removed"""
+        now = time.time() if now is None else now
+        with self._connect() as conn:
+            return conn.execute('DELETE FROM dns_cache WHERE expires_at <= ?', (now,)).rowcount
@@ -0,0 +1,510 @@
+#!/usr/bin/env python3
+"""
+Built-in asyncio DNS resolution engine (alternative to dnsx).
+
+Queries go straight over UDP to the nameservers in resolvers.txt. Each
+nameserver gets its own socket and concurrency limit, hosts are spread over
+the nameservers round-robin and failed attempts (timeouts, SERVFAIL/REFUSED)
+are retried on the next nameserver. Results are handed to a callback as soon
+as each host completes, with its A, AAAA and CNAME answers.
+
+detect_wildcards() uses the same resolver to spot wildcard DNS zones and the
+hosts that only resolve because of them.
+"""
+import asyncio
+import random
+import struct
+import time
+
+TYPE_A = 1
+TYPE_CNAME = 5
+TYPE_AAAA = 28
+RECORD_TYPES = {'A': TYPE_A, 'AAAA': TYPE_AAAA, 'CNAME': TYPE_CNAME}
+
+RCODE_NOERROR = 0
+RCODE_NXDOMAIN = 3
+
+
+class DNSError(Exception):
+    """Malformed DNS message"""
+
+
+def build_query(query_id, name, qtype):
+    """Encode a recursive query for name/qtype"""
+    header = struct.pack('!HHHHHH', query_id, 0x0100, 1, 0, 0, 0)
+    question = b''.join(
+        bytes([len(label)]) + label
+        for label in (part.encode('idna') for part in name.rstrip('.').split('.') if part)
+    )
+    return header + question + b'\x00' + struct.pack('!HH', qtype, 1)
+
+
+def _read_name(message, offset):
+    """Decode a (possibly compressed) domain name; returns (name, next offset)"""
+    labels = []
+    jumped = False
+    next_offset = offset
+    for _ in range(128):
+        if offset >= len(message):
+            raise DNSError('name runs past end of message')
+        length = message[offset]
+        if length & 0xC0 == 0xC0:
+            if offset + 1 >= len(message):
+                raise DNSError('truncated compression pointer')
+            if not jumped:
+                next_offset = offset + 2
+            offset = ((length & 0x3F) << 8) | message[offset + 1]
+            jumped = True
+        elif length == 0:
+            if not jumped:
+                next_offset = offset + 1
+            return '.'.join(labels), next_offset
+        else:
+            labels.append(message[offset + 1:offset + 1 + length].decode('ascii', 'replace'))
+            offset += 1 + length
+    raise DNSError('too many labels / compression loop')
+
+
+def parse_response(message):
+    """Decode a response into (query id, rcode, [(name, type, value, ttl), ...])"""
+    if len(message) < 12:
+        raise DNSError('short message')
+    query_id, flags, qdcount, ancount, _, _ = struct.unpack('!HHHHHH', message[:12])
+    offset = 12
+    for _ in range(qdcount):
+        _, offset = _read_name(message, offset)
+        offset += 4
+
+    answers = []
+    for _ in range(ancount):
+        name, offset = _read_name(message, offset)
+        if offset + 10 > len(message):
+            raise DNSError('truncated answer')
+        rtype, _, ttl, rdlength = struct.unpack('!HHIH', message[offset:offset + 10])
+        offset += 10
+        rdata = message[offset:offset + rdlength]
+        if rtype == TYPE_A and rdlength == 4:
+            answers.append((name, rtype, '.'.join(str(b) for b in rdata), ttl))
+        elif rtype == TYPE_AAAA and rdlength == 16:
+            groups = struct.unpack('!8H', rdata)
+            answers.append((name, rtype, _format_ipv6(groups), ttl))
+        elif rtype == TYPE_CNAME:
+            answers.append((name, rtype, _read_name(message, offset)[0], ttl))
+        offset += rdlength
+    return query_id, flags & 0x000F, answers
+
+
+def _format_ipv6(groups):
+    """Compressed IPv6 text form (longest zero run replaced by '::')"""
+    best_start, best_len = -1, 0
+    start = None
+    for i, group in enumerate(list(groups) + [1]):
+        if group == 0 and start is None:
+            start = i
+        elif group != 0 and start is not None:
+            if i - start > best_len and i - start > 1:
+                best_start, best_len = start, i - start
+            start = None
+    parts = [f"{group:x}" for group in groups]
+    if best_len:
+        return ':'.join(parts[:best_start]) + '::' + ':'.join(parts[best_start + best_len:])
+    return ':'.join(parts)
+
+
+def parse_nameserver(entry):
+    """'8.8.8.8', '8.8.8.8:53' or '[::1]:5353' -> (host, port)"""
+    entry = entry.strip()
+    if entry.startswith('['):
+        host, _, port = entry[1:].partition(']')
+        return host, int(port.lstrip(':') or 53)
+    if entry.count(':') == 1:
+        host, port = entry.split(':')
+        return host, int(port)
+    return entry, 53
+
+
+def format_nameserver(address):
+    """(host, port) -> '8.8.8.8:53' / '[::1]:53' (inverse of parse_nameserver)"""
+    host, port = address
+    return f"[{host}]:{port}" if ':' in host else f"{host}:{port}"
+
+
+def load_nameservers(path):
+    """Read nameservers from a resolvers.txt style file"""
+    nameservers = []
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if line:
+                nameservers.append(parse_nameserver(line))
+    return nameservers
+
+
+class _NameserverProtocol(asyncio.DatagramProtocol):
+    """One UDP socket to one nameserver, matching responses to pending queries by id"""
+
+    def __init__(self):
+        self.pending = {}
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        try:
+            query_id = struct.unpack('!H', data[:2])[0]
+        except struct.error:
+            return
+        future = self.pending.pop(query_id, None)
+        if future is not None and not future.done():
+            future.set_result(data)
+
+    def error_received(self, exc):
+        # ICMP errors (port unreachable...) fail every pending query on this socket
+        for future in self.pending.values():
+            if not future.done():
+                future.set_exception(exc)
+        self.pending.clear()
+
+    def connection_lost(self, exc):
+        self.error_received(exc or ConnectionError('nameserver socket closed'))
+
+
+class _Nameserver:
+    def __init__(self, address, concurrency):
+        self.address = address
+        self.concurrency = concurrency
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.protocol = None
+        self.queries = 0
+        self.failures = 0
+        self.answered = 0
+        self.latency_total = 0.0
+
+    async def open(self):
+        loop = asyncio.get_running_loop()
+        _, self.protocol = await loop.create_datagram_endpoint(
+            _NameserverProtocol, remote_addr=self.address
+        )
+
+    def close(self):
+        if self.protocol and self.protocol.transport:
+            self.protocol.transport.close()
+
+    async def query(self, name, qtype, timeout):
+        """Send one query; returns (rcode, answers) or raises on timeout/error"""
+        async with self.semaphore:
+            pending = self.protocol.pending
+            query_id = random.getrandbits(16)
+            while query_id in pending:
+                query_id = random.getrandbits(16)
+            future = asyncio.get_running_loop().create_future()
+            pending[query_id] = future
+            self.queries += 1
+            sent_at = time.monotonic()
+            try:
+                self.protocol.transport.sendto(build_query(query_id, name, qtype))
+                data = await asyncio.wait_for(future, timeout)
+            finally:
+                pending.pop(query_id, None)
+            self.answered += 1
+            self.latency_total += time.monotonic() - sent_at
+        response_id, rcode, answers = parse_response(data)
+        if response_id != query_id:
+            raise DNSError('mismatched response id')
+        return rcode, answers
+
+
+class AsyncResolver:
+    """Resolve many hosts over UDP with per-nameserver concurrency and retries"""
+
+    def __init__(self, nameservers, concurrency_per_resolver=50, timeout=2.0, retries=2,
+                 record_types=('A', 'AAAA'), weights=None):
+        """
+        Args:
+            nameservers: List of (host, port) tuples
+            concurrency_per_resolver: In-flight queries allowed per nameserver
+                (scaled by its weight when weights are given)
+            timeout: Seconds to wait for each answer
+            retries: Extra attempts (each on the next nameserver) after a failure
+            record_types: Record types queried per host; CNAMEs come with the answers
+            weights: Optional relative capacity per nameserver (0-1], same order;
+                higher weights get a larger share of the queries
+        """
+        if not nameservers:
+            raise ValueError('at least one nameserver is required')
+        self.addresses = list(nameservers)
+        self.weights = [min(1.0, max(0.05, float(w))) for w in weights] if weights else [1.0] * len(self.addresses)
+        self.concurrency_per_resolver = max(1, int(concurrency_per_resolver))
+        self.timeout = float(timeout)
+        self.retries = max(0, int(retries))
+        self.qtypes = [RECORD_TYPES[t.upper()] for t in record_types]
+        self.nameservers = []
+        self._schedule = []
+        self._next = 0
+        self.stats = {'queries': 0, 'retries': 0, 'resolved': 0, 'failed': 0, 'nameservers': {}}
+
+    def _build_schedule(self):
+        """Smooth weighted round-robin order over the nameservers (plain round-robin when equal)"""
+        slots = [max(1, round(weight * 10)) for weight in self.weights]
+        current = [0] * len(slots)
+        schedule = []
+        for _ in range(sum(slots)):
+            for i, slot in enumerate(slots):
+                current[i] += slot
+            best = max(range(len(slots)), key=current.__getitem__)
+            current[best] -= sum(slots)
+            schedule.append(self.nameservers[best])
+        return schedule
+
+    def _pick(self):
+        nameserver = self._schedule[self._next % len(self._schedule)]
+        self._next += 1
+        return nameserver
+
+    async def _lookup(self, name, qtype):
+        """Answers for one name/type; None when every attempt failed"""
+        for attempt in range(self.retries + 1):
+            nameserver = self._pick()
+            if attempt:
+                self.stats['retries'] += 1
+            try:
+                rcode, answers = await nameserver.query(name, qtype, self.timeout)
+            except (asyncio.TimeoutError, OSError, DNSError):
+                nameserver.failures += 1
+                continue
+            if rcode in (RCODE_NOERROR, RCODE_NXDOMAIN):
+                return answers
+            # SERVFAIL / REFUSED: try another nameserver
+            nameserver.failures += 1
+        return None
+
+    async def resolve(self, host):
+        """Return {'host', 'a', 'aaaa', 'cname', 'ttl'} or None if every attempt failed
+
+        ttl is the lowest TTL among the answers (None when there are none).
+        """
+        results = await asyncio.gather(*(self._lookup(host, qtype) for qtype in self.qtypes))
+        if all(answers is None for answers in results):
+            return None
+        record = {'host': host, 'a': [], 'aaaa': [], 'cname': [], 'ttl': None}
+        for answers in results:
+            for _, rtype, value, ttl in answers or []:
+                key = 'a' if rtype == TYPE_A else 'aaaa' if rtype == TYPE_AAAA else 'cname'
+                if value not in record[key]:
+                    record[key].append(value)
+                record['ttl'] = ttl if record['ttl'] is None else min(record['ttl'], ttl)
+        return record
+
+    async def resolve_many(self, hosts, on_result):
+        """Resolve hosts, calling on_result(host, record) as each one completes
+
+        record is None when the host could not be queried at all; a host
+        resolves when record['a'] or record['aaaa'] is non-empty.
+        """
+        self.nameservers = [
+            _Nameserver(address, max(1, round(self.concurrency_per_resolver * weight)))
+            for address, weight in zip(self.addresses, self.weights)
+        ]
+        for nameserver in self.nameservers:
+            await nameserver.open()
+        self._schedule = self._build_schedule()
+
+        queue = asyncio.Queue()
+        for host in hosts:
+            queue.put_nowait(host)
+
+        async def worker():
+            while True:
+                try:
+                    host = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                record = await self.resolve(host)
+                if record is None:
+                    self.stats['failed'] += 1
+                elif record['a'] or record['aaaa']:
+                    self.stats['resolved'] += 1
+                on_result(host, record)
+
+        # Enough workers to keep every nameserver busy
+        capacity = sum(nameserver.concurrency for nameserver in self.nameservers)
+        workers = max(1, capacity // len(self.qtypes))
+        try:
+            await asyncio.gather(*(worker() for _ in range(min(workers, queue.qsize()) or 1)))
+        finally:
+            for nameserver in self.nameservers:
+                self.stats['queries'] += nameserver.queries
+                self.stats['nameservers'][format_nameserver(nameserver.address)] = {
+                    'queries': nameserver.queries,
+                    'failures': nameserver.failures,
+                    'answered': nameserver.answered,
+                    'latency_total': nameserver.latency_total,
+                }
+                nameserver.close()
+        return self.stats
+
+
+def resolve_hosts(hosts, nameservers, on_result, **options):
+    """Synchronous wrapper around AsyncResolver.resolve_many (own event loop)"""
+    resolver = AsyncResolver(nameservers, **options)
+    return asyncio.run(resolver.resolve_many(hosts, on_result))
+
+
+def _random_label():
+    return ''.join(random.choice('abcdefghijklmnopqrstuvwxyz0123456789') for _ in range(20))
+
+
+async def _check_one(nameserver, canaries, timeout):
+    """Canary lookups against one nameserver; returns a sample dict"""
+    sample = {'queries': 0, 'failures': 0, 'latency_total': 0.0, 'answered': 0, 'lying': False}
+    await nameserver.open()
+    try:
+        for canary in canaries:
+            for name, must_exist in ((canary, True), (f"{_random_label()}.{canary}", False)):
+                sample['queries'] += 1
+                started = time.monotonic()
+                try:
+                    rcode, answers = await nameserver.query(name, TYPE_A, timeout)
+                except (asyncio.TimeoutError, OSError, DNSError):
+                    sample['failures'] += 1
+                    continue
+                if rcode not in (RCODE_NOERROR, RCODE_NXDOMAIN):
+                    sample['failures'] += 1
+                    continue
+                sample['answered'] += 1
+                sample['latency_total'] += time.monotonic() - started
+                if not must_exist and any(answer[1] == TYPE_A for answer in answers):
+                    # Answers for a name that cannot exist: NXDOMAIN hijacking
+                    sample['lying'] = True
+    finally:
+        nameserver.close()
+    return sample
+
+
+async def _check_all(addresses, canaries, timeout):
+    results = await asyncio.gather(
+        *(_check_one(_Nameserver(address, 4), canaries, timeout) for address in addresses),
+        return_exceptions=True
+    )
+    samples = {}
+    for address, result in zip(addresses, results):
+        if isinstance(result, BaseException):
+            result = {'queries': 1, 'failures': 1, 'latency_total': 0.0, 'answered': 0, 'lying': False}
+        samples[format_nameserver(address)] = result
+    return samples
+
+
+def check_nameservers(addresses, canaries, timeout=2.0):
+    """Health-check nameservers with canary lookups (own event loop)
+
+    Each canary is looked up as-is and under a random label; answers for
+    the random names mean the nameserver hijacks NXDOMAIN. Returns
+    {'host:port': {queries, failures, answered, latency_total, lying}}.
+    """
+    return asyncio.run(_check_all(list(addresses), canaries, timeout))
+
+
+def parent_zone(host):
+    """Zone a wildcard record for host would live in ('a.b.example.com' -> 'b.example.com')"""
+    return host.split('.', 1)[1] if host.count('.') >= 2 else None
+
+
+def _answer_set(record):
+    return set(record['a']) | set(record['aaaa']) if record else set()
+
+
+class WildcardFilter:
+    """Wildcard pruning for hosts that arrive in batches (see detect_wildcards)
+
+    Each parent zone is fingerprinted once, with the first batch that has a
+    host in it; later batches only resolve their own hosts.
+    """
+
+    def __init__(self, nameservers, probes=3, **options):
+        """
+        Args:
+            nameservers: List of (host, port) tuples
+            probes: Random labels resolved per parent zone
+            **options: AsyncResolver options
+        """
+        self.nameservers = nameservers
+        self.probes = max(1, int(probes))
+        self.options = options
+        self.probed = set()
+        self.fingerprints = {}
+        self.dropped = {}
+
+    def filter(self, hosts, records=None):
+        """Hosts of a batch that are not wildcard answers; the others are added to dropped
+
+        Args:
+            hosts: Live hostnames
+            records: Optional {host: record} answers already known (from resolve_many)
+        """
+        records = dict(records or {})
+        rng = random.SystemRandom()
+        probe_zone = {}
+        for zone in sorted({zone for zone in map(parent_zone, hosts) if zone} - self.probed):
+            self.probed.add(zone)
+            for _ in range(self.probes):
+                label = ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz0123456789') for _ in range(16))
+                probe_zone[f"{label}.{zone}"] = zone
+
+        def on_result(host, record):
+            zone = probe_zone.get(host)
+            if zone is None:
+                records[host] = record
+            elif record and (record['a'] or record['aaaa']):
+                fingerprint = self.fingerprints.setdefault(zone, {'a': set(), 'aaaa': set(), 'cname': set()})
+                for key in ('a', 'aaaa', 'cname'):
+                    fingerprint[key].update(record[key])
+
+        lookups = list(probe_zone) + [host for host in hosts if host not in records]
+        if lookups:
+            resolve_hosts(lookups, self.nameservers, on_result, **self.options)
+
+        kept = []
+        for host in hosts:
+            zone = parent_zone(host)
+            fingerprint = self.fingerprints.get(zone)
+            record = records.get(host)
+            if fingerprint and record:
+                addresses = _answer_set(record)
+                wildcard_addresses = fingerprint['a'] | fingerprint['aaaa']
+                if (addresses and addresses <= wildcard_addresses) or fingerprint['cname'].intersection(record['cname']):
+                    self.dropped[host] = zone
+                    continue
+            kept.append(host)
+        return kept
+
+    def zones(self):
+        """{zone: fingerprint} of the wildcard zones found so far"""
+        return {
+            zone: {key: sorted(values) for key, values in fingerprint.items()}
+            for zone, fingerprint in self.fingerprints.items()
+        }
+
+
+def detect_wildcards(hosts, nameservers, records=None, probes=3, **options):
+    """Find hosts that only resolve because of a wildcard record in their parent zone
+
+    Resolves `probes` random labels under every parent zone of hosts: a zone
+    whose random names resolve is a wildcard zone, fingerprinted by the
+    union of the addresses (and CNAME targets) in those answers. A host in
+    a wildcard zone is dropped when all of its addresses are wildcard
+    addresses, or it is aliased to a wildcard CNAME target.
+
+    Args:
+        hosts: Live hostnames
+        nameservers: List of (host, port) tuples
+        records: Optional {host: record} answers already known (from resolve_many)
+        probes: Random labels resolved per parent zone
+        **options: AsyncResolver options
+
+    Returns (kept hosts, {dropped host: zone}, {zone: fingerprint}) where a
+    fingerprint is {'a', 'aaaa', 'cname'} lists.
+    """
+    wildcards = WildcardFilter(nameservers, probes=probes, **options)
+    kept = wildcards.filter(hosts, records)
+    return kept, wildcards.dropped, wildcards.zones()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+External (disk-spilling) sort for the URL and subdomain merge steps.
+
+ExternalSorter buffers items in memory until their estimated size exceeds the
+memory budget, then writes the buffer as a sorted run to a temporary file.
+Iterating the sorter k-way merges the runs (heapq.merge), so memory stays
+bounded by the budget no matter how many items were added.
+"""
+import heapq
+import pickle
+import sys
+import tempfile
+
+# Items per pickle record inside a run file
+_CHUNK_SIZE = 4096
+
+# Runs merged at once; more runs are first merged into intermediate runs
+_MAX_OPEN_RUNS = 64
+
+
+def _item_size(item):
+    """Approximate memory footprint of a string or tuple item"""
+    if isinstance(item, tuple):
+        return sys.getsizeof(item) + sum(sys.getsizeof(field) for field in item)
+    return sys.getsizeof(item)
+
+
+class ExternalSorter:
+    """Sort an arbitrarily large stream of items within a memory budget
+
+    Items must be picklable and mutually comparable (strings or tuples).
+    """
+
+    def __init__(self, memory_budget, temp_dir=None):
+        """
+        Args:
+            memory_budget: Approximate bytes of items kept in memory
+            temp_dir: Directory for the spilled run files (default: system temp)
+        """
+        self.memory_budget = max(1, int(memory_budget))
+        self.temp_dir = temp_dir
+        self.buffer = []
+        self.buffer_bytes = 0
+        self.runs = []
+        self.count = 0
+
+    def add(self, item):
+        self.buffer.append(item)
+        self.buffer_bytes += _item_size(item)
+        self.count += 1
+        if self.buffer_bytes >= self.memory_budget:
+            self._spill()
+
+    def extend(self, items):
+        for item in items:
+            self.add(item)
+
+    @property
+    def spilled_runs(self):
+        return len(self.runs)
+
+    def _spill(self):
+        if not self.buffer:
+            return
+        self.buffer.sort()
+        self.runs.append(self._write_run(self.buffer))
+        self.buffer = []
+        self.buffer_bytes = 0
+
+    def _write_run(self, items):
+        run = tempfile.TemporaryFile(dir=self.temp_dir, prefix='extsort_')
+        chunk = []
+        for item in items:
+            chunk.append(item)
+            if len(chunk) >= _CHUNK_SIZE:
+                pickle.dump(chunk, run, pickle.HIGHEST_PROTOCOL)
+                chunk = []
+        if chunk:
+            pickle.dump(chunk, run, pickle.HIGHEST_PROTOCOL)
+        run.flush()
+        return run
+
+    @staticmethod
+    def _read_run(run):
+        run.seek(0)
+        while True:
+            try:
+                chunk = pickle.load(run)
+            except EOFError:
+                return
+            yield from chunk
+
+    def __iter__(self):
+        """Yield all items in sorted order (duplicates included)"""
+        if not self.runs:
+            self.buffer.sort()
+            yield from self.buffer
+            return
+
+        # Keep at most _MAX_OPEN_RUNS files open by merging runs in passes
+        self._spill()
+        while len(self.runs) > _MAX_OPEN_RUNS:
+            batch, self.runs = self.runs[:_MAX_OPEN_RUNS], self.runs[_MAX_OPEN_RUNS:]
+            merged = self._write_run(heapq.merge(*(self._read_run(run) for run in batch)))
+            for run in batch:
+                run.close()
+            self.runs.append(merged)
+
+        yield from heapq.merge(*(self._read_run(run) for run in self.runs))
+
+    def unique(self):
+        """Yield sorted items with duplicates removed"""
+        missing = previous = object()
+        for item in self:
+            if previous is missing or item != previous:
+                yield item
+                previous = item
+
+    def close(self):
+        """Delete the spilled runs and drop the buffer"""
+        for run in self.runs:
+            try:
+                run.close()
+            except OSError:
+                pass
+        self.runs = []
+        self.buffer = []
+        self.buffer_bytes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def memory_budget_bytes(options, key='merge_memory_mb'):
+    """Budget in bytes from a megabytes option, or None when external mode is off"""
+    try:
+        megabytes = float(options.get(key) or 0)
+    except (TypeError, ValueError):
+        return None
+    if megabytes <= 0:
+        return None
+    return int(megabytes * 1024 * 1024)
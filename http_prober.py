@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+Built-in asyncio HTTP prober (alternative to httpx-toolkit).
+
+Speaks HTTP/1.1 over keep-alive connections kept in a pool per
+scheme/host/port, so consecutive probes of one host reuse the same TCP and
+TLS connection. Concurrency is bounded globally and per host, requests are
+paced to the configured rate limit, and every probe produces a record with
+the fields the scanner reads from httpx JSON output (url, status_code,
+title, webserver, tech, content_length, headers...), handed to a callback as
+soon as it completes.
+"""
+import asyncio
+import html
+import re
+import ssl
+import time
+import zlib
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+# Response bodies are read up to this size for title/tech detection
+MAX_BODY_BYTES = 512 * 1024
+
+TITLE_RE = re.compile(rb'<title[^>]*>(.*?)</title>', re.IGNORECASE | re.DOTALL)
+
+# Lightweight technology fingerprints: (name, header, header substring) / (name, body marker)
+HEADER_TECH = [
+    ('Nginx', 'server', 'nginx'),
+    ('Apache HTTP Server', 'server', 'apache'),
+    ('Microsoft IIS', 'server', 'microsoft-iis'),
+    ('Cloudflare', 'server', 'cloudflare'),
+    ('LiteSpeed', 'server', 'litespeed'),
+    ('Caddy', 'server', 'caddy'),
+    ('PHP', 'x-powered-by', 'php'),
+    ('ASP.NET', 'x-powered-by', 'asp.net'),
+    ('Express', 'x-powered-by', 'express'),
+    ('Next.js', 'x-powered-by', 'next.js'),
+    ('Amazon CloudFront', 'via', 'cloudfront'),
+    ('Varnish', 'via', 'varnish'),
+]
+BODY_TECH = [
+    ('WordPress', b'/wp-content/'),
+    ('Drupal', b'Drupal.settings'),
+    ('Joomla', b'/media/jui/'),
+    ('Next.js', b'__NEXT_DATA__'),
+    ('Nuxt.js', b'__NUXT__'),
+    ('Angular', b'ng-version='),
+    ('React', b'data-reactroot'),
+    ('Vue.js', b'data-v-app'),
+    ('jQuery', b'jquery'),
+    ('Bootstrap', b'bootstrap'),
+    ('Google Tag Manager', b'googletagmanager.com'),
+]
+
+
+class ProbeError(Exception):
+    """Malformed or unusable HTTP response"""
+
+
+def detect_tech(headers, body):
+    """Technology names from response headers and body markers"""
+    found = []
+    for name, header, needle in HEADER_TECH:
+        if needle in headers.get(header, '').lower() and name not in found:
+            found.append(name)
+    lowered = body.lower()
+    for name, marker in BODY_TECH:
+        if marker.lower() in lowered and name not in found:
+            found.append(name)
+    return found
+
+
+def extract_title(body):
+    match = TITLE_RE.search(body)
+    if not match:
+        return ''
+    title = match.group(1).decode('utf-8', 'replace')
+    return ' '.join(html.unescape(title).split())
+
+
+class _Connection:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    def close(self):
+        try:
+            self.writer.close()
+        except Exception:
+            pass
+
+
+class HTTPProber:
+    """Probe URLs/hosts over pooled HTTP/1.1 keep-alive connections"""
+
+    def __init__(self, concurrency=100, per_host_concurrency=4, timeout=10.0, retries=2,
+                 rate_limit=150, headers=None, user_agent=None, max_idle_per_host=4, resolve=None, pacer=None):
+        """
+        Args:
+            concurrency: Probes in flight at once
+            per_host_concurrency: Probes in flight per scheme/host/port
+            timeout: Seconds allowed per request (connect + response)
+            retries: Extra attempts after a connection error or timeout
+            rate_limit: Requests per second across all hosts (0 = unlimited)
+            headers: Extra request headers
+            user_agent: User-Agent header value
+            max_idle_per_host: Keep-alive connections kept per scheme/host/port
+            resolve: Optional {host: address} map used instead of a DNS lookup
+            pacer: Optional callable returning the seconds to wait before each request,
+                used instead of rate_limit (e.g. a shared RequestBudget)
+        """
+        self.concurrency = max(1, int(concurrency))
+        self.per_host_concurrency = max(1, int(per_host_concurrency))
+        self.timeout = float(timeout)
+        self.retries = max(0, int(retries))
+        self.rate_limit = float(rate_limit or 0)
+        self.max_idle_per_host = max(0, int(max_idle_per_host))
+        self.resolve = resolve or {}
+        self.pacer = pacer
+        self._pacer_lock = None
+        self.headers = {
+            'User-Agent': user_agent or 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 '
+                                        '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.5',
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive',
+        }
+        self.headers.update(headers or {})
+
+        # httpx-toolkit does not verify certificates either
+        self.ssl_context = ssl.create_default_context()
+        self.ssl_context.check_hostname = False
+        self.ssl_context.verify_mode = ssl.CERT_NONE
+
+        self.idle = {}
+        self.host_limits = {}
+        self._next_send = 0.0
+        self.stats = {'requests': 0, 'connections': 0, 'reused': 0, 'failed': 0, 'timeouts': 0}
+
+    # ----- connection pool -----
+
+    async def _acquire(self, key):
+        pool = self.idle.get(key)
+        while pool:
+            conn = pool.pop()
+            if not conn.reader.at_eof() and not conn.writer.is_closing():
+                self.stats['reused'] += 1
+                return conn
+            conn.close()
+        scheme, host, port = key
+        reader, writer = await asyncio.open_connection(
+            self.resolve.get(host, host), port,
+            ssl=self.ssl_context if scheme == 'https' else None,
+            server_hostname=host if scheme == 'https' else None
+        )
+        self.stats['connections'] += 1
+        return _Connection(reader, writer)
+
+    def _release(self, key, conn, reusable):
+        pool = self.idle.setdefault(key, [])
+        if reusable and len(pool) < self.max_idle_per_host:
+            pool.append(conn)
+        else:
+            conn.close()
+
+    def close(self):
+        for pool in self.idle.values():
+            for conn in pool:
+                conn.close()
+        self.idle.clear()
+
+    async def _pace(self):
+        """Spread request starts evenly to honour rate_limit (or the pacer)"""
+        if self.pacer is not None:
+            # One request waits for a token at a time, so no token is taken
+            # ahead at a rate that may have changed by the time it is used
+            if self._pacer_lock is None:
+                self._pacer_lock = asyncio.Lock()
+            async with self._pacer_lock:
+                delay = self.pacer()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            return
+        if self.rate_limit <= 0:
+            return
+        now = time.monotonic()
+        slot = max(now, self._next_send)
+        self._next_send = slot + 1.0 / self.rate_limit
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    # ----- HTTP/1.1 -----
+
+    async def _read_body(self, reader, headers):
+        """Read the body; returns (body, complete) where complete means the connection can be reused"""
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            size = 0
+            while True:
+                line = await reader.readline()
+                try:
+                    chunk_size = int(line.split(b';', 1)[0].strip() or b'0', 16)
+                except ValueError:
+                    raise ProbeError('bad chunk size')
+                if chunk_size == 0:
+                    # Trailer section ends with an empty line
+                    while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass
+                    return b''.join(chunks), True
+                if size + chunk_size > MAX_BODY_BYTES:
+                    return b''.join(chunks), False
+                chunks.append(await reader.readexactly(chunk_size))
+                size += chunk_size
+                await reader.readline()
+
+        if 'content-length' in headers:
+            try:
+                length = int(headers['content-length'])
+            except ValueError:
+                raise ProbeError('bad content-length')
+            if length > MAX_BODY_BYTES:
+                return await reader.read(MAX_BODY_BYTES), False
+            return await reader.readexactly(length), True
+
+        # No framing: body runs until the server closes the connection
+        return await reader.read(MAX_BODY_BYTES), False
+
+    async def _request(self, url):
+        parts = urlsplit(url)
+        scheme = (parts.scheme or 'https').lower()
+        host = parts.hostname or ''
+        port = parts.port or (443 if scheme == 'https' else 80)
+        key = (scheme, host, port)
+        target = (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+        host_header = host if parts.port is None else f"{host}:{parts.port}"
+
+        limit = self.host_limits.get(key)
+        if limit is None:
+            limit = self.host_limits[key] = asyncio.Semaphore(self.per_host_concurrency)
+
+        async with limit:
+            await self._pace()
+            conn = await self._acquire(key)
+            reusable = False
+            try:
+                request_lines = [f"GET {target} HTTP/1.1", f"Host: {host_header}"]
+                request_lines += [f"{name}: {value}" for name, value in self.headers.items()]
+                conn.writer.write(('\r\n'.join(request_lines) + '\r\n\r\n').encode('latin-1'))
+                await conn.writer.drain()
+                self.stats['requests'] += 1
+
+                status_line = await conn.reader.readline()
+                if not status_line:
+                    raise ProbeError('connection closed before response')
+                fields = status_line.decode('latin-1').split(' ', 2)
+                if len(fields) < 2 or not fields[0].startswith('HTTP/'):
+                    raise ProbeError(f"bad status line {status_line[:60]!r}")
+                version, status = fields[0], int(fields[1])
+
+                headers = {}
+                while True:
+                    line = await conn.reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    name = name.strip().lower()
+                    value = value.strip()
+                    headers[name] = f"{headers[name]}, {value}" if name in headers else value
+
+                if status in (204, 304) or 100 <= status < 200:
+                    body, complete = b'', True
+                else:
+                    body, complete = await self._read_body(conn.reader, headers)
+                reusable = (
+                    complete
+                    and version == 'HTTP/1.1'
+                    and 'close' not in headers.get('connection', '').lower()
+                )
+            finally:
+                self._release(key, conn, reusable)
+
+        return status, headers, body, f"{scheme}://{host_header}{target}"
+
+    @staticmethod
+    def _decode(headers, body):
+        encoding = headers.get('content-encoding', '').lower()
+        try:
+            if encoding == 'gzip':
+                return zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(body, MAX_BODY_BYTES)
+            if encoding == 'deflate':
+                return zlib.decompressobj().decompress(body, MAX_BODY_BYTES)
+        except zlib.error:
+            pass
+        return body
+
+    async def probe_url(self, url, source=None):
+        """Probe one URL; returns an httpx-style record or None when unreachable"""
+        for _ in range(self.retries + 1):
+            try:
+                status, headers, raw_body, final_url = await asyncio.wait_for(self._request(url), self.timeout)
+                break
+            except asyncio.TimeoutError:
+                self.stats['timeouts'] += 1
+                continue
+            except (OSError, asyncio.IncompleteReadError, ProbeError, ValueError, ssl.SSLError):
+                continue
+        else:
+            return None
+
+        body = self._decode(headers, raw_body)
+        parts = urlsplit(final_url)
+        content_length = headers.get('content-length')
+        try:
+            content_length = int(content_length) if content_length is not None else len(raw_body)
+        except ValueError:
+            content_length = len(raw_body)
+        text = body.decode('utf-8', 'replace')
+
+        return {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'url': final_url.rstrip('/') if parts.path in ('', '/') and not parts.query else final_url,
+            'input': source if source is not None else url,
+            'host': parts.hostname,
+            'port': str(parts.port or (443 if parts.scheme == 'https' else 80)),
+            'scheme': parts.scheme,
+            'path': parts.path or '/',
+            'method': 'GET',
+            'status_code': status,
+            'title': extract_title(body),
+            'webserver': headers.get('server', ''),
+            'content_type': headers.get('content-type', '').split(';', 1)[0].strip(),
+            'content_length': content_length,
+            'words': len(text.split()),
+            'lines': text.count('\n') + 1 if text else 0,
+            'tech': detect_tech(headers, body),
+            'headers': headers,
+            'failed': False,
+        }
+
+    async def probe_target(self, target):
+        """Probe a URL as-is, or a bare host over https then http (like httpx)"""
+        if '://' in target:
+            return await self.probe_url(target)
+        for scheme in ('https', 'http'):
+            record = await self.probe_url(f"{scheme}://{target}", source=target)
+            if record:
+                return record
+        return None
+
+    async def probe_many(self, targets, on_record):
+        """Probe targets, calling on_record(record) as each live one completes"""
+        queue = asyncio.Queue()
+        for target in targets:
+            queue.put_nowait(target)
+
+        async def worker():
+            while True:
+                try:
+                    target = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                record = await self.probe_target(target)
+                if record is None:
+                    self.stats['failed'] += 1
+                else:
+                    on_record(record)
+
+        try:
+            await asyncio.gather(*(worker() for _ in range(min(self.concurrency, queue.qsize()) or 1)))
+        finally:
+            self.close()
+        return self.stats
+
+
+def probe_targets(targets, on_record, **options):
+    """Synchronous wrapper around HTTPProber.probe_many (own event loop)"""
+    prober = HTTPProber(**options)
+    return asyncio.run(prober.probe_many(targets, on_record))
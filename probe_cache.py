@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Persistent HTTP probe cache shared by all scans.
+
+Keeps the httpx record (status, title, server, technologies, content length
+and the other fields DomScout reads) for each probed target in a small
+SQLite database, keyed by normalized URL, so targets probed by an earlier
+scan or rescan are not requested again while their entry is fresh. Targets that did not answer
+can be cached for a separate, usually shorter, negative window.
+"""
+import contextlib
+import json
+import sqlite3
+import threading
+import time
+from urllib.parse import urlsplit, urlunsplit
+
+# Keys per SELECT ... IN (...) (SQLite's default variable limit is 999)
+LOOKUP_CHUNK = 500
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+_schema_lock = threading.Lock()
+
+
+def normalize_url(target):
+    """Cache key for a probe target: lowercase scheme and host, no default port or fragment
+
+    Bare hosts (httpx input from live_subs.txt) keep their host[:port] form,
+    since the prober picks the scheme for them.
+    """
+    target = target.strip()
+    if '://' not in target:
+        return target.rstrip('/').lower()
+    try:
+        parts = urlsplit(target)
+        port = parts.port
+    except ValueError:
+        return target
+    scheme = parts.scheme.lower()
+    netloc = (parts.hostname or '').lower()
+    if port is not None and DEFAULT_PORTS.get(scheme) != port:
+        netloc = f"{netloc}:{port}"
+    return urlunsplit((scheme, netloc, parts.path or '/', parts.query, ''))
+
+
+class ProbeCache:
+    """Normalized URL -> httpx record cache with per-entry expiry"""
+
+    def __init__(self, path, max_age=86400, negative_max_age=0):
+        """
+        Args:
+            path: SQLite database file
+            max_age: Seconds a live target's record stays fresh
+            negative_max_age: Seconds a target that did not answer stays cached (0 = never cached)
+        """
+        self.path = path
+        self.max_age = float(max_age)
+        self.negative_max_age = float(negative_max_age)
+        with _schema_lock, self._connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS http_probe_cache (
+                    url_key TEXT PRIMARY KEY,
+                    live INTEGER NOT NULL,
+                    url TEXT,
+                    status_code INTEGER,
+                    title TEXT,
+                    webserver TEXT,
+                    technologies TEXT,
+                    content_length INTEGER,
+                    record TEXT,
+                    probed_at REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            ''')
+
+    @contextlib.contextmanager
+    def _connect(self):
+        """Connection committed on success and always closed"""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def lookup(self, targets, now=None):
+        """Fresh entries for targets: {target: httpx record} for live ones, {target: None} for cached misses"""
+        now = time.time() if now is None else now
+        by_key = {}
+        for target in targets:
+            by_key.setdefault(normalize_url(target), []).append(target)
+        keys = list(by_key)
+        found = {}
+        with self._connect() as conn:
+            for start in range(0, len(keys), LOOKUP_CHUNK):
+                chunk = keys[start:start + LOOKUP_CHUNK]
+                rows = conn.execute(
+                    f"SELECT url_key, live, record FROM http_probe_cache "
+                    f"WHERE expires_at > ? AND url_key IN ({','.join('?' * len(chunk))})",
+                    [now] + chunk
+                )
+                for url_key, live, record in rows:
+                    for target in by_key[url_key]:
+                        found[target] = json.loads(record) if live else None
+        return found
+
+    def store(self, results, now=None):
+        """Cache results, an iterable of (target, httpx record or None for no answer)"""
+        now = time.time() if now is None else now
+        rows = []
+        for target, record in results:
+            if record:
+                technologies = record.get('tech') or record.get('technologies') or []
+                if isinstance(technologies, str):
+                    technologies = [item.strip() for item in technologies.split(',') if item.strip()]
+                rows.append((
+                    normalize_url(target), 1, record.get('url'),
+                    record.get('status_code') or record.get('status-code'),
+                    record.get('title'), record.get('webserver'), json.dumps(technologies),
+                    record.get('content_length') or record.get('content-length'),
+                    json.dumps(record), now, now + self.max_age
+                ))
+            elif self.negative_max_age > 0:
+                rows.append((normalize_url(target), 0, None, None, None, None, None, None, None,
+                             now, now + self.negative_max_age))
+        if not rows:
+            return 0
+        with self._connect() as conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO http_probe_cache (url_key, live, url, status_code, title, webserver, '
+                'technologies, content_length, record, probed_at, expires_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                rows
+            )
+        return len(rows)
+
+    def purge(self, now=None):
+        """Delete expired entries; returns how many were removed"""
+        now = time.time() if now is None else now
+        with self._connect() as conn:
+            return conn.execute('DELETE FROM http_probe_cache WHERE expires_at <= ?', (now,)).rowcount
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Adaptive request-rate control for the HTTP-facing tools of a scan.
+
+A RateGovernor holds one requests-per-second rate per scan, starting at the
+user's budget. Each HTTP stage reports the responses it saw; the rate for
+the next stage is cut multiplicatively when 429s, 5xx responses or timeouts
+pile up and raised additively (never above the budget) after clean stages.
+The current rate is turned into each tool's own flags: a rate limit for
+httpx, thread/concurrency counts for gau, gospider and gowitness.
+
+On the server all scans also draw from one RequestBudget: a global
+requests-per-second cap split max-min fairly between the scans whose HTTP
+tools are running, so the server's total egress stays at the cap however
+many scans run. A scan's rate is the lower of its governor rate and its share.
+"""
+import contextlib
+import threading
+import time
+
+# Seconds one request keeps a worker busy (rate x busy time = concurrency), and concurrency bounds
+TOOL_PROFILES = {
+    'gau': {'busy_seconds': 0.04, 'min': 1, 'max': 5},
+    'gospider': {'busy_seconds': 0.04, 'min': 1, 'max': 20},
+    'gowitness': {'busy_seconds': 0.07, 'min': 1, 'max': 10},
+}
+
+# gospider requests per site at once; higher concurrency crawls more sites in parallel
+GOSPIDER_MAX_PER_SITE = 5
+
+
+class RequestBudget:
+    """Server-wide requests-per-second cap shared fairly by the scans running HTTP tools
+
+    Each scan with at least one HTTP tool running holds a share. Shares are
+    max-min fair: every scan gets an equal slice of the cap, and what a scan
+    does not want (its own rate is lower) is handed to the others. A scan's
+    share is split evenly between its running tools. In-process probers pace
+    themselves through reserve(), a per-tool token bucket refilled at the
+    tool's share that also draws from one bucket refilled at the cap.
+    """
+
+    def __init__(self, rate):
+        """
+        Args:
+            rate: Requests per second for the whole server (0 = no global cap)
+        """
+        self.rate = max(0.0, float(rate or 0))
+        self.scans = {}
+        self.allocations = {}
+        self._next_send = {}
+        self._next_global = 0.0
+        self._lock = threading.Lock()
+
+    def set_rate(self, rate):
+        """Change the global cap; shares are recomputed at once"""
+        with self._lock:
+            self.rate = max(0.0, float(rate or 0))
+            self._allocate()
+
+    def join(self, scan_id, tool, demand):
+        """Register tool of scan_id as running, asking for demand req/s (0 = as much as possible)"""
+        with self._lock:
+            scan = self.scans.setdefault(scan_id, {'demand': 0.0, 'tools': {}})
+            scan['demand'] = float(demand or 0)
+            scan['tools'][tool] = scan['tools'].get(tool, 0) + 1
+            self._allocate()
+
+    def leave(self, scan_id, tool):
+        """Unregister one run of tool; the scan's share is released with its last tool"""
+        with self._lock:
+            scan = self.scans.get(scan_id)
+            if scan is None or tool not in scan['tools']:
+                return
+            scan['tools'][tool] -= 1
+            if not scan['tools'][tool]:
+                del scan['tools'][tool]
+                self._next_send.pop((scan_id, tool), None)
+            if not scan['tools']:
+                del self.scans[scan_id]
+            self._allocate()
+
+    def set_demand(self, scan_id, demand):
+        """Update the rate a running scan asks for (its governor rate changed)"""
+        with self._lock:
+            if scan_id in self.scans:
+                self.scans[scan_id]['demand'] = float(demand or 0)
+                self._allocate()
+
+    def _allocate(self):
+        """Recompute max-min fair shares (caller holds the lock)"""
+        self.allocations = {}
+        if not self.rate:
+            return
+        remaining = self.rate
+        pending = {scan_id: scan['demand'] or float('inf') for scan_id, scan in self.scans.items()}
+        while pending:
+            share = remaining / len(pending)
+            satisfied = {scan_id: demand for scan_id, demand in pending.items() if demand <= share}
+            if not satisfied:
+                for scan_id in pending:
+                    self.allocations[scan_id] = share
+                break
+            for scan_id, demand in satisfied.items():
+                self.allocations[scan_id] = demand
+                remaining -= demand
+                del pending[scan_id]
+
+    def share(self, scan_id):
+        """Requests per second allocated to scan_id (None = no global cap or no tool running)"""
+        with self._lock:
+            return self.allocations.get(scan_id)
+
+    def tool_rate(self, scan_id, tool):
+        """Requests per second for one running tool of scan_id (None = not limited by the budget)"""
+        with self._lock:
+            return self._tool_rate(scan_id, tool)
+
+    def _tool_rate(self, scan_id, tool):
+        share = self.allocations.get(scan_id)
+        scan = self.scans.get(scan_id)
+        if share is None or scan is None or tool not in scan['tools']:
+            return None
+        return share / sum(scan['tools'].values())
+
+    def reserve(self, scan_id, tool, ceiling=None):
+        """Take one request token for tool, refilled at its share (at most ceiling req/s); returns the seconds to wait"""
+        with self._lock:
+            rate = self._tool_rate(scan_id, tool)
+            if ceiling:
+                rate = min(rate, ceiling) if rate else ceiling
+            if not rate:
+                return 0.0
+            now = time.monotonic()
+            slot = max(now, self._next_send.get((scan_id, tool), now))
+            if self._tool_rate(scan_id, tool) is not None:
+                # Tokens handed out before a share shrank must not push the total over the cap
+                slot = max(slot, self._next_global)
+                self._next_global = slot + 1.0 / self.rate
+            self._next_send[(scan_id, tool)] = slot + 1.0 / rate
+            return slot - now
+
+    def report(self, scan_id):
+        """Current allocation of scan_id, for the API"""
+        with self._lock:
+            scan = self.scans.get(scan_id)
+            share = self.allocations.get(scan_id)
+            return {
+                'global_rate_limit': int(self.rate),
+                'active_scans': len(self.scans),
+                'share': round(share, 2) if share is not None else None,
+                'demand': (scan['demand'] or None) if scan else None,
+                'tools': {
+                    tool: round(self._tool_rate(scan_id, tool), 2) if share is not None else None
+                    for tool in scan['tools']
+                } if scan else {},
+            }
+
+
+class RateGovernor:
+    """AIMD requests-per-second controller shared by the HTTP stages of one scan"""
+
+    def __init__(self, budget, adaptive=True, min_rate=None, backoff=0.5, ramp=0.1,
+                 error_threshold=0.1, throttle_threshold=0.02, clean_threshold=0.01, min_attempts=20,
+                 shared=None, scan_id=None):
+        """
+        Args:
+            budget: Requests per second the user allows (the rate never goes above it; 0 = no limit)
+            adaptive: Adjust the rate from stage outcomes; False keeps it at the budget
+            min_rate: Lowest rate backoff goes down to (default: 5% of the budget, at least 1)
+            backoff: Factor the rate is multiplied by after a bad stage
+            ramp: Share of the budget added to the rate after a clean stage
+            error_threshold: 429 + 5xx + timeout share that counts as a bad stage
+            throttle_threshold: 429 share alone that counts as a bad stage
+            clean_threshold: Error share at or below which a stage is clean
+            min_attempts: Stages with fewer requests leave the rate as it is
+            shared: Server-wide RequestBudget capping the rate with the scan's fair share (optional)
+            scan_id: Key of this scan in shared
+        """
+        self.budget = max(0.0, float(budget or 0))
+        self.adaptive = bool(adaptive) and self.budget > 0
+        self.min_rate = min(self.budget, max(1.0, float(min_rate) if min_rate else self.budget * 0.05))
+        self.backoff = float(backoff)
+        self.ramp = float(ramp)
+        self.error_threshold = float(error_threshold)
+        self.throttle_threshold = float(throttle_threshold)
+        self.clean_threshold = float(clean_threshold)
+        self.min_attempts = int(min_attempts)
+        self.rate = self.budget
+        self.history = []
+        self.shared = shared
+        self.scan_id = scan_id
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_options(cls, budget, options, shared=None, scan_id=None):
+        """Governor for a rate_limit budget, configured from settings.json style options"""
+        return cls(
+            budget,
+            adaptive=options.get('rate_adaptive', True),
+            min_rate=options.get('rate_min'),
+            backoff=float(options.get('rate_backoff', 0.5)),
+            ramp=float(options.get('rate_ramp', 0.1)),
+            error_threshold=float(options.get('rate_error_threshold', 0.1)),
+            throttle_threshold=float(options.get('rate_throttle_threshold', 0.02)),
+            shared=shared,
+            scan_id=scan_id
+        )
+
+    @contextlib.contextmanager
+    def stage(self, tool):
+        """Hold a share of the shared budget while tool runs (no-op without one)"""
+        if self.shared is None:
+            yield
+            return
+        self.shared.join(self.scan_id, tool, self.rate if self.budget else 0)
+        try:
+            yield
+        finally:
+            self.shared.leave(self.scan_id, tool)
+
+    def observe(self, stage, responses, throttled=0, server_errors=0, timeouts=0):
+        """Fold one stage's outcome into the rate and return the rate for the next stage
+
+        Args:
+            stage: Name of the stage, for the history
+            responses: Responses received (timeouts are counted on top)
+            throttled: 429 responses
+            server_errors: 5xx responses
+            timeouts: Requests that got no response in time
+        """
+        attempts = responses + timeouts
+        with self._lock:
+            if not attempts:
+                return self.rate
+            error_ratio = (throttled + server_errors + timeouts) / attempts
+            throttle_ratio = throttled / attempts
+            previous = self.rate
+            if not self.adaptive:
+                action = 'fixed'
+            elif attempts < self.min_attempts:
+                action = 'hold'
+            elif throttle_ratio >= self.throttle_threshold or error_ratio >= self.error_threshold:
+                action = 'backoff'
+                self.rate = max(self.min_rate, self.rate * self.backoff)
+            elif error_ratio <= self.clean_threshold:
+                action = 'ramp'
+                self.rate = min(self.budget, self.rate + self.budget * self.ramp)
+            else:
+                action = 'hold'
+            self.history.append({
+                'stage': stage,
+                'attempts': attempts,
+                'throttled': throttled,
+                'server_errors': server_errors,
+                'timeouts': timeouts,
+                'error_ratio': round(error_ratio, 4),
+                'action': action,
+                'rate_before': round(previous, 2),
+                'rate_after': round(self.rate, 2),
+            })
+            rate = self.rate
+        if self.shared is not None and self.budget:
+            self.shared.set_demand(self.scan_id, rate)
+        return rate
+
+    def current(self, tool=None):
+        """Current rate in whole requests per second (0 = no limit)
+
+        With a shared budget and a running tool, the rate is capped by the
+        tool's fair share of the global cap.
+        """
+        with self._lock:
+            rate = self.rate if self.budget else 0
+        if self.shared is not None and tool is not None:
+            share = self.shared.tool_rate(self.scan_id, tool)
+            if share is not None:
+                rate = min(rate, share) if rate else share
+        return max(1, int(rate)) if rate else 0
+
+    def pacer(self, tool):
+        """Callable returning the seconds to wait before tool's next request, or None without a shared budget"""
+        if self.shared is None:
+            return None
+        return lambda: self.shared.reserve(self.scan_id, tool, self.rate if self.budget else None)
+
+    def allocation(self):
+        """Own rate plus the scan's current share of the shared budget, for the API"""
+        report = self.shared.report(self.scan_id) if self.shared is not None else {}
+        return dict(report, budget=int(self.budget), rate=self.current())
+
+    def concurrency(self, tool):
+        """Workers for tool at the current rate, within its profile's bounds"""
+        profile = TOOL_PROFILES[tool]
+        rate = self.current(tool)
+        if not rate:
+            return profile['max']
+        wanted = round(rate * profile['busy_seconds'])
+        return max(profile['min'], min(profile['max'], wanted))
+
+    def flags(self, tool):
+        """Command-line flags carrying the current rate for tool"""
+        if tool in ('httpx', 'enrich'):
+            rate = self.current(tool)
+            return f"-rl {rate}" if rate else ''
+
+        workers = self.concurrency(tool)
+        if tool == 'gospider':
+            per_site = min(GOSPIDER_MAX_PER_SITE, workers)
+            return f"-c {per_site} -t {max(1, workers // per_site)}"
+        return f"--threads {workers}"
+
+
+def response_counts(records):
+    """(responses, 429s, 5xx) in httpx records"""
+    responses = throttled = server_errors = 0
+    for record in records:
+        status = record.get('status_code') or record.get('status-code')
+        if not isinstance(status, int):
+            continue
+        responses += 1
+        if status == 429:
+            throttled += 1
+        elif 500 <= status < 600:
+            server_errors += 1
+    return responses, throttled, server_errors
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Resolver pool health tracking and selection.
+
+Keeps per-resolver statistics (latency, error rate, NXDOMAIN hijacking) in a
+JSON file shared by all scans. Resolvers are health-checked with a few
+canary lookups when their stats are missing or stale, stats from real scans
+are folded in afterwards, and each resolution stage gets the healthy,
+fastest subset of resolvers.txt, weighted by capacity.
+"""
+import json
+import os
+import threading
+import time
+
+from dns_engine import check_nameservers, format_nameserver
+
+# Well-known names without wildcard records
+DEFAULT_CANARIES = ['example.com', 'google.com', 'cloudflare.com']
+
+# Weight given to the newest sample in the moving averages
+EWMA_ALPHA = 0.3
+
+_file_lock = threading.Lock()
+
+
+class ResolverPool:
+    """Persistent health stats for a resolver list, and healthy-subset selection"""
+
+    def __init__(self, stats_file=None, max_error_rate=0.25, max_latency_ms=1500, pool_size=20,
+                 max_age=3600, canaries=None, check_timeout=2.0):
+        """
+        Args:
+            stats_file: JSON file the stats are kept in (in memory only when None)
+            max_error_rate: Resolvers failing more often than this are left out
+            max_latency_ms: Resolvers slower than this on average are left out
+            pool_size: Most resolvers handed to a resolution stage
+            max_age: Seconds before a resolver's health is checked again
+            canaries: Existing names used for health checks
+            check_timeout: Seconds to wait for each health-check answer
+        """
+        self.stats_file = stats_file
+        self.max_error_rate = float(max_error_rate)
+        self.max_latency_ms = float(max_latency_ms)
+        self.pool_size = max(1, int(pool_size))
+        self.max_age = float(max_age)
+        self.canaries = list(canaries or DEFAULT_CANARIES)
+        self.check_timeout = float(check_timeout)
+        self.stats = self._load()
+
+    @classmethod
+    def from_options(cls, options):
+        """Pool configured from settings.json style options"""
+        return cls(
+            stats_file=options.get('resolver_stats_file'),
+            max_error_rate=float(options.get('resolver_max_error_rate', 0.25)),
+            max_latency_ms=float(options.get('resolver_max_latency_ms', 1500)),
+            pool_size=int(options.get('resolver_pool_size', 20)),
+            max_age=float(options.get('resolver_check_interval', 3600)),
+            canaries=options.get('resolver_canaries'),
+            check_timeout=float(options.get('dns_timeout', 2.0))
+        )
+
+    def _load(self):
+        if self.stats_file and os.path.exists(self.stats_file):
+            try:
+                with open(self.stats_file, 'r') as f:
+                    return json.load(f).get('resolvers', {})
+            except (OSError, ValueError):
+                pass
+        return {}
+
+    def save(self):
+        """Write the stats, keeping entries other scans added in the meantime"""
+        if not self.stats_file:
+            return
+        with _file_lock:
+            current = self._load()
+            current.update(self.stats)
+            self.stats = current
+            tmp_file = f"{self.stats_file}.tmp"
+            with open(tmp_file, 'w') as f:
+                json.dump({'resolvers': current}, f, indent=2, sort_keys=True)
+            os.replace(tmp_file, self.stats_file)
+
+    def record(self, key, sample, checked=False):
+        """Fold one sample ({queries, failures, answered, latency_total[, lying]}) into a resolver's stats"""
+        if not sample.get('queries'):
+            return
+        entry = self.stats.setdefault(key, {
+            'queries': 0, 'failures': 0, 'error_rate': 0.0, 'latency_ms': None,
+            'lying': False, 'checked_at': 0, 'updated_at': 0,
+        })
+        error_rate = sample['failures'] / sample['queries']
+        first = entry['queries'] == 0
+        entry['queries'] += sample['queries']
+        entry['failures'] += sample['failures']
+        entry['error_rate'] = round(error_rate if first else
+                                    EWMA_ALPHA * error_rate + (1 - EWMA_ALPHA) * entry['error_rate'], 4)
+        if sample.get('answered'):
+            latency_ms = sample['latency_total'] * 1000 / sample['answered']
+            entry['latency_ms'] = round(latency_ms if entry['latency_ms'] is None else
+                                        EWMA_ALPHA * latency_ms + (1 - EWMA_ALPHA) * entry['latency_ms'], 2)
+        if 'lying' in sample and checked:
+            entry['lying'] = bool(sample['lying'])
+        now = int(time.time())
+        entry['updated_at'] = now
+        if checked:
+            entry['checked_at'] = now
+
+    def record_run(self, nameserver_stats):
+        """Fold AsyncResolver.resolve_many()['nameservers'] stats into the pool"""
+        for key, sample in nameserver_stats.items():
+            self.record(key, sample)
+
+    def stale(self, addresses):
+        now = time.time()
+        return [
+            address for address in addresses
+            if now - self.stats.get(format_nameserver(address), {}).get('checked_at', 0) > self.max_age
+        ]
+
+    def check(self, addresses):
+        """Health-check the given resolvers now (one event loop, all in parallel)"""
+        if not addresses:
+            return {}
+        samples = check_nameservers(list(addresses), self.canaries, self.check_timeout)
+        for key, sample in samples.items():
+            self.record(key, sample, checked=True)
+        return samples
+
+    def health(self, key):
+        """'healthy', 'lying', 'failing', 'slow' or 'unknown'"""
+        entry = self.stats.get(key)
+        if not entry or not entry['queries']:
+            return 'unknown'
+        if entry['lying']:
+            return 'lying'
+        if entry['error_rate'] > self.max_error_rate or entry['latency_ms'] is None:
+            return 'failing'
+        if entry['latency_ms'] > self.max_latency_ms:
+            return 'slow'
+        return 'healthy'
+
+    def weight(self, key):
+        """Relative capacity: answered share over latency, 1.0 for the best resolver"""
+        entry = self.stats[key]
+        return (1 - entry['error_rate']) / max(entry['latency_ms'], 1.0)
+
+    def select(self, addresses):
+        """Healthy, fastest resolvers with weights in (0, 1]; [] when none is healthy"""
+        healthy = [
+            address for address in addresses
+            if self.health(format_nameserver(address)) == 'healthy'
+        ]
+        ranked = sorted(healthy, key=lambda address: -self.weight(format_nameserver(address)))[:self.pool_size]
+        if not ranked:
+            return []
+        best = self.weight(format_nameserver(ranked[0]))
+        return [(address, round(self.weight(format_nameserver(address)) / best, 3)) for address in ranked]
+
+    def report(self, addresses=None):
+        """Stats plus health for every known (or the given) resolver"""
+        keys = [format_nameserver(address) for address in addresses] if addresses else sorted(self.stats)
+        return [
+            dict(self.stats.get(key, {}), resolver=key, health=self.health(key))
+            for key in keys
+        ]
+
+
+def write_resolvers_file(path, selected, max_copies=4):
+    """Write a resolvers file for dnsx, repeating faster resolvers so they get picked more often"""
+    with open(path, 'w') as f:
+        for address, weight in selected:
+            line = format_nameserver(address)
+            # dnsx expects a bare IP for the default port
+            if address[1] == 53 and ':' not in address[0]:
+                line = address[0]
+            for _ in range(max(1, round(weight * max_copies))):
+                f.write(f"{line}\n")
+
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+ROI scoring for screenshots/URLs.
+
+The scoring rules are plain data (DEFAULT_RULES) compiled once into an
+RoiScorer: path keywords become prebuilt substring needles, header checks
+become set operations and status-code weights a lookup table. score_many() scores whole batches of
+(httpx_data, url) pairs in one pass and gives exactly the same results as
+scoring them one by one.
+
+Rule sets can be loaded from a JSON file (load_rules) and the inputs of each
+score can be kept (scoring_features) to re-score stored results later without
+re-running any tool.
+"""
+import json
+DEFAULT_RULES = {
+    'base_score': 50,
+    'min_score': 50,
+    'max_score': 250,
+    # Score returned when a record cannot be scored (malformed data)
+    'error_score': 50,
+    # Path depth: points for every path part beyond free_parts, capped
+    'path_depth': {'free_parts': 2, 'points_per_part': 2, 'max_points': 10},
+    'long_url': {'length': 100, 'points': 5},
+    # Keywords after '/', '?' or '&'; only the first listed keyword found counts
+    'path_keywords': [
+        ['api', 5],
+        ['admin', 5],
+        ['config', 4],
+        ['settings', 3],
+        ['account', 2],
+        ['user', 2],
+        ['login', 3],
+        ['auth', 3],
+        ['download', 2],
+        ['upload', 2],
+        ['search', 2],
+    ],
+    # Exact status codes first, then the first range whose lower bound matches
+    'status_codes': {'404': 50, '403': 20, '401': 15},
+    'status_ranges': [[500, 15], [400, 10]],
+    'cache_headers': {
+        'headers': ['cache-control', 'etag', 'expires', 'vary'],
+        'points': 10,
+    },
+    'security_headers': {
+        'headers': ['x-frame-options', 'x-content-type-options', 'strict-transport-security'],
+        'min_missing': 2,
+        'points_per_missing': 3,
+    },
+    'tech_headers': {
+        'headers': ['x-powered-by', 'server', 'x-aspnet-version'],
+        'points': 3,
+    },
+    'csp': {
+        'min_domains': 10,
+        'points': 5,
+        # No CSP on a sizeable 200 response
+        'missing_points': 10,
+        'missing_min_length': 1000,
+    },
+    # Content length thresholds, largest first; only the first exceeded counts
+    'content_length': [[100000, 3], [50000, 2], [10000, 1]],
+    'webserver_points': 2,
+}
+
+# Status codes precomputed into the lookup table
+_STATUS_TABLE_SIZE = 1000
+
+
+class RoiScorer:
+    """ROI rules compiled for fast single and batch scoring"""
+
+    def __init__(self, rules=None):
+        self.rules = merge_rules(rules)
+        rules = self.rules
+        validate_rules(rules)
+
+        self.base_score = rules['base_score']
+        self.min_score = rules['min_score']
+        self.max_score = rules['max_score']
+        self.error_score = rules['error_score']
+
+        depth = rules['path_depth']
+        self.depth_free = depth['free_parts']
+        self.depth_points = depth['points_per_part']
+        self.depth_max = depth['max_points']
+        self.long_url_length = rules['long_url']['length']
+        self.long_url_points = rules['long_url']['points']
+
+        # Keywords count after '/', '?' or '&': folding '?' and '&' into '/' turns
+        # that into one substring check per keyword, tried in listed order.
+        self.keyword_needles = []
+        self.fold_delimiters = True
+        for keyword, points in rules['path_keywords']:
+            if '?' in keyword or '&' in keyword:
+                self.fold_delimiters = False
+            self.keyword_needles.append((keyword, points))
+        if self.fold_delimiters:
+            self.keyword_needles = [(('/' + keyword,), points) for keyword, points in self.keyword_needles]
+        else:
+            self.keyword_needles = [(tuple(d + keyword for d in '/?&'), points)
+                                    for keyword, points in self.keyword_needles]
+
+        self.status_codes = {int(code): points for code, points in rules['status_codes'].items()}
+        self.status_ranges = [(lower, points) for lower, points in rules['status_ranges']]
+        self.status_table = [self._status_points(code) for code in range(_STATUS_TABLE_SIZE)]
+
+        # Header names are compared in lowercase, as sets
+        self.cache_headers = frozenset(rules['cache_headers']['headers'])
+        self.cache_points = rules['cache_headers']['points']
+        self.security_headers = frozenset(rules['security_headers']['headers'])
+        self.security_min_missing = rules['security_headers']['min_missing']
+        self.security_points = rules['security_headers']['points_per_missing']
+        self.tech_headers = frozenset(rules['tech_headers']['headers'])
+        self.tech_points = rules['tech_headers']['points']
+
+        csp = rules['csp']
+        self.csp_min_domains = csp['min_domains']
+        self.csp_points = csp['points']
+        self.csp_missing_points = csp['missing_points']
+        self.csp_missing_min_length = csp['missing_min_length']
+
+        self.length_thresholds = [(threshold, points) for threshold, points in rules['content_length']]
+        self.webserver_points = rules['webserver_points']
+
+    def _status_points(self, status_code):
+        """Status code weight; raises like the comparison would for odd types"""
+        points = self.status_codes.get(status_code)
+        if points is not None:
+            return points
+        for lower, range_points in self.status_ranges:
+            if status_code >= lower:
+                return range_points
+        return 0
+
+    def keyword_score(self, url_lower):
+        """Points of the first listed keyword found after '/', '?' or '&'"""
+        if self.fold_delimiters:
+            url_lower = url_lower.replace('?', '/').replace('&', '/')
+        for needles, points in self.keyword_needles:
+            for needle in needles:
+                if needle in url_lower:
+                    return points
+        return 0
+
+    def header_score(self, headers):
+        """Points for caching, missing security and tech-indicator headers"""
+        header_keys = set(map(str.lower, headers))
+        score = 0
+
+        if not self.cache_headers.isdisjoint(header_keys):
+            score += self.cache_points
+
+        missing = len(self.security_headers - header_keys)
+        if missing >= self.security_min_missing:
+            score += missing * self.security_points
+
+        if not self.tech_headers.isdisjoint(header_keys):
+            score += self.tech_points
+        return score
+
+    def score_record(self, httpx_data, url='', header_cache=None):
+        """Score one record; raises on malformed data (see score()).
+
+        header_cache is an optional dict reused across a batch to score each
+        distinct set of header names only once.
+        """
+        score = self.base_score
+
+        # URL complexity analysis
+        if url:
+            parts = url.split('/')
+            depth = len(parts) - parts.count('') - parts.count('https:') - parts.count('http:')
+            if depth > self.depth_free:
+                score += min(self.depth_max, (depth - self.depth_free) * self.depth_points)
+
+            if len(url) > self.long_url_length:
+                score += self.long_url_points
+
+            score += self.keyword_score(url.lower())
+
+        get = httpx_data.get
+        status_code = get('status-code', 200)
+        content_length = get('content-length', 0)
+        webserver = get('webserver', '').lower()
+        headers = get('headers', {})
+
+        # Status code weights (table for plain ints, comparisons otherwise)
+        if type(status_code) is int and 0 <= status_code < _STATUS_TABLE_SIZE:
+            score += self.status_table[status_code]
+        else:
+            score += self._status_points(status_code)
+
+        # Header analysis (responses from one server tend to share header sets)
+        if isinstance(headers, dict):
+            if header_cache is None:
+                score += self.header_score(headers)
+            else:
+                header_names = tuple(headers)
+                points = header_cache.get(header_names)
+                if points is None:
+                    points = header_cache[header_names] = self.header_score(headers)
+                score += points
+
+        # CSP
+        csp = get('csp', {})
+        if csp and isinstance(csp, dict) and len(csp.get('domains', [])) > self.csp_min_domains:
+            score += self.csp_points
+        elif status_code == 200 and content_length > self.csp_missing_min_length and not csp:
+            score += self.csp_missing_points
+
+        # Content complexity
+        for threshold, points in self.length_thresholds:
+            if content_length > threshold:
+                score += points
+                break
+
+        if webserver:
+            score += self.webserver_points
+
+        return max(self.min_score, min(self.max_score, round(score)))
+
+    def score(self, httpx_data, url=''):
+        """Score one record, falling back to error_score on malformed data"""
+        try:
+            return self.score_record(httpx_data, url)
+        except Exception:
+            return self.error_score
+
+    def score_features(self, features):
+        """Score features saved by scoring_features()"""
+        return self.score(_features_record(features), features.get('url', ''))
+
+    def score_many(self, items):
+        """Score an iterable of (httpx_data, url) pairs in one pass.
+
+        Returns (scores, errors) where errors counts records that fell back
+        to error_score.
+        """
+        score_record = self.score_record
+        error_score = self.error_score
+        header_cache = {}
+        scores = []
+        errors = 0
+        for httpx_data, url in items:
+            try:
+                scores.append(score_record(httpx_data, url, header_cache))
+            except Exception:
+                scores.append(error_score)
+                errors += 1
+        return scores, errors
+
+
+def load_rules(path):
+    """Load a (possibly partial) rule set from a JSON file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        rules = json.load(f)
+    if not isinstance(rules, dict):
+        raise ValueError(f"ROI rules in {path} must be a JSON object")
+    return rules
+
+
+def scoring_features(httpx_data, url=''):
+    """Return the JSON-serializable inputs of a score.
+
+    Scoring RoiScorer.score_features() of the result gives the same score as
+    scoring httpx_data directly, under any rule set. Header values are
+    dropped (only names are scored) and so is everything else httpx reports.
+    """
+    data = {}
+    for key in ('status-code', 'content-length', 'webserver'):
+        if key in httpx_data:
+            data[key] = httpx_data[key]
+
+    headers = httpx_data.get('headers', {})
+    data['headers'] = list(headers) if isinstance(headers, dict) else None
+
+    if 'csp' in httpx_data:
+        csp = httpx_data['csp']
+        if isinstance(csp, dict):
+            data['csp'] = {'domains': csp.get('domains', [])} if csp else {}
+        else:
+            # Only the truthiness of a non-dict CSP value matters
+            data['csp'] = bool(csp)
+    return {'url': url, 'data': data}
+
+
+def merge_rules(rules):
+    """Return DEFAULT_RULES overridden by the (possibly partial) rules dict"""
+    merged = {}
+    for key, default in DEFAULT_RULES.items():
+        value = (rules or {}).get(key, default)
+        if isinstance(default, dict) and isinstance(value, dict):
+            value = {**default, **value}
+        merged[key] = value
+    return merged
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _check_number(value, name):
+    if not _is_number(value):
+        raise ValueError(f"{name} must be a number, got {value!r}")
+
+
+def _check_pairs(pairs, name, first_type):
+    """A list of [first, points] pairs; first is a keyword ('str') or a threshold ('number')"""
+    if not isinstance(pairs, list):
+        raise ValueError(f"{name} must be a list of [{first_type}, points] pairs")
+    for pair in pairs:
+        if not isinstance(pair, (list, tuple)) or len(pair) != 2:
+            raise ValueError(f"{name} must be a list of [{first_type}, points] pairs, got {pair!r}")
+        first, points = pair
+        valid = isinstance(first, str) if first_type == 'str' else _is_number(first)
+        if not valid:
+            raise ValueError(f"{name}: {first!r} must be a {'string' if first_type == 'str' else 'number'}")
+        _check_number(points, f"{name}: points of {first!r}")
+
+
+def validate_rules(rules):
+    """Raise ValueError unless every weight and threshold of a merged rule set is a
+    number and every keyword and header list holds strings.
+
+    Checked up front: a wrong type would otherwise only surface while scoring, and
+    every record would silently get error_score.
+    """
+    for key in ('base_score', 'min_score', 'max_score', 'error_score', 'webserver_points'):
+        _check_number(rules[key], key)
+
+    for key in ('path_depth', 'long_url', 'csp', 'cache_headers', 'security_headers', 'tech_headers'):
+        section = rules[key]
+        if not isinstance(section, dict):
+            raise ValueError(f"{key} must be an object")
+        for name, value in section.items():
+            if name == 'headers':
+                if not isinstance(value, list) or not all(isinstance(header, str) for header in value):
+                    raise ValueError(f"{key}.headers must be a list of strings")
+            else:
+                _check_number(value, f"{key}.{name}")
+
+    _check_pairs(rules['path_keywords'], 'path_keywords', 'str')
+    _check_pairs(rules['status_ranges'], 'status_ranges', 'number')
+    _check_pairs(rules['content_length'], 'content_length', 'number')
+
+    if not isinstance(rules['status_codes'], dict):
+        raise ValueError("status_codes must be an object of code: points")
+    for code, points in rules['status_codes'].items():
+        try:
+            int(code)
+        except (TypeError, ValueError):
+            raise ValueError(f"status_codes: {code!r} is not a status code") from None
+        _check_number(points, f"status_codes.{code}")
+
+
+def _features_record(features):
+    """Rebuild an httpx-like record from saved features"""
+    data = dict(features.get('data') or {})
+    headers = data.get('headers')
+    data['headers'] = dict.fromkeys(headers, '') if isinstance(headers, list) else None
+    return data
+
+
+def features_items(features_list):
+    """(httpx_data, url) pairs for RoiScorer.score_many() from saved features"""
+    return ((_features_record(features), features.get('url', '')) for features in features_list)
+
+
+DEFAULT_SCORER = RoiScorer()
@@ -3,6 +3,7 @@ import subprocess
 import os
 import time
 import concurrent.futures
+import contextlib
 import shutil
 import tempfile
 import platform
@@ -11,8 +12,33 @@ import sqlite3
 import logging
 import sys
 import random
+import threading
+import queue
+import zlib
 from urllib.parse import urlparse
 
+from dns_cache import DNSCache
+from dns_engine import WildcardFilter, detect_wildcards, load_nameservers, resolve_hosts
+from http_prober import probe_targets
+from probe_cache import ProbeCache, normalize_url
+from rate_control import RateGovernor, response_counts
+from tool_runner import ToolCancelled, ToolRunner
+from extsort import ExternalSorter, memory_budget_bytes
+from resolver_health import ResolverPool, write_resolvers_file
+from roi_scoring import DEFAULT_SCORER, RoiScorer, load_rules, scoring_features
+
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+# httpx JSON fields DomScout reads (URL list, enrichment, ROI scoring); the rest is dropped when indexing
+HTTPX_INDEX_FIELDS = (
+    'url', 'input', 'status-code', 'status_code', 'content-length', 'content_length',
+    'title', 'webserver', 'tech', 'technologies', 'headers', 'csp'
+)
+
 IMAGE_EXTENSIONS = {
     '.png', '.jpg', '.jpeg', '.gif', '.webp', '.svg',
     '.bmp', '.ico', '.tif', '.tiff', '.avif', '.heic', '.heif'
@@ -92,6 +118,196 @@ USER_AGENTS = [
     'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36',
 ]
 
+# Declarative tool graph. Each node declares the artifacts it reads and writes;
+# a node becomes runnable as soon as every node producing one of its inputs
+# has finished. Nodes with "tracked": False are internal pipeline steps that
+# are not exposed as tools in the UI/API; "heavy" nodes spawn network- or
+# browser-intensive processes and are throttled by the server's tool slots;
+# "http" nodes send requests to targets or providers and hold a share of the
+# server's request budget while they run.
+TOOL_GRAPH = {
+    'subfinder': {
+        'runner': '_run_subfinder',
+        'inputs': [],
+        'outputs': ['subfinder-rescursive.txt'],
+        'message': 'Running subdomain enumeration tools...',
+        'required': False,
+    },
+    'findomain': {
+        'runner': '_run_findomain',
+        'inputs': [],
+        'outputs': ['findomain.txt'],
+        'message': 'Running subdomain enumeration tools...',
+        'required': False,
+    },
+    'assetfinder': {
+        'runner': '_run_assetfinder',
+        'inputs': [],
+        'outputs': ['assetfinder.txt'],
+        'message': 'Running subdomain enumeration tools...',
+        'required': False,
+    },
+    'sublist3r': {
+        'runner': '_run_sublist3r',
+        'inputs': [],
+        'outputs': ['sublist3r.txt'],
+        'message': 'Running subdomain enumeration tools...',
+        'required': False,
+    },
+    'merge': {
+        'runner': '_run_merge',
+        'inputs': ['subfinder-rescursive.txt', 'findomain.txt', 'assetfinder.txt', 'sublist3r.txt'],
+        'outputs': ['subdomains.txt'],
+        'message': 'Merging and deduplicating subdomains...',
+    },
+    'dnsx': {
+        'runner': '_run_dnsx_tool',
+        'inputs': ['subdomains.txt'],
+        'outputs': ['live_subs.txt'],
+        'message': 'Resolving live subdomains with dnsx...',
+        'heavy': True,
+    },
+    'wildcard': {
+        'runner': '_run_wildcard_tool',
+        'inputs': ['live_subs.txt'],
+        'outputs': ['wildcard_zones.json'],
+        'message': 'Pruning wildcard DNS subdomains...',
+        'required': False,
+    },
+    'httpx': {
+        'runner': '_run_httpx_tool',
+        'inputs': ['live_subs.txt', 'wildcard_zones.json'],
+        'outputs': ['httpx_output.json', 'alive_webservices.txt'],
+        'message': 'Checking alive web services with httpx...',
+        'heavy': True,
+        'http': True,
+    },
+    'gau': {
+        'runner': '_run_gau',
+        'inputs': ['alive_webservices.txt'],
+        'outputs': ['gau_urls.txt'],
+        'message': 'Extracting URLs with GAU...',
+        'heavy': True,
+        'http': True,
+    },
+    'gospider': {
+        'runner': '_run_gospider',
+        'inputs': ['alive_webservices.txt'],
+        'outputs': ['gospider_urls.txt'],
+        'message': 'Extracting URLs with gospider...',
+        'heavy': True,
+        'http': True,
+    },
+    'merge2': {
+        'runner': '_run_merge2',
+        'inputs': ['alive_webservices.txt', 'gau_urls.txt', 'gospider_urls.txt'],
+        'outputs': ['all_urls_merged.txt'],
+        'message': 'Merging all URLs...',
+    },
+    'enrich': {
+        'runner': 'enrich_merged_urls_metadata',
+        'inputs': ['all_urls_merged.txt'],
+        'outputs': ['httpx_enriched_output.json'],
+        'message': 'Enriching merged URLs with httpx metadata...',
+        'tracked': False,
+        'heavy': True,
+        'http': True,
+    },
+    'gowitness': {
+        'runner': '_run_gowitness_tool',
+        'inputs': ['all_urls_merged.txt', 'httpx_output.json'],
+        'outputs': ['gowitness_scored_results.json'],
+        'message': 'Taking screenshots with gowitness...',
+        'heavy': True,
+        'http': True,
+    },
+    'results': {
+        'runner': 'parse_results',
+        'inputs': ['all_urls_merged.txt', 'httpx_enriched_output.json', 'gowitness_scored_results.json'],
+        'outputs': [],
+        'message': 'Processing results...',
+        'tracked': False,
+    },
+}
+
+# Nodes exposed as individual tools, in pipeline order
+TOOL_NAMES = [name for name, node in TOOL_GRAPH.items() if node.get('tracked', True)]
+
+# Line-per-result file of each tool (dnsx prefers dns_records.json, then live_subs_raw.txt)
+TOOL_RESULT_FILES = {
+    'subfinder': 'subfinder-rescursive.txt',
+    'findomain': 'findomain.txt',
+    'assetfinder': 'assetfinder.txt',
+    'sublist3r': 'sublist3r.txt',
+    'merge': 'subdomains.txt',
+    'dnsx': 'live_subs.txt',
+    'httpx': 'alive_webservices.txt',
+    'gau': 'gau_urls.txt',
+    'gospider': 'gospider_urls.txt',
+    'merge2': 'all_urls_merged.txt'
+}
+
+# Tools whose results are one JSON document, sent whole whenever it changes
+TOOL_RESULT_DOCUMENTS = {
+    'wildcard': 'wildcard_zones.json',
+    'gowitness': 'gowitness_scored_results.json',
+}
+
+# Lines returned by one tail_tool_results call, and bytes before the cursor hashed to notice a rewritten file
+TAIL_MAX_LINES = 1000
+TAIL_FINGERPRINT_BYTES = 64
+
+# Streaming mode: most hosts checked per batch between stages, and seconds a batch waits to fill
+STREAM_BATCH_SIZE = 500
+STREAM_BATCH_WAIT = 0.2
+
+
+def stream_batches(items, size=STREAM_BATCH_SIZE, wait=STREAM_BATCH_WAIT):
+    """Lists of the items put on a queue.Queue, until a None sentinel
+
+    A batch holds the first waiting item plus whatever arrives within wait
+    seconds, up to size items.
+    """
+    while True:
+        item = items.get()
+        if item is None:
+            return
+        batch = [item]
+        deadline = time.monotonic() + wait
+        while len(batch) < size:
+            try:
+                item = items.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if item is None:
+                yield batch
+                return
+            batch.append(item)
+        yield batch
+
+
+def graph_dependencies(node_name):
+    """Return the graph nodes producing the inputs of node_name"""
+    inputs = set(TOOL_GRAPH[node_name]['inputs'])
+    return [
+        name for name, node in TOOL_GRAPH.items()
+        if name != node_name and inputs.intersection(node['outputs'])
+    ]
+
+
+def graph_closure(targets):
+    """Return targets plus every node they transitively depend on, in graph order"""
+    needed = set()
+    stack = list(targets)
+    while stack:
+        name = stack.pop()
+        if name in needed:
+            continue
+        needed.add(name)
+        stack.extend(graph_dependencies(name))
+    return [name for name in TOOL_GRAPH if name in needed]
+
+
 def setup_logging(scan_id):
     """Setup logging for a specific scan"""
     log_file = os.path.join(log_dir, f"scan_{scan_id}.log")
@@ -120,8 +336,41 @@ def setup_logging(scan_id):
     return logger
 
 
+class ChangeFeed:
+    """Version counter that wakes everyone waiting for it to change"""
+    
+    def __init__(self):
+        self._cond = threading.Condition()
+        self.version = 0
+    
+    def notify(self):
+        """Record a change and wake the waiters"""
+        with self._cond:
+            self.version += 1
+            self._cond.notify_all()
+    
+    def wait(self, version, timeout=None):
+        """Block until the version differs from version (or timeout); returns the current version"""
+        with self._cond:
+            self._cond.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+
+class ToolStatus(dict):
+    """Status/count entry of one tool; every change is reported to the scan's change feed"""
+    
+    def __init__(self, changes, status='idle', count=0):
+        super().__init__(status=status, count=count)
+        self._changes = changes
+    
+    def __setitem__(self, key, value):
+        if self.get(key) != value:
+            super().__setitem__(key, value)
+            self._changes.notify()
+
+
 class DomScoutScanner:
-    def __init__(self, scan_id, target, rate_limit, resolvers_file, screenshots_dir, rotate_user_agents=False, temp_scans_dir=None):
+    def __init__(self, scan_id, target, rate_limit, resolvers_file, screenshots_dir, rotate_user_agents=False, temp_scans_dir=None, options=None, tool_slots=None, request_budget=None):
         self.scan_id = scan_id
         self.target = target
         self.rate_limit = rate_limit
@@ -130,24 +379,60 @@ class DomScoutScanner:
         self.rotate_user_agents = rotate_user_agents
         self.temp_scans_dir = temp_scans_dir or os.path.join(tempfile.gettempdir(), 'domscout_scans')
         
+        # Optional tuning knobs (loaded from settings.json by the server)
+        self.options = options or {}
+        self.streaming_pipeline = bool(self.options.get('streaming_pipeline', False))
+        # 'dnsx' shells out to dnsx, 'builtin' uses the asyncio resolver in dns_engine.py
+        self.dns_engine = self.options.get('dns_engine', 'dnsx')
+        # 'httpx' shells out to httpx-toolkit, 'builtin' uses the asyncio prober in http_prober.py
+        self.http_engine = self.options.get('http_engine', 'httpx')
+        # Turns the rate_limit budget into per-tool flags, adapted from each HTTP stage's errors
+        # and capped by the scan's fair share of the server-wide request budget (optional)
+        self.rate_governor = RateGovernor.from_options(rate_limit, self.options, request_budget, scan_id)
+        
+        # Shared limiter for heavy tools across all scans on the server (optional)
+        self.tool_slots = tool_slots
+        
         # Setup logging for this scan
         self.logger = setup_logging(scan_id)
         self.logger.info(f"=== SCAN STARTED for {target} ===")
         
+        # Compiled ROI scoring rules (optionally loaded from a JSON rule file)
+        self.roi_scorer = DEFAULT_SCORER
+        roi_rules_file = self.options.get('roi_rules_file')
+        if roi_rules_file and os.path.exists(roi_rules_file):
+            try:
+                self.roi_scorer = RoiScorer(load_rules(roi_rules_file))
+                self.logger.info(f"Loaded ROI rules from {roi_rules_file}")
+            except Exception as e:
+                self.logger.error(f"Invalid ROI rules in {roi_rules_file}, using defaults: {e}")
+        
         # Create scan-specific directory
         os.makedirs(self.temp_scans_dir, exist_ok=True)
         self.scan_dir = os.path.join(self.temp_scans_dir, f'scan_{scan_id}')
         os.makedirs(self.scan_dir, exist_ok=True)
         self.logger.debug(f"Scan directory: {self.scan_dir}")
         
+        # Starts external tools from argv lists with per-tool timeouts, kill-on-cancel and CPU/RSS accounting
+        self.tool_runner = ToolRunner(self.scan_dir, self.options.get('tool_timeouts'), self.logger)
+        
         # Results
         self.subdomains = []
         self.live_subdomains = []
         self.urls = []
         self.screenshots = []
         
+        # Parsed httpx JSON-lines files: path -> [(mtime, size), records, URL match index]
+        self._httpx_records = {}
+        self._httpx_records_lock = threading.RLock()
+        # Parsed wildcard/gowitness results, keyed by file version
+        self._document_cache = {}
+        
+        # Bumped on every progress or tool status change (server-sent events wait on it)
+        self.changes = ChangeFeed()
+        
         # Progress tracking
-        self.total_steps = 9
+        self.total_steps = len(TOOL_GRAPH)
         self.current_step = 0
         self.progress = 0
         self.progress_message = "Initializing..."
@@ -157,19 +442,10 @@ class DomScoutScanner:
         self.duration = 0
         
         # Tool status tracking
-        self.tools_status = {
-            'subfinder': {'status': 'idle', 'count': 0},
-            'findomain': {'status': 'idle', 'count': 0},
-            'assetfinder': {'status': 'idle', 'count': 0},
-            'sublist3r': {'status': 'idle', 'count': 0},
-            'merge': {'status': 'idle', 'count': 0},
-            'dnsx': {'status': 'idle', 'count': 0},
-            'httpx': {'status': 'idle', 'count': 0},
-            'gau': {'status': 'idle', 'count': 0},
-            'gospider': {'status': 'idle', 'count': 0},
-            'merge2': {'status': 'idle', 'count': 0},
-            'gowitness': {'status': 'idle', 'count': 0}
-        }
+        self.tools_status = {tool: ToolStatus(self.changes) for tool in TOOL_NAMES}
+        
+        # Cross-scan cache hits/misses per cache ('dns', 'http', 'enrich')
+        self.cache_stats = {}
         
         # Temp files
         self.temp_files = [
@@ -179,6 +455,13 @@ class DomScoutScanner:
             os.path.join(self.scan_dir, "sublist3r.txt"),
             os.path.join(self.scan_dir, "subdomains.txt"),
             os.path.join(self.scan_dir, "live_subs.txt"),
+            os.path.join(self.scan_dir, "live_subs_raw.txt"),
+            os.path.join(self.scan_dir, "wildcard_zones.json"),
+            os.path.join(self.scan_dir, "resolvers_selected.txt"),
+            os.path.join(self.scan_dir, "dns_misses.txt"),
+            os.path.join(self.scan_dir, "http_misses.txt"),
+            os.path.join(self.scan_dir, "enrich_targets.txt"),
+            os.path.join(self.scan_dir, "enrich_misses.txt"),
             os.path.join(self.scan_dir, "alive_webservices.txt"),
             os.path.join(self.scan_dir, "gau_urls.txt"),
             os.path.join(self.scan_dir, "gospider_urls.txt"),
@@ -193,32 +476,40 @@ class DomScoutScanner:
         self.current_step = step
         self.progress_message = message
         self.progress = (step / self.total_steps) * 100
+        self.changes.notify()
     
     def get_random_user_agent(self):
         """Get a random user agent from the list"""
         return random.choice(USER_AGENTS)
     
-    def run_command(self, command):
-        """Run a shell command and log output"""
+    def run_tool(self, tool, argv, **kwargs):
+        """Run an external tool through the tool runner and log its outcome
+        
+        Keyword arguments are passed to ToolRunner.run. Returns the
+        CompletedProcess, or None when the tool could not be run or timed out.
+        """
         try:
-            self.logger.debug(f"Running command: {command[:200]}...")
-            result = subprocess.run(
-                command,
-                shell=True,
-                capture_output=True,
-                text=True,
-                cwd=self.scan_dir
-            )
-            if result.returncode != 0:
-                self.logger.warning(f"Command failed with code {result.returncode}")
-                if result.stderr:
-                    self.logger.warning(f"stderr: {result.stderr[:500]}")
-            else:
-                self.logger.debug(f"Command completed successfully")
-            return result
+            result = self.tool_runner.run(tool, argv, **kwargs)
+        except ToolCancelled:
+            raise
+        except subprocess.TimeoutExpired as e:
+            self.logger.warning(f"{tool} timed out after {e.timeout}s")
+            return None
         except Exception as e:
-            self.logger.error(f"Command exception: {e}")
-            pass
+            self.logger.error(f"{tool} exception: {e}")
+            return None
+        if result.returncode != 0:
+            self.logger.warning(f"{tool} failed with code {result.returncode}")
+            if result.stderr:
+                self.logger.warning(f"stderr: {result.stderr[:500]}")
+        else:
+            self.logger.debug(f"{tool} completed successfully")
+        return result
+    
+    def cancel(self):
+        """Kill the scan's running tools; tools started afterwards fail with ToolCancelled"""
+        killed = self.tool_runner.cancel()
+        self.logger.info(f"Scan cancelled, killed {killed} running tools")
     
     def get_chrome_path(self):
         """Get Chrome binary path"""
@@ -242,6 +533,10 @@ class DomScoutScanner:
         """Get the current status of all tools"""
         return self.tools_status
     
+    def get_tool_metrics(self):
+        """Wall time, CPU time and peak RSS of the external tools run so far, per tool"""
+        return self.tool_runner.get_metrics()
+    
     def calculate_roi_score(self, httpx_data, url=''):
         """Calculate ROI score with URL complexity analysis
         
@@ -249,178 +544,190 @@ class DomScoutScanner:
             httpx_data: Dictionary with httpx response data
             url: Optional URL for additional pattern/complexity analysis
         """
-        score = 50  # Base score
-        
         try:
-            # URL complexity analysis - add points based on URL patterns and structure
-            if url:
-                url_lower = url.lower()
-                
-                # Path depth analysis - deeper paths are more complex
-                path_parts = [p for p in url.split('/') if p and p not in ['https:', '', 'http:']]
-                if len(path_parts) > 2:  # Deep paths more complex
-                    score += min(10, (len(path_parts) - 2) * 2)
-                
-                # URL length (longer = potentially more complex)
-                if len(url) > 100:
-                    score += 5
-                
-                # Special patterns indicating functionality/complexity
-                special_patterns = {
-                    'api': 5,
-                    'admin': 5,
-                    'config': 4,
-                    'settings': 3,
-                    'account': 2,
-                    'user': 2,
-                    'login': 3,
-                    'auth': 3,
-                    'download': 2,
-                    'upload': 2,
-                    'search': 2,
-                }
-                for pattern, points in special_patterns.items():
-                    if f'/{pattern}' in url_lower or f'?{pattern}' in url_lower or f'&{pattern}' in url_lower:
-                        score += points
-                        break  # Only count first matching pattern
-            
-            # Extract data from httpx response
-            status_code = httpx_data.get('status-code', 200)
-            content_length = httpx_data.get('content-length', 0)
-            webserver = httpx_data.get('webserver', '').lower()
-            headers = httpx_data.get('headers', {})
-            
-            # Status code weights
-            if status_code == 404:
-                score += 50
-            elif status_code == 403:
-                score += 20
-            elif status_code == 401:
-                score += 15
-            elif status_code >= 500:
-                score += 15
-            elif status_code >= 400:
-                score += 10
-            
-            # Header Analysis
-            if isinstance(headers, dict):
-                header_keys_lower = [h.lower() for h in headers.keys()]
-                
-                #  Caching
-                if any(h in header_keys_lower for h in ['cache-control', 'etag', 'expires', 'vary']):
-                    score += 10
-                
-                # Missing security headers
-                missing = sum(1 for h in ['x-frame-options', 'x-content-type-options', 'strict-transport-security']
-                              if h not in header_keys_lower)
-                if missing >= 2:
-                    score += missing * 3
-                
-                # Tech indicators
-                if any(h in header_keys_lower for h in ['x-powered-by', 'server', 'x-aspnet-version']):
-                    score += 3
-            
-            # CSP
-            csp = httpx_data.get('csp', {})
-            if csp and isinstance(csp, dict) and len(csp.get('domains', [])) > 10:
-                score += 5
-            elif status_code == 200 and content_length > 1000 and not csp:
-                score += 10
-            
-            # Content complexity
-            if content_length > 100000:
-                score += 3
-            elif content_length > 50000:
-                score += 2
-            elif content_length > 10000:
-                score += 1
-            
-            if webserver:
-                score += 2
-            
-            return max(50, min(250, round(score)))
+            return self.roi_scorer.score_record(httpx_data, url)
         except Exception as e:
             self.logger.error(f"Error calculating ROI score: {e}")
-            return 50
+            return self.roi_scorer.error_score
+    
+    def calculate_roi_scores(self, items):
+        """Calculate ROI scores for many (httpx_data, url) pairs in one pass
+        
+        Returns the scores in input order; identical to calling
+        calculate_roi_score() on every pair.
+        """
+        scores, errors = self.roi_scorer.score_many(items)
+        if errors:
+            self.logger.error(f"Error calculating ROI score for {errors} URL(s), used base score")
+        return scores
     
     def get_tool_results(self, tool_name):
         """Get results from a specific tool"""
-        results = []
+        if tool_name in TOOL_RESULT_DOCUMENTS:
+            return list(self._document_results(tool_name)[1])
+        return self.tail_tool_results(tool_name, limit=None)['lines']
+    
+    def tail_tool_results(self, tool_name, cursor=None, limit=TAIL_MAX_LINES):
+        """Results of tool_name added since cursor
         
-        # Special handling for gowitness - return scored and sorted results
-        if tool_name == 'gowitness':
-            scored_file = os.path.join(self.scan_dir, 'gowitness_scored_results.json')
-            if os.path.exists(scored_file):
-                try:
-                    with open(scored_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        # Sort by ROI score descending, then by URL
-                        sorted_urls = sorted(data, key=lambda x: (-x.get('roi_score', 0), x.get('url', '')))
-                        for item in sorted_urls:
-                            results.append(f"{item['url']} [ROI: {item.get('roi_score', 0)}]")
-                except Exception as e:
-                    self.logger.error(f"Error reading scored results: {e}")
-            return results
-        
-        # Map tool names to their result files
-        file_map = {
-            'subfinder': 'subfinder-rescursive.txt',
-            'findomain': 'findomain.txt',
-            'assetfinder': 'assetfinder.txt',
-            'sublist3r': 'sublist3r.txt',
-            'merge': 'subdomains.txt',
-            'dnsx': 'live_subs.txt',
-            'httpx': 'alive_webservices.txt',
-            'gau': 'gau_urls.txt',
-            'gospider': 'gospider_urls.txt',
-            'merge2': 'all_urls_merged.txt'
-        }
+        Line files are read from the byte offset in the cursor, so each call
+        only reads what the tool wrote since the previous one. A line the
+        running tool is still writing is left for the next call. JSON documents
+        (wildcard, gowitness) are sent whole when they changed.
+        
+        Args:
+            tool_name: Tool to read
+            cursor: Cursor returned by the previous call (None = from the start)
+            limit: Most lines to return (None = no limit)
+        
+        Returns:
+            {'lines': new results, 'cursor': cursor for the next call (None while
+            there is no output), 'reset': True when the output was rewritten and
+            lines replace everything sent before, 'more': True when lines stopped
+            at limit}
+        """
+        if tool_name in TOOL_RESULT_DOCUMENTS:
+            stamp, results = self._document_results(tool_name)
+            if stamp is None or stamp == cursor:
+                return {'lines': [], 'cursor': stamp, 'reset': False, 'more': False}
+            return {'lines': list(results), 'cursor': stamp, 'reset': True, 'more': False}
+        
+        path, format_line = self._tool_result_source(tool_name)
+        if path is None or not os.path.exists(path):
+            return {'lines': [], 'cursor': None, 'reset': cursor is not None, 'more': False}
+        
+        name = os.path.basename(path)
+        inode, offset, size, mtime, fingerprint = None, 0, 0, 0, None
+        if cursor:
+            try:
+                cursor_name, inode, offset, size, mtime, fingerprint = cursor.rsplit(':', 5)
+                inode, offset, size, mtime = int(inode), int(offset), int(size), int(mtime)
+                if cursor_name != name:
+                    inode = None
+            except ValueError:
+                inode = None
+        
+        lines = []
+        more = False
+        # A line without its newline is only complete once the tool has stopped writing
+        writing = self.tools_status.get(tool_name, {}).get('status') == 'running'
+        try:
+            with open(path, 'rb') as f:
+                stat = os.fstat(f.fileno())
+                # A file rewritten in place keeps its inode: once modified it must have
+                # grown, and the bytes just before the offset must be the ones sent
+                reset = bool(cursor) and (
+                    inode != stat.st_ino or offset > stat.st_size
+                    or (stat.st_mtime_ns != mtime and stat.st_size <= size)
+                    or self._tail_fingerprint(f, offset) != fingerprint
+                )
+                if reset or not cursor:
+                    offset = 0
+                f.seek(offset)
+                for raw in f:
+                    if limit is not None and len(lines) >= limit:
+                        more = True
+                        break
+                    if not raw.endswith(b'\n') and writing:
+                        break
+                    offset += len(raw)
+                    line = raw.decode('utf-8', errors='ignore').strip()
+                    if line:
+                        line = format_line(line) if format_line else line
+                        if line:
+                            lines.append(line)
+                fingerprint = self._tail_fingerprint(f, offset)
+        except Exception as e:
+            self.logger.error(f"Error reading {name}: {e}")
+            return {'lines': [], 'cursor': cursor, 'reset': False, 'more': False}
         
-        filename = file_map.get(tool_name)
+        cursor = f"{name}:{stat.st_ino}:{offset}:{stat.st_size}:{stat.st_mtime_ns}:{fingerprint}"
+        return {'lines': lines, 'cursor': cursor, 'reset': reset, 'more': more}
+    
+    @staticmethod
+    def _tail_fingerprint(f, offset):
+        """CRC32 of the bytes of f just before offset"""
+        start = max(0, offset - TAIL_FINGERPRINT_BYTES)
+        f.seek(start)
+        return f"{zlib.crc32(f.read(offset - start)):08x}"
+    
+    def _tool_result_source(self, tool_name):
+        """(line file, line formatter or None) holding tool_name's results"""
+        if tool_name == 'dnsx':
+            # The built-in resolver also keeps the DNS answers behind each live host
+            records_file = os.path.join(self.scan_dir, 'dns_records.json')
+            if os.path.exists(records_file):
+                return records_file, self._format_dns_record
+            # dnsx results are the resolved hosts before wildcard pruning
+            raw_file = os.path.join(self.scan_dir, 'live_subs_raw.txt')
+            if os.path.exists(raw_file):
+                return raw_file, None
+        
+        filename = TOOL_RESULT_FILES.get(tool_name)
         if not filename:
-            return results
+            return None, None
+        return os.path.join(self.scan_dir, filename), None
+    
+    @staticmethod
+    def _format_dns_record(line):
+        try:
+            record = json.loads(line)
+        except ValueError:
+            return None
+        answers = ''.join(
+            f" [{label}: {', '.join(record[key])}]"
+            for key, label in (('a', 'A'), ('aaaa', 'AAAA'), ('cname', 'CNAME'))
+            if record.get(key)
+        )
+        return f"{record['host']}{answers}"
+    
+    def _document_results(self, tool_name):
+        """(version stamp or None, results) of a JSON document tool, parsed again only when the file changed"""
+        filename = TOOL_RESULT_DOCUMENTS[tool_name]
+        path = os.path.join(self.scan_dir, filename)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None, []
+        stamp = f"{filename}:{stat.st_ino}:{stat.st_mtime_ns}:{stat.st_size}"
+        cached = self._document_cache.get(tool_name)
+        if cached and cached[0] == stamp:
+            return cached
         
-        filepath = os.path.join(self.scan_dir, filename)
-        if os.path.exists(filepath):
-            try:
-                with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                    for line in f:
-                        clean_line = line.strip()
-                        if clean_line:
-                            results.append(clean_line)
-            except Exception as e:
-                print(f"Error reading {filename}: {e}")
+        results = []
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if tool_name == 'gowitness':
+                # Sort by ROI score descending, then by URL
+                sorted_urls = sorted(data, key=lambda x: (-x.get('roi_score', 0), x.get('url', '')))
+                for item in sorted_urls:
+                    results.append(f"{item['url']} [ROI: {item.get('roi_score', 0)}]")
+            else:
+                for zone, fingerprint in sorted(data.get('zones', {}).items()):
+                    answers = ', '.join(fingerprint['a'] + fingerprint['aaaa'] + fingerprint['cname'])
+                    results.append(f"*.{zone} [wildcard: {answers}]")
+                for host, zone in sorted(data.get('dropped', {}).items()):
+                    results.append(f"{host} [dropped: *.{zone}]")
+        except Exception as e:
+            # Possibly caught mid-write: not cached, so the next call reads it again
+            self.logger.error(f"Error reading {filename}: {e}")
+            return None, []
         
-        return results
+        self._document_cache[tool_name] = (stamp, results)
+        return stamp, results
     
     def run_single_tool(self, tool_name):
         """Run a single tool"""
+        if tool_name not in TOOL_NAMES:
+            raise ValueError(f"Unknown tool: {tool_name}")
+        
         self.logger.debug(f"Starting tool: {tool_name}")
         self.tools_status[tool_name]['status'] = 'running'
         
         try:
-            if tool_name == 'subfinder':
-                self._run_subfinder()
-            elif tool_name == 'findomain':
-                self._run_findomain()
-            elif tool_name == 'assetfinder':
-                self._run_assetfinder()
-            elif tool_name == 'sublist3r':
-                self._run_sublist3r()
-            elif tool_name == 'merge':
-                self._run_merge()
-            elif tool_name == 'dnsx':
-                self._run_dnsx_tool()
-            elif tool_name == 'httpx':
-                self._run_httpx_tool()
-            elif tool_name == 'gau':
-                self._run_gau()
-            elif tool_name == 'gospider':
-                self._run_gospider()
-            elif tool_name == 'merge2':
-                self._run_merge2()
-            elif tool_name == 'gowitness':
-                self._run_gowitness_tool()
+            with self._tool_slot(tool_name), self._rate_share(tool_name):
+                getattr(self, TOOL_GRAPH[tool_name]['runner'])()
             
             self.logger.info(f"Tool completed successfully: {tool_name} (count: {self.tools_status[tool_name]['count']})") 
             self.tools_status[tool_name]['status'] = 'completed'
@@ -431,8 +738,8 @@ class DomScoutScanner:
     
     def _run_subfinder(self):
         """Run subfinder"""
-        cmd = f"subfinder -d {self.target} -all -silent -o subfinder-rescursive.txt"
-        self.run_command(cmd)
+        self.run_tool('subfinder', ['subfinder', '-d', self.target, '-all', '-silent', '-o', 'subfinder-rescursive.txt'],
+                      output_file=os.devnull)
         
         # Count results
         filepath = os.path.join(self.scan_dir, "subfinder-rescursive.txt")
@@ -442,8 +749,8 @@ class DomScoutScanner:
     
     def _run_findomain(self):
         """Run findomain"""
-        cmd = f"findomain --quiet -t {self.target} > findomain.txt"
-        self.run_command(cmd)
+        self.run_tool('findomain', ['findomain', '--quiet', '-t', self.target],
+                      output_file=os.path.join(self.scan_dir, "findomain.txt"))
         
         filepath = os.path.join(self.scan_dir, "findomain.txt")
         if os.path.exists(filepath):
@@ -452,8 +759,8 @@ class DomScoutScanner:
     
     def _run_assetfinder(self):
         """Run assetfinder"""
-        cmd = f"assetfinder -subs-only {self.target} > assetfinder.txt"
-        self.run_command(cmd)
+        self.run_tool('assetfinder', ['assetfinder', '-subs-only', self.target],
+                      output_file=os.path.join(self.scan_dir, "assetfinder.txt"))
         
         filepath = os.path.join(self.scan_dir, "assetfinder.txt")
         if os.path.exists(filepath):
@@ -462,8 +769,8 @@ class DomScoutScanner:
     
     def _run_sublist3r(self):
         """Run sublist3r"""
-        cmd = f"sublist3r -d {self.target} -t 50 -o sublist3r.txt"
-        self.run_command(cmd)
+        self.run_tool('sublist3r', ['sublist3r', '-d', self.target, '-t', '50', '-o', 'sublist3r.txt'],
+                      output_file=os.devnull)
         
         filepath = os.path.join(self.scan_dir, "sublist3r.txt")
         if os.path.exists(filepath):
@@ -479,6 +786,10 @@ class DomScoutScanner:
         """Run dnsx"""
         # First merge all subdomains
         self.merge_subdomains()
+        # A fresh dnsx run invalidates the unfiltered copy left by wildcard pruning
+        raw_file = os.path.join(self.scan_dir, "live_subs_raw.txt")
+        if os.path.exists(raw_file):
+            os.remove(raw_file)
         self.run_dnsx()
         
         filepath = os.path.join(self.scan_dir, "live_subs.txt")
@@ -491,10 +802,78 @@ class DomScoutScanner:
                         self.live_subdomains.append(clean_line)
             self.tools_status['dnsx']['count'] = len(self.live_subdomains)
     
+    def _run_wildcard_tool(self):
+        """Drop live subdomains that only resolve through a wildcard DNS record
+        
+        The unfiltered dnsx output is kept as live_subs_raw.txt; live_subs.txt
+        is rewritten without the wildcard hosts, and the wildcard zones with
+        their fingerprints and dropped hosts go to wildcard_zones.json.
+        """
+        live_subs_file = os.path.join(self.scan_dir, "live_subs.txt")
+        raw_file = os.path.join(self.scan_dir, "live_subs_raw.txt")
+        zones_file = os.path.join(self.scan_dir, "wildcard_zones.json")
+        self.tools_status['wildcard']['count'] = 0
+        
+        if not os.path.exists(live_subs_file):
+            return
+        
+        # Re-runs start from the unfiltered list
+        source_file = raw_file if os.path.exists(raw_file) else live_subs_file
+        with open(source_file, 'r', encoding='utf-8', errors='ignore') as f:
+            hosts = list(dict.fromkeys(line.strip() for line in f if line.strip()))
+        
+        if not self.options.get('wildcard_detection', True) or not hosts:
+            with open(zones_file, 'w') as f:
+                json.dump({'zones': {}, 'dropped': {}}, f)
+            return
+        
+        # Answers from the built-in DNS engine save re-resolving the live hosts
+        records = {}
+        records_file = os.path.join(self.scan_dir, "dns_records.json")
+        if os.path.exists(records_file):
+            with open(records_file, 'r') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    records[record['host']] = record
+        
+        started_at = time.time()
+        selected = self.select_resolvers()
+        kept, dropped, zones = detect_wildcards(
+            hosts,
+            [address for address, _ in selected],
+            records=records,
+            probes=int(self.options.get('wildcard_probes', 3)),
+            concurrency_per_resolver=int(self.options.get('dns_concurrency', 50)),
+            timeout=float(self.options.get('dns_timeout', 2.0)),
+            retries=int(self.options.get('dns_retries', 2)),
+            weights=[weight for _, weight in selected]
+        )
+        
+        if source_file == live_subs_file:
+            shutil.copyfile(live_subs_file, raw_file)
+        with open(live_subs_file, 'w') as f:
+            for host in kept:
+                f.write(f"{host}\n")
+        with open(zones_file, 'w') as f:
+            json.dump({'zones': zones, 'dropped': dropped}, f)
+        
+        self.live_subdomains = kept
+        self.tools_status['wildcard']['count'] = len(dropped)
+        self.logger.info(
+            f"Wildcard: {len(zones)} wildcard zones, dropped {len(dropped)}/{len(hosts)} hosts "
+            f"in {time.time() - started_at:.1f}s"
+        )
+    
     def _run_httpx_tool(self):
         """Run httpx"""
         self.run_httpx()
-        
+        self._load_httpx_results()
+    
+    def _load_httpx_results(self):
+        """Build self.urls from httpx_output.json and write alive_webservices.txt"""
         # Parse URLs from httpx JSON output AND create alive_webservices.txt
         httpx_json = os.path.join(self.scan_dir, "httpx_output.json")
         alive_file = os.path.join(self.scan_dir, "alive_webservices.txt")
@@ -505,26 +884,9 @@ class DomScoutScanner:
             self.urls = []  # Clear previous URLs
             alive_urls = []
             try:
-                with open(httpx_json, 'r') as f:
-                    for line in f:
-                        try:
-                            data = json.loads(line)
-                            if 'url' in data:
-                                url = data['url']
-                                technologies = data.get('tech') or data.get('technologies') or []
-                                if isinstance(technologies, str):
-                                    technologies = [item.strip() for item in technologies.split(',') if item.strip()]
-                                self.urls.append({
-                                    'url': url,
-                                    'status_code': data.get('status_code') or data.get('status-code'),
-                                    'title': data.get('title'),
-                                    'webserver': data.get('webserver'),
-                                    'technologies': technologies,
-                                    'content_length': data.get('content_length') or data.get('content-length')
-                                })
-                                alive_urls.append(url)
-                        except json.JSONDecodeError:
-                            pass
+                for data in self.httpx_records(httpx_json):
+                    self.urls.append(self._enriched_url_entry(data))
+                    alive_urls.append(data['url'])
                 
                 # Write alive URLs to file for GAU/gospider
                 with open(alive_file, 'w') as f:
@@ -539,6 +901,59 @@ class DomScoutScanner:
         else:
             self.logger.error(f"httpx_output.json not found at {httpx_json}")
     
+    def httpx_records(self, path):
+        """Records of an httpx JSON-lines file, parsed once and shared by every reader
+        
+        Records keep only HTTPX_INDEX_FIELDS (header names without values).
+        The file is parsed again only when it changes on disk.
+        """
+        return self._httpx_entry(path)[1]
+    
+    def httpx_match_index(self, path):
+        """(records, URL match index) for an httpx JSON-lines file; the index is built on first use"""
+        with self._httpx_records_lock:
+            entry = self._httpx_entry(path)
+            if entry[2] is None:
+                entry[2] = self._build_url_match_index(entry[1])
+            return entry[1], entry[2]
+    
+    def _httpx_entry(self, path):
+        """[(mtime, size), records, match index or None] for path, parsing it if it changed"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return [None, [], ({}, {})]
+        with self._httpx_records_lock:
+            entry = self._httpx_records.get(path)
+            if entry and entry[0] == (stat.st_mtime_ns, stat.st_size):
+                return entry
+            records = []
+            with open(path, 'rb') as f:
+                for line in f:
+                    try:
+                        data = json_loads(line)
+                    except ValueError:
+                        continue
+                    if isinstance(data, dict) and data.get('url'):
+                        records.append(self._compact_httpx_record(data))
+            return self._remember_httpx_records(path, records)
+    
+    def _remember_httpx_records(self, path, records):
+        """Keep records as the parsed contents of path in its current state"""
+        stat = os.stat(path)
+        entry = [(stat.st_mtime_ns, stat.st_size), records, None]
+        self._httpx_records[path] = entry
+        return entry
+    
+    @staticmethod
+    def _compact_httpx_record(data):
+        record = {key: data[key] for key in HTTPX_INDEX_FIELDS if key in data}
+        headers = record.get('headers')
+        if isinstance(headers, dict):
+            # ROI scoring only looks at header names
+            record['headers'] = dict.fromkeys(headers, '')
+        return record
+    
     def _run_gowitness_tool(self):
         """Run gowitness and calculate ROI scores using httpx data"""
         self.run_gowitness()
@@ -546,23 +961,14 @@ class DomScoutScanner:
         self.logger.info("GoWitness: Processing URLs and calculating ROI scores")
         
         # Load httpx data indexed by URL
-        httpx_data_list = []
         httpx_json = os.path.join(self.scan_dir, "httpx_output.json")
-        
-        if os.path.exists(httpx_json):
-            try:
-                with open(httpx_json, 'r') as f:
-                    for line in f:
-                        try:
-                            data = json.loads(line)
-                            if 'url' in data:
-                                httpx_data_list.append(data)
-                        except json.JSONDecodeError:
-                            pass
+        try:
+            httpx_data_list, httpx_index = self.httpx_match_index(httpx_json)
+            if httpx_data_list:
                 self.logger.info(f"GoWitness: Loaded {len(httpx_data_list)} URLs from httpx for ROI scoring")
-            except Exception as e:
-                self.logger.error(f"Error loading httpx data: {e}")
-                httpx_data_list = []
+        except Exception as e:
+            self.logger.error(f"Error loading httpx data: {e}")
+            httpx_data_list, httpx_index = [], ({}, {})
         
         # Try to load from gowitness database first
         gowitness_db = os.path.join(self.scan_dir, "gowitness.sqlite3")
@@ -585,6 +991,9 @@ class DomScoutScanner:
                     has_gowitness_data = True
                     self.logger.info(f"GoWitness: Found {len(rows)} entries in database")
                     
+                    entries = []
+                    scoring_items = []
+                    unmatched = 0
                     for row in rows:
                         screenshot_url = row['final_url'] or row['url']
                         filename = row['filename']
@@ -595,33 +1004,37 @@ class DomScoutScanner:
                             continue
                         
                         # Find matching httpx data
-                        httpx_data = None
-                        for h_data in httpx_data_list:
-                            if self._urls_match(screenshot_url, h_data.get('url', '')):
-                                httpx_data = h_data
-                                break
+                        httpx_data = self._find_url_match(screenshot_url, httpx_index, httpx_data_list)
                         
-                        # Calculate ROI score - use individual status code but httpx data for other factors
+                        # Use individual status code but httpx data for other factors
                         if httpx_data:
-                            # Merge GoWitness status code with httpx data
                             merged_data = dict(httpx_data)
                             merged_data['status-code'] = status_code  # Use individual URL's status code
-                            roi_score = self.calculate_roi_score(merged_data, screenshot_url)
-                            self.logger.debug(f"ROI with httpx data (status {status_code}): {roi_score} for {screenshot_url}")
+                            scoring_items.append((merged_data, screenshot_url))
                         else:
-                            roi_score = self.calculate_roi_score({
+                            unmatched += 1
+                            scoring_items.append(({
                                 'status-code': status_code,
                                 'content-length': 0,
                                 'headers': {}
-                            })
-                            self.logger.warning(f"No httpx match for {screenshot_url}, base score: {roi_score}")
+                            }, ''))
                         
+                        entries.append((screenshot_url, status_code, title,
+                                        os.path.join(self.scan_id, os.path.basename(filename))))
+                    
+                    if unmatched:
+                        self.logger.warning(f"GoWitness: No httpx match for {unmatched} screenshot(s), scored with base data")
+                    
+                    roi_scores = self.calculate_roi_scores(scoring_items)
+                    for (screenshot_url, status_code, title, screenshot), roi_score, (data, scored_url) in zip(
+                            entries, roi_scores, scoring_items):
                         self.screenshots.append({
                             'url': screenshot_url,
                             'status_code': status_code,
                             'title': title,
-                            'filename': os.path.join(self.scan_id, os.path.basename(filename)),
-                            'roi_score': roi_score
+                            'filename': screenshot,
+                            'roi_score': roi_score,
+                            'features': scoring_features(data, scored_url)
                         })
                         
                         scored_results.append({
@@ -629,7 +1042,7 @@ class DomScoutScanner:
                             'status_code': status_code,
                             'title': title,
                             'roi_score': roi_score,
-                            'screenshot': os.path.join(self.scan_id, os.path.basename(filename))
+                            'screenshot': screenshot
                         })
                 
                 conn.close()
@@ -641,21 +1054,20 @@ class DomScoutScanner:
         if not has_gowitness_data and httpx_data_list:
             self.logger.info("GoWitness: Database empty or unavailable, using httpx data directly for ROI scoring")
             
-            for httpx_data in httpx_data_list:
+            scorable = [httpx_data for httpx_data in httpx_data_list if httpx_data.get('url', '')]
+            roi_scores = self.calculate_roi_scores((httpx_data, '') for httpx_data in scorable)
+            
+            for httpx_data, roi_score in zip(scorable, roi_scores):
                 url = httpx_data.get('url', '')
                 status_code = httpx_data.get('status-code', 200)
                 title = httpx_data.get('title', '')
                 
-                if not url:
-                    continue
-                
-                roi_score = self.calculate_roi_score(httpx_data)
-                
                 self.screenshots.append({
                     'url': url,
                     'status_code': status_code,
                     'title': title,
-                    'roi_score': roi_score
+                    'roi_score': roi_score,
+                    'features': scoring_features(httpx_data)
                 })
                 
                 scored_results.append({
@@ -684,6 +1096,36 @@ class DomScoutScanner:
             self.logger.warning("GoWitness: No data available for ROI scoring")
             self.tools_status['gowitness']['count'] = 0
     
+    def _url_match_keys(self, url):
+        """Return the (normalized URL, hostname) keys _urls_match compares on"""
+        normalized = url.rstrip('/').lower()
+        no_port = normalized.replace(':443', '').replace(':80', '')
+        try:
+            parsed = urlparse(normalized)
+            host = parsed.hostname or parsed.netloc.split(':')[0]
+        except Exception:
+            host = ''
+        return no_port, (host or '').lower()
+    
+    def _build_url_match_index(self, records):
+        """Index records by _urls_match keys, keeping the first position per key"""
+        by_url = {}
+        by_host = {}
+        for position, record in enumerate(records):
+            no_port, host = self._url_match_keys(record.get('url') or '')
+            by_url.setdefault(no_port, position)
+            if host:
+                by_host.setdefault(host, position)
+        return by_url, by_host
+    
+    def _find_url_match(self, url, index, records):
+        """Return the first record that _urls_match(url, ...) accepts, in O(1)"""
+        by_url, by_host = index
+        no_port, host = self._url_match_keys(url)
+        positions = [by_url.get(no_port), by_host.get(host) if host else None]
+        positions = [position for position in positions if position is not None]
+        return records[min(positions)] if positions else None
+    
     def _urls_match(self, url1, url2):
         """Check if two URLs represent the same domain/server"""
         # Normalize URLs
@@ -725,40 +1167,23 @@ class DomScoutScanner:
         try:
             self.start_time = time.time()
             
-            # Step 1: Parallel enumeration
-            self.update_progress(1, "Running subdomain enumeration tools...")
-            self.run_enumeration()
-            
-            # Step 2: Process and merge results
-            self.update_progress(2, "Merging and deduplicating subdomains...")
-            self.run_single_tool('merge')
-            
-            # Step 3: DNS resolution
-            self.update_progress(3, "Resolving live subdomains with dnsx...")
-            self.run_single_tool('dnsx')
-            
-            # Step 4: Check alive web services
-            self.update_progress(4, "Checking alive web services with httpx...")
-            self.run_single_tool('httpx')
-            
-            # Step 5: Run GAU and gospider in parallel
-            self.update_progress(5, "Extracting URLs with GAU and gospider...")
-            self.run_url_extraction()
-            
-            # Step 6: Merge all URLs
-            self.update_progress(6, "Merging all URLs...")
-            self.run_single_tool('merge2')
-
-            # Enrich merged URLs with per-URL metadata (status/title/server/tech)
-            self.enrich_merged_urls_metadata()
-            
-            # Step 7: Take screenshots
-            self.update_progress(7, "Taking screenshots with gowitness...")
-            self.run_single_tool('gowitness')
+            completed = set()
+            builtin = [name for name, engine in (('dns', self.dns_engine), ('http', self.http_engine))
+                       if engine == 'builtin']
+            if self.streaming_pipeline and builtin:
+                self.logger.warning(
+                    f"Streaming: the built-in {' and '.join(builtin)} engine does not stream; "
+                    f"running the file-based pipeline instead"
+                )
+            elif self.streaming_pipeline:
+                # Enumeration, merge, dnsx and httpx overlap as one stream
+                self.update_progress(0, "Streaming enumeration results through dnsx and httpx...")
+                with self._tool_slot('httpx'), self._rate_share('httpx'):
+                    self.run_streaming_discovery()
+                completed = set(graph_closure(['httpx']))
             
-            # Step 8: Parse results
-            self.update_progress(8, "Processing results...")
-            self.parse_results()
+            # Every remaining node starts as soon as its inputs are ready
+            self.run_graph(completed=completed)
             
             self.duration = int(time.time() - self.start_time)
             self.update_progress(self.total_steps, "Completed!")
@@ -767,29 +1192,400 @@ class DomScoutScanner:
             print(f"Scan error: {e}")
             raise
     
-    def run_enumeration(self):
-        """Run parallel subdomain enumeration"""
-        tools = ['subfinder', 'findomain', 'assetfinder', 'sublist3r']
+    def run_graph(self, targets=None, completed=()):
+        """Run TOOL_GRAPH nodes, starting each one as soon as its inputs are ready.
+        
+        Args:
+            targets: Nodes to run (with their dependencies); all nodes when None
+            completed: Nodes whose outputs already exist and should be skipped
         
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            futures = [executor.submit(self.run_single_tool, tool) for tool in tools]
-            concurrent.futures.wait(futures)
+        Returns the list of nodes that were executed, in completion order.
+        """
+        nodes = graph_closure(targets) if targets else list(TOOL_GRAPH)
+        done = set(completed)
+        pending = [name for name in nodes if name not in done]
+        deps = {name: graph_dependencies(name) for name in pending}
+        failed = {}
+        executed = []
+        running = {}
+        
+        self.total_steps = len(nodes)
+        
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, len(pending))) as executor:
+            while pending or running:
+                for name in list(pending):
+                    blocking = [
+                        dep for dep in deps[name]
+                        if dep not in done and (dep not in failed or TOOL_GRAPH[dep].get('required', True))
+                    ]
+                    if any(dep in failed for dep in blocking):
+                        # An upstream node this one cannot do without has failed
+                        pending.remove(name)
+                        failed[name] = None
+                        self.logger.warning(f"Graph: skipping {name}, a dependency failed")
+                    elif not blocking:
+                        pending.remove(name)
+                        running[executor.submit(self._run_graph_node, name)] = name
+                
+                if not running:
+                    break
+                
+                self.update_progress(
+                    len([name for name in nodes if name in done]),
+                    TOOL_GRAPH[next(iter(running.values()))]['message']
+                )
+                finished, _ = concurrent.futures.wait(
+                    list(running), return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in finished:
+                    name = running.pop(future)
+                    try:
+                        future.result()
+                        done.add(name)
+                        executed.append(name)
+                    except Exception as e:
+                        failed[name] = e
+        
+        errors = [
+            error for name, error in failed.items()
+            if error is not None and TOOL_GRAPH[name].get('required', True)
+        ]
+        if errors:
+            raise errors[0]
+        return executed
+    
+    def _run_graph_node(self, name):
+        """Run a single graph node, tracking status for tool nodes"""
+        if TOOL_GRAPH[name].get('tracked', True):
+            self.run_single_tool(name)
+        else:
+            with self._tool_slot(name), self._rate_share(name):
+                getattr(self, TOOL_GRAPH[name]['runner'])()
+    
+    def _tool_slot(self, name):
+        """Return a context holding one heavy-tool slot while a heavy node runs"""
+        if self.tool_slots is not None and TOOL_GRAPH.get(name, {}).get('heavy'):
+            return self.tool_slots
+        return contextlib.nullcontext()
+    
+    def _rate_share(self, name):
+        """Return a context holding a share of the server-wide request budget while an HTTP node runs"""
+        if TOOL_GRAPH.get(name, {}).get('http'):
+            return self.rate_governor.stage(name)
+        return contextlib.nullcontext()
     
-    def run_url_extraction(self):
-        """Run GAU and gospider in parallel"""
-        self.logger.info("URL Extraction: Starting parallel execution of GAU and GoSpider")
+    def run_tool_with_dependencies(self, tool_name):
+        """Run tool_name plus any upstream nodes that have not completed yet"""
+        completed = {
+            name for name in TOOL_GRAPH
+            if name != tool_name and (
+                not TOOL_GRAPH[name].get('tracked', True)
+                or self.tools_status[name]['status'] == 'completed'
+            )
+        }
+        return self.run_graph(targets=[tool_name], completed=completed)
+    
+    def run_streaming_discovery(self):
+        """Run enumeration, merge, dnsx and httpx as one overlapping stream.
+
+        Subdomains are deduplicated as the enumerators print them and looked up
+        in the DNS cache in small batches: cached live hosts skip dnsx, cached
+        dead ones are dropped and only the misses are written to dnsx's stdin
+        (dnsx's answers are cached once it exits cleanly). Live hosts are
+        checked against the wildcard fingerprints of their parent zones in
+        small batches (each zone is fingerprinted once, when its first host
+        arrives), and the rest are looked up in the HTTP probe cache: cached
+        records are written to the httpx output directly and only the misses
+        are forwarded to httpx the same way. The usual result files are still
+        produced so later stages and the per-tool result views keep working.
+
+        The built-in DNS and HTTP engines do not stream; run() uses the
+        file-based pipeline when either is selected.
+        """
+        subdomains_file = os.path.join(self.scan_dir, "subdomains.txt")
+        live_subs_file = os.path.join(self.scan_dir, "live_subs.txt")
+        raw_file = os.path.join(self.scan_dir, "live_subs_raw.txt")
+        zones_file = os.path.join(self.scan_dir, "wildcard_zones.json")
+        httpx_json = os.path.join(self.scan_dir, "httpx_output.json")
+        resolvers_abs = os.path.join(self.scan_dir, "resolvers_selected.txt")
+        selected = self.select_resolvers()
+        write_resolvers_file(resolvers_abs, selected)
+        
+        wildcards = None
+        if self.options.get('wildcard_detection', True):
+            wildcards = WildcardFilter(
+                [address for address, _ in selected],
+                probes=int(self.options.get('wildcard_probes', 3)),
+                concurrency_per_resolver=int(self.options.get('dns_concurrency', 50)),
+                timeout=float(self.options.get('dns_timeout', 2.0)),
+                retries=int(self.options.get('dns_retries', 2)),
+                weights=[weight for _, weight in selected]
+            )
         
-        # Small delay to ensure alive_webservices.txt is fully written
-        time.sleep(0.5)
+        # Tools that print one subdomain per line on stdout
+        stream_commands = {
+            'subfinder': (['subfinder', '-d', self.target, '-all', '-silent'], "subfinder-rescursive.txt"),
+            'findomain': (['findomain', '--quiet', '-t', self.target], "findomain.txt"),
+            'assetfinder': (['assetfinder', '-subs-only', self.target], "assetfinder.txt"),
+        }
         
-        tools = ['gau', 'gospider']
+        seen = set()
+        live_subdomains = []
+        kept_subdomains = []
+        dns_misses = []
+        http_misses = []
+        subdomain_queue = queue.Queue()
+        live_queue = queue.Queue()
+        feed_lock = threading.Lock()
+        live_lock = threading.Lock()
+        cache = self.dns_cache()
+        probes = self.probe_cache()
+        httpx_lock = threading.Lock()
+        started_at = time.time()
+        
+        for tool in ['merge', 'dnsx', 'wildcard', 'httpx']:
+            self.tools_status[tool]['status'] = 'running'
+        self.tools_status['wildcard']['count'] = 0
+        
+        self.logger.info("Streaming: starting dnsx and httpx consumers")
+        # Leaving the stack reaps dnsx and httpx (and records their resource usage),
+        # also when starting httpx or anything after the dnsx start fails
+        with contextlib.ExitStack() as processes:
+            dnsx_proc = processes.enter_context(self.tool_runner.process(
+                'dnsx',
+                ['dnsx', '-silent', '-r', resolvers_abs],
+                stdin=subprocess.PIPE,
+                stderr=subprocess.DEVNULL
+            ))
+            httpx_proc = processes.enter_context(self.tool_runner.process(
+                'httpx',
+                self._httpx_probe_command(),
+                stdin=subprocess.PIPE,
+                stderr=subprocess.DEVNULL
+            ))
+            
+            # Unfiltered live hosts go to live_subs_raw.txt, as after the wildcard node
+            raw_out = processes.enter_context(open(raw_file if wildcards else os.devnull, 'w'))
+            # httpx records and probe cache hits share one output file
+            httpx_out = processes.enter_context(open(httpx_json, 'w'))
+            httpx_count = [0]
+            
+            def write_httpx_line(line):
+                with httpx_lock:
+                    httpx_out.write(line)
+                    httpx_out.flush()
+                    httpx_count[0] += 1
+                    self.tools_status['httpx']['count'] = httpx_count[0]
+                    if httpx_count[0] == 1:
+                        self.logger.info(f"Streaming: first live web service after {time.time() - started_at:.1f}s")
+            
+            def feed_subdomain(subdomain):
+                with feed_lock:
+                    if subdomain in seen:
+                        return
+                    seen.add(subdomain)
+                    self.tools_status['merge']['count'] = len(seen)
+                subdomain_queue.put(subdomain)
+            
+            def add_live(host):
+                with live_lock:
+                    raw_out.write(f"{host}\n")
+                    live_subdomains.append(host)
+                    self.tools_status['dnsx']['count'] = len(live_subdomains)
+                live_queue.put(host)
+            
+            def pump_resolve():
+                try:
+                    for batch in stream_batches(subdomain_queue):
+                        cached = {}
+                        if cache:
+                            try:
+                                cached = cache.lookup(batch)
+                            except sqlite3.Error as e:
+                                self.logger.warning(f"Streaming: DNS cache lookup failed - {e}")
+                        for host in batch:
+                            if host in cached:
+                                if cached[host]:
+                                    add_live(host)
+                                continue
+                            dns_misses.append(host)
+                            try:
+                                dnsx_proc.stdin.write(f"{host}\n")
+                            except (BrokenPipeError, ValueError, OSError) as e:
+                                self.logger.debug(f"Streaming: dnsx stdin closed ({e})")
+                        try:
+                            dnsx_proc.stdin.flush()
+                        except (BrokenPipeError, ValueError, OSError):
+                            pass
+                finally:
+                    try:
+                        dnsx_proc.stdin.close()
+                    except (BrokenPipeError, OSError):
+                        pass
+            
+            def pump_dnsx():
+                try:
+                    for line in dnsx_proc.stdout:
+                        host = line.strip()
+                        if host:
+                            add_live(host)
+                finally:
+                    # Cache hits are queued by pump_resolve, which is done once dnsx's stdin is closed
+                    resolve_thread.join()
+                    live_queue.put(None)
+            
+            def pump_live():
+                try:
+                    with open(live_subs_file, 'w') as out:
+                        for batch in stream_batches(live_queue):
+                            kept = batch
+                            if wildcards:
+                                try:
+                                    kept = wildcards.filter(batch)
+                                except Exception as e:
+                                    self.logger.warning(f"Streaming: wildcard check failed, {len(batch)} hosts kept - {e}")
+                                self.tools_status['wildcard']['count'] = len(wildcards.dropped)
+                            cached = {}
+                            if probes and kept:
+                                try:
+                                    cached = probes.lookup(kept)
+                                except sqlite3.Error as e:
+                                    self.logger.warning(f"Streaming: probe cache lookup failed - {e}")
+                            for host in kept:
+                                out.write(f"{host}\n")
+                                kept_subdomains.append(host)
+                                if host in cached:
+                                    if cached[host]:
+                                        write_httpx_line(json.dumps(self._compact_httpx_record(cached[host])) + "\n")
+                                    continue
+                                http_misses.append(host)
+                                try:
+                                    httpx_proc.stdin.write(f"{host}\n")
+                                except (BrokenPipeError, ValueError, OSError) as e:
+                                    self.logger.debug(f"Streaming: httpx stdin closed ({e})")
+                            try:
+                                httpx_proc.stdin.flush()
+                            except (BrokenPipeError, ValueError, OSError):
+                                pass
+                finally:
+                    try:
+                        httpx_proc.stdin.close()
+                    except (BrokenPipeError, OSError):
+                        pass
+            
+            def pump_httpx():
+                for line in httpx_proc.stdout:
+                    if line.strip():
+                        write_httpx_line(line if line.endswith('\n') else f"{line}\n")
+            
+            def stream_enumerator(tool, argv, filename):
+                self.tools_status[tool]['status'] = 'running'
+                try:
+                    count = 0
+                    with open(os.path.join(self.scan_dir, filename), 'w') as out:
+                        def add_subdomain(subdomain):
+                            nonlocal count
+                            out.write(f"{subdomain}\n")
+                            count += 1
+                            self.tools_status[tool]['count'] = count
+                            feed_subdomain(subdomain)
+                        
+                        self.tool_runner.run(tool, argv, on_line=add_subdomain)
+                    self.tools_status[tool]['status'] = 'completed'
+                    self.logger.info(f"Streaming: {tool} finished with {count} subdomains")
+                except Exception as e:
+                    self.logger.error(f"Streaming: {tool} failed - {e}")
+                    self.tools_status[tool]['status'] = 'failed'
+            
+            def stream_sublist3r():
+                # sublist3r decorates its stdout, so feed its result file once it exits
+                try:
+                    self.run_single_tool('sublist3r')
+                except Exception:
+                    return
+                filepath = os.path.join(self.scan_dir, "sublist3r.txt")
+                if os.path.exists(filepath):
+                    with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
+                        for line in f:
+                            subdomain = line.strip()
+                            if subdomain:
+                                feed_subdomain(subdomain)
+            
+            resolve_thread = threading.Thread(target=pump_resolve, daemon=True)
+            pumps = [resolve_thread] + [
+                threading.Thread(target=pump, daemon=True) for pump in (pump_dnsx, pump_live, pump_httpx)
+            ]
+            for pump in pumps:
+                pump.start()
+            
+            try:
+                with concurrent.futures.ThreadPoolExecutor() as executor:
+                    futures = [
+                        executor.submit(stream_enumerator, tool, argv, filename)
+                        for tool, (argv, filename) in stream_commands.items()
+                    ]
+                    futures.append(executor.submit(stream_sublist3r))
+                    concurrent.futures.wait(futures)
+            finally:
+                # End of enumeration closes the chain: the cache lookups and dnsx drain, then the wildcard check, then httpx
+                subdomain_queue.put(None)
+                for pump in pumps:
+                    pump.join()
+        
+        if cache:
+            self.record_cache_stats('dns', len(seen) - len(dns_misses), len(dns_misses))
+            if dnsx_proc.returncode == 0:
+                # dnsx only reports live hosts; the rest of a clean run did not resolve
+                live = set(live_subdomains)
+                cache.store((host, {'live': True} if host in live else None) for host in dns_misses)
+        
+        # Materialize the same artifacts the file-based stages produce
+        self.subdomains = sorted(seen)
+        with open(subdomains_file, 'w') as f:
+            for subdomain in self.subdomains:
+                f.write(f"{subdomain}\n")
+        self.tools_status['merge']['count'] = len(self.subdomains)
+        self.tools_status['merge']['status'] = 'completed'
+        
+        self.tools_status['dnsx']['count'] = len(live_subdomains)
+        self.tools_status['dnsx']['status'] = 'completed'
+        
+        self.live_subdomains = kept_subdomains
+        with open(zones_file, 'w') as f:
+            json.dump({'zones': wildcards.zones(), 'dropped': wildcards.dropped} if wildcards
+                      else {'zones': {}, 'dropped': {}}, f)
+        self.tools_status['wildcard']['count'] = len(wildcards.dropped) if wildcards else 0
+        self.tools_status['wildcard']['status'] = 'completed'
+        
+        # Cache hits are not requests, so only httpx's own records tell about throttling
+        records = self.httpx_records(httpx_json)
+        probed = {normalize_url(host) for host in http_misses}
+        fresh = [data for data in records if normalize_url(data.get('input') or data['url']) in probed]
+        if probes:
+            self.record_cache_stats('http', len(kept_subdomains) - len(http_misses), len(http_misses))
+            answered = {normalize_url(data.get('input') or data['url']): data for data in fresh}
+            # Targets without a record only count as dead when httpx finished
+            probes.store(
+                (host, answered.get(normalize_url(host))) for host in http_misses
+                if httpx_proc.returncode == 0 or normalize_url(host) in answered
+            )
+        
+        self._load_httpx_results()
+        self.tools_status['httpx']['status'] = 'completed'
+        self.observe_http_stage('httpx', fresh)
         
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            futures = [executor.submit(self.run_single_tool, tool) for tool in tools]
-            concurrent.futures.wait(futures)
+        self.logger.info(
+            f"Streaming: {len(self.subdomains)} subdomains, {len(live_subdomains)} live, "
+            f"{len(live_subdomains) - len(kept_subdomains)} wildcard hosts dropped, "
+            f"{len(self.urls)} web services in {time.time() - started_at:.1f}s"
+        )
     
     def merge_subdomains(self):
         """Merge and deduplicate subdomains"""
+        budget = memory_budget_bytes(self.options)
+        if budget:
+            return self._merge_subdomains_external(budget)
+        
         unique_subdomains = set()
         
         for filename in ["subfinder-rescursive.txt", "findomain.txt", "assetfinder.txt", "sublist3r.txt"]:
@@ -813,6 +1609,32 @@ class DomScoutScanner:
         self.subdomains = list(sorted(unique_subdomains))
         return len(unique_subdomains)
     
+    def _merge_subdomains_external(self, budget):
+        """merge_subdomains() with sorted runs spilled to disk past the memory budget"""
+        with ExternalSorter(budget, self.scan_dir) as sorter:
+            for filename in ["subfinder-rescursive.txt", "findomain.txt", "assetfinder.txt", "sublist3r.txt"]:
+                filepath = os.path.join(self.scan_dir, filename)
+                if os.path.exists(filepath):
+                    try:
+                        with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
+                            for line in f:
+                                clean_line = line.strip()
+                                if clean_line:
+                                    sorter.add(clean_line)
+                    except Exception:
+                        pass
+            
+            self.subdomains = []
+            subdomains_file = os.path.join(self.scan_dir, "subdomains.txt")
+            with open(subdomains_file, 'w') as f:
+                for subdomain in sorter.unique():
+                    f.write(f"{subdomain}\n")
+                    self.subdomains.append(subdomain)
+            
+            if sorter.spilled_runs:
+                self.logger.info(f"Merge: sorted {sorter.count} subdomains in {sorter.spilled_runs} spilled runs")
+        return len(self.subdomains)
+    
     def run_dnsx(self):
         """Run dnsx for DNS resolution"""
         subdomains_file = os.path.join(self.scan_dir, "subdomains.txt")
@@ -821,81 +1643,379 @@ class DomScoutScanner:
         if not os.path.exists(subdomains_file) or os.path.getsize(subdomains_file) == 0:
             return
         
-        resolvers_abs = os.path.abspath(self.resolvers_file)
-        dnsx_cmd = f"dnsx -l {subdomains_file} -r {resolvers_abs} -o {live_subs_file}"
+        with open(subdomains_file, 'r', encoding='utf-8', errors='ignore') as f:
+            hosts = list(dict.fromkeys(line.strip() for line in f if line.strip()))
         
-        try:
-            subprocess.run(
-                dnsx_cmd,
-                shell=True,
-                check=True,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.PIPE,
-                cwd=self.scan_dir
+        # Hosts resolved recently by any scan are not sent to the resolvers again
+        cache = self.dns_cache()
+        cached = cache.lookup(hosts) if cache else {}
+        misses = [host for host in hosts if host not in cached]
+        if cache:
+            self.record_cache_stats('dns', len(hosts) - len(misses), len(misses))
+        
+        if self.dns_engine == 'builtin':
+            self.run_builtin_dns(misses, live_subs_file, cached=cached, cache=cache)
+            return
+        
+        cached_live = [host for host, record in cached.items() if record]
+        if misses:
+            misses_file = subdomains_file
+            if cached:
+                misses_file = os.path.join(self.scan_dir, "dns_misses.txt")
+                with open(misses_file, 'w') as f:
+                    f.write('\n'.join(misses) + '\n')
+            
+            # dnsx gets the healthy subset, faster resolvers listed more than once
+            resolvers_abs = os.path.join(self.scan_dir, "resolvers_selected.txt")
+            write_resolvers_file(resolvers_abs, self.select_resolvers())
+            result = self.run_tool(
+                'dnsx',
+                ['dnsx', '-l', misses_file, '-r', resolvers_abs, '-o', live_subs_file],
+                output_file=os.devnull
             )
-        except subprocess.CalledProcessError:
-            pass
+            if result is not None and result.returncode == 0 and cache and os.path.exists(live_subs_file):
+                # dnsx only reports live hosts; the rest of a clean run did not resolve
+                with open(live_subs_file, 'r') as f:
+                    live = {line.strip() for line in f if line.strip()}
+                cache.store((host, {'live': True} if host in live else None) for host in misses)
+        elif os.path.exists(live_subs_file):
+            os.remove(live_subs_file)
+        
+        if cached_live:
+            with open(live_subs_file, 'a') as f:
+                for host in cached_live:
+                    f.write(f"{host}\n")
+    
+    def dns_cache(self):
+        """Cross-scan DNS cache configured from the scan options (None when disabled)"""
+        path = self.options.get('dns_cache_file')
+        max_age = float(self.options.get('dns_cache_max_age', 3600))
+        if not path or max_age <= 0:
+            return None
+        return DNSCache(
+            path,
+            max_age=max_age,
+            negative_max_age=float(self.options.get('dns_cache_negative_max_age', 600)),
+            honor_ttl=bool(self.options.get('dns_cache_honor_ttl', False))
+        )
+    
+    def record_cache_stats(self, name, hits, misses):
+        """Keep and log the hit rate of one cross-scan cache for this scan"""
+        total = hits + misses
+        self.cache_stats[name] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / total, 4) if total else 0.0
+        }
+        self.logger.info(
+            f"Cache ({name}): {hits} hits, {misses} misses "
+            f"({self.cache_stats[name]['hit_rate']:.0%} hit rate)"
+        )
+    
+    def probe_cache(self):
+        """Cross-scan HTTP probe cache configured from the scan options (None when disabled)"""
+        path = self.options.get('http_cache_file')
+        max_age = float(self.options.get('http_cache_max_age', 86400))
+        if not path or max_age <= 0:
+            return None
+        return ProbeCache(
+            path,
+            max_age=max_age,
+            negative_max_age=float(self.options.get('http_cache_negative_max_age', 0))
+        )
+    
+    def probe_with_cache(self, name, input_file, output_json, probe):
+        """Send only the targets in input_file without a fresh cache entry to probe()
+        
+        probe(targets_file) runs the prober with httpx JSON-lines output to
+        output_json and returns True when the run completed. Cached records
+        are appended to output_json afterwards, so readers of the file see
+        every target. Returns the cached records.
+        """
+        cache = self.probe_cache()
+        if cache is None:
+            probe(input_file)
+            return []
+        
+        with open(input_file, 'r', encoding='utf-8', errors='ignore') as f:
+            targets = list(dict.fromkeys(line.strip() for line in f if line.strip()))
+        cached = cache.lookup(targets)
+        misses = [target for target in targets if target not in cached]
+        self.record_cache_stats(name, len(targets) - len(misses), len(misses))
+        
+        if misses:
+            misses_file = os.path.join(self.scan_dir, f"{name}_misses.txt")
+            with open(misses_file, 'w') as f:
+                f.write('\n'.join(misses) + '\n')
+            completed = probe(misses_file)
+            
+            records = self.httpx_records(output_json)
+            answered = {normalize_url(data.get('input') or data['url']): data for data in records}
+            # Targets without a record only count as dead when the prober finished
+            cache.store(
+                (target, answered.get(normalize_url(target))) for target in misses
+                if completed or normalize_url(target) in answered
+            )
+        else:
+            records = []
+        
+        hits = list({
+            normalize_url(target): self._compact_httpx_record(record)
+            for target, record in cached.items() if record
+        }.values())
+        with self._httpx_records_lock:
+            with open(output_json, 'a' if misses else 'w') as f:
+                for record in hits:
+                    f.write(json.dumps(record) + '\n')
+            # The file now holds records + hits; no need to parse it again
+            self._remember_httpx_records(output_json, records + hits)
+        return hits
+    
+    def resolver_pool(self):
+        """Resolver health stats configured from the scan options"""
+        return ResolverPool.from_options(self.options)
+    
+    def select_resolvers(self):
+        """Healthy, fastest resolvers from resolvers.txt as [((host, port), weight), ...]
+        
+        Resolvers whose stats are missing or older than resolver_check_interval
+        are health-checked first. Falls back to the whole list when none is
+        healthy or resolver_health is off.
+        """
+        addresses = load_nameservers(os.path.abspath(self.resolvers_file))
+        if not self.options.get('resolver_health', True):
+            return [(address, 1.0) for address in addresses]
+        
+        pool = self.resolver_pool()
+        stale = pool.stale(addresses)
+        if stale:
+            started_at = time.time()
+            pool.check(stale)
+            pool.save()
+            self.logger.info(f"Resolvers: health-checked {len(stale)} resolvers in {time.time() - started_at:.1f}s")
+        
+        selected = pool.select(addresses)
+        if not selected:
+            self.logger.warning("Resolvers: no healthy resolver, using the full list")
+            return [(address, 1.0) for address in addresses]
+        
+        unhealthy = {}
+        for entry in pool.report(addresses):
+            if entry['health'] != 'healthy':
+                unhealthy[entry['resolver']] = entry['health']
+        self.logger.info(
+            f"Resolvers: using {len(selected)}/{len(addresses)} resolvers"
+            + (f", skipped {', '.join(f'{key} ({health})' for key, health in unhealthy.items())}" if unhealthy else '')
+        )
+        return selected
+    
+    def run_builtin_dns(self, hosts, live_subs_file, cached=None, cache=None):
+        """Resolve hosts with the in-process asyncio resolver
+        
+        Writes live hosts to live_subs.txt as they resolve (updating the dnsx
+        count live) and their A/AAAA/CNAME answers to dns_records.json.
+        Hosts in cached (fresh cache entries) are written without a lookup,
+        and new answers are stored in cache.
+        """
+        cached = cached or {}
+        records_file = os.path.join(self.scan_dir, "dns_records.json")
+        live = 0
+        started_at = time.time()
+        stats = None
+        resolved = []
+        
+        with open(live_subs_file, 'w') as live_out, open(records_file, 'w') as records_out:
+            for host, record in cached.items():
+                if record:
+                    live_out.write(f"{host}\n")
+                    # Entries cached from dnsx runs know the host is live, not its answers
+                    if record['a'] or record['aaaa']:
+                        records_out.write(json.dumps(record) + "\n")
+                    live += 1
+            self.tools_status['dnsx']['count'] = live
+            
+            def on_result(host, record):
+                nonlocal live
+                if record is not None:
+                    resolved.append((host, record))
+                if record and (record['a'] or record['aaaa']):
+                    live_out.write(f"{host}\n")
+                    records_out.write(json.dumps(record) + "\n")
+                    live += 1
+                    self.tools_status['dnsx']['count'] = live
+            
+            if hosts:
+                selected = self.select_resolvers()
+                stats = resolve_hosts(
+                    hosts,
+                    [address for address, _ in selected],
+                    on_result,
+                    concurrency_per_resolver=int(self.options.get('dns_concurrency', 50)),
+                    timeout=float(self.options.get('dns_timeout', 2.0)),
+                    retries=int(self.options.get('dns_retries', 2)),
+                    weights=[weight for _, weight in selected]
+                )
+        
+        if cache and resolved:
+            cache.store(resolved)
+        
+        if stats is None:
+            self.logger.info(f"DNS: {live} live hosts, all {len(cached)} answered from cache")
+            return
+        
+        # Answers from a real run are the best health signal for the next selection
+        if self.options.get('resolver_health', True):
+            pool = self.resolver_pool()
+            pool.record_run(stats['nameservers'])
+            pool.save()
+        
+        elapsed = time.time() - started_at
+        self.logger.info(
+            f"DNS: {live}/{len(hosts) + len(cached)} hosts live ({len(hosts)} resolved with "
+            f"{len(stats['nameservers'])} resolvers in {elapsed:.1f}s, {len(cached)} from cache; "
+            f"{stats['queries']} queries, {stats['retries']} retries, {stats['failed']} unanswered)"
+        )
     
     def run_httpx(self):
         """Run httpx to find alive web services with stealth flags"""
         live_subs_file = os.path.join(self.scan_dir, "live_subs.txt")
-        alive_file = os.path.join(self.scan_dir, "alive_webservices.txt")
         httpx_json = os.path.join(self.scan_dir, "httpx_output.json")
         
         if not os.path.exists(live_subs_file) or os.path.getsize(live_subs_file) == 0:
-            print("HTTPx: live_subs.txt not found or empty")
+            self.logger.warning("HTTPx: live_subs.txt not found or empty")
             return
         
+        def probe(targets_file):
+            if self.http_engine == 'builtin':
+                self.run_builtin_http(targets_file, httpx_json, tool='httpx')
+                completed = True
+            else:
+                try:
+                    result = self.tool_runner.run(
+                        'httpx', self._httpx_probe_command() + ['-o', httpx_json],
+                        input_file=targets_file, output_file=os.devnull
+                    )
+                except subprocess.TimeoutExpired as e:
+                    self.logger.error(f"HTTPx timed out after {e.timeout}s")
+                    completed = False
+                else:
+                    self.logger.info(f"HTTPx completed with exit code: {result.returncode}")
+                    if result.stderr:
+                        self.logger.debug(f"HTTPx stderr: {result.stderr[:200]}")
+                    completed = result.returncode == 0
+            # Bare hosts often have no web server, so only the responses tell about throttling here
+            self.observe_http_stage('httpx', self.httpx_records(httpx_json))
+            return completed
+        
+        try:
+            # alive_webservices.txt is written from the parsed output by _load_httpx_results
+            self.probe_with_cache('http', live_subs_file, httpx_json, probe)
+        except Exception as e:
+            self.logger.error(f"HTTPx error: {e}")
+    
+    def run_builtin_http(self, input_file, output_json, on_record=None, tool=None, stage='httpx'):
+        """Probe the targets in input_file with the in-process asyncio prober
+        
+        Records are written to output_json in httpx JSON-lines format as they
+        complete (updating tool's count live, if given) and passed to on_record.
+        The rate comes from the scan's rate governor and, on the server, the
+        stage's live share of the global request budget. Returns the prober
+        stats plus the number of live records ('live').
+        """
+        with open(input_file, 'r', encoding='utf-8', errors='ignore') as f:
+            targets = [line.strip() for line in f if line.strip()]
+        
+        # Reuse addresses from the built-in DNS engine instead of resolving again
+        resolve = {}
+        records_file = os.path.join(self.scan_dir, "dns_records.json")
+        if os.path.exists(records_file):
+            with open(records_file, 'r') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if record.get('a'):
+                        resolve[record['host']] = record['a'][0]
+        
+        live = 0
+        started_at = time.time()
+        
+        with open(output_json, 'w') as out:
+            def write_record(record):
+                nonlocal live
+                out.write(json.dumps(record) + "\n")
+                live += 1
+                if tool:
+                    self.tools_status[tool]['count'] = live
+                if on_record:
+                    on_record(record)
+            
+            stats = probe_targets(
+                targets,
+                write_record,
+                concurrency=int(self.options.get('http_concurrency', 100)),
+                per_host_concurrency=int(self.options.get('http_concurrency_per_host', 4)),
+                timeout=float(self.options.get('http_timeout', 10)),
+                retries=int(self.options.get('http_retries', 2)),
+                rate_limit=self.rate_governor.current(stage),
+                pacer=self.rate_governor.pacer(stage),
+                max_idle_per_host=int(self.options.get('http_pool_size', 4)),
+                user_agent=self.get_random_user_agent(),
+                resolve=resolve
+            )
+        
+        elapsed = time.time() - started_at
+        self.logger.info(
+            f"HTTP probe: {live}/{len(targets)} targets live in {elapsed:.1f}s "
+            f"({stats['requests']} requests over {stats['connections']} connections, "
+            f"{stats['reused']} reused)"
+        )
+        return dict(stats, live=live)
+    
+    def observe_http_stage(self, stage, records, timeouts=0):
+        """Feed the responses of one HTTP stage to the rate governor and log the rate for the next"""
+        responses, throttled, server_errors = response_counts(records)
+        before = self.rate_governor.current()
+        self.rate_governor.observe(stage, responses, throttled, server_errors, timeouts)
+        if responses or timeouts:
+            self.logger.info(
+                f"Rate: {stage} got {throttled} 429s, {server_errors} 5xx and {timeouts} timeouts "
+                f"over {responses + timeouts} requests; rate {before} -> {self.rate_governor.current()} req/s"
+            )
+    
+    def _httpx_probe_command(self):
+        """Build the httpx-toolkit probe argv; targets are read from stdin"""
         # Build user agent option
         if self.rotate_user_agents:
             user_agent = self.get_random_user_agent()
-            ua_option = f"-H 'User-Agent: {user_agent}'"
+            ua_option = ['-H', f"User-Agent: {user_agent}"]
             self.logger.info(f"HTTPx: Using custom user agent rotation")
         else:
-            ua_option = "-random-agent"
+            ua_option = ['-random-agent']
         
         # Run httpx with stealth flags to bypass WAFs/Cloudflare
         # -random-agent OR custom UA: user agent
         # -H Custom headers to bypass protections
         # -retries 2: retry failed requests
         # -timeout 10: reasonable timeout
-        # -rl 150: rate limit to avoid detection
-        httpx_cmd = f"""cat {live_subs_file} | httpx-toolkit \
-            -silent \
-            -json \
-            -td \
-            {ua_option} \
-            -H 'Accept: text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8' \
-            -H 'Accept-Language: en-US,en;q=0.5' \
-            -H 'Accept-Encoding: gzip, deflate' \
-            -H 'DNT: 1' \
-            -H 'Connection: keep-alive' \
-            -H 'Upgrade-Insecure-Requests: 1' \
-            -retries 2 \
-            -timeout 10 \
-            -rl 150 \
-            -o {httpx_json}"""
-        
-        try:
-            result = subprocess.run(httpx_cmd, shell=True, capture_output=True, text=True, cwd=self.scan_dir)
-            print(f"HTTPx completed with exit code: {result.returncode}")
-            if result.stderr:
-                print(f"HTTPx stderr: {result.stderr[:200]}")
-                
-            # Create simple URL list
-            if os.path.exists(httpx_json):
-                with open(alive_file, 'w') as outfile:
-                    with open(httpx_json, 'r') as jsonfile:
-                        for line in jsonfile:
-                            try:
-                                data = json.loads(line)
-                                if 'url' in data:
-                                    outfile.write(data['url'] + '\n')
-                            except json.JSONDecodeError:
-                                pass
-                print(f"HTTPx: Created {alive_file}")
-        except Exception as e:
-            print(f"HTTPx error: {e}")
+        # -rl: rate limit from the scan's rate governor, to avoid detection
+        return [
+            'httpx-toolkit',
+            '-silent',
+            '-json',
+            '-td',
+            *ua_option,
+            '-H', 'Accept: text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+            '-H', 'Accept-Language: en-US,en;q=0.5',
+            '-H', 'Accept-Encoding: gzip, deflate',
+            '-H', 'DNT: 1',
+            '-H', 'Connection: keep-alive',
+            '-H', 'Upgrade-Insecure-Requests: 1',
+            '-retries', '2',
+            '-timeout', '10',
+            *self.rate_governor.flags('httpx').split()
+        ]
     
     def _run_gau(self):
         """Run GAU to extract URLs with stealth"""
@@ -920,7 +2040,6 @@ class DomScoutScanner:
                     url = line.strip()
                     if url:
                         # Extract domain from URL without port
-                        from urllib.parse import urlparse
                         parsed = urlparse(url)
                         domain = parsed.netloc
                         if domain:
@@ -946,41 +2065,64 @@ class DomScoutScanner:
         
         # Run GAU on each domain with stealth settings
         # --blacklist: skip certain extensions
-        # --threads: parallel processing
+        # --threads: parallel processing, from the scan's rate governor
         # --timeout: avoid hanging
         # --providers: use multiple sources
-        all_urls = set()
-        for domain in domains:
-            gau_cmd = f"echo {domain} | {gau_bin} --threads 5 --timeout 20 --blacklist ttf,woff,woff2,svg,eot --providers wayback,commoncrawl,otx,urlscan"
-            try:
-                self.logger.debug(f"GAU: Running for domain: {domain}")
-                result = subprocess.run(
-                    gau_cmd,
-                    shell=True,
-                    capture_output=True,
-                    text=True,
-                    timeout=120,
-                    cwd=self.scan_dir,
-                    env=env
-                )
-                if result.stdout:
-                    for url in result.stdout.strip().split('\n'):
-                        if url.strip():
-                            all_urls.add(url.strip())
-                    self.logger.debug(f"GAU: Found {len(all_urls)} total URLs so far for {domain}")
-                if result.stderr:
-                    self.logger.debug(f"GAU stderr for {domain}: {result.stderr[:200]}")
-            except Exception as e:
-                self.logger.error(f"Error running GAU for {domain}: {e}")
-                continue
+        workers = max(1, int(self.options.get('gau_workers', 8)))
+        domain_timeout = int(self.options.get('gau_timeout', self.tool_runner.timeouts['gau']))
+        
+        # With a merge memory budget, URLs go to a disk-spilling sorter instead of a set
+        budget = memory_budget_bytes(self.options)
+        all_urls = ExternalSorter(budget, self.scan_dir) if budget else set()
+        urls_lock = threading.Lock()
+        
+        def found_count():
+            # The sorter counts every URL; duplicates only go away in the final merge
+            return all_urls.count if budget else len(all_urls)
+        
+        def add_url(url):
+            with urls_lock:
+                all_urls.add(url)
+                self.tools_status['gau']['count'] = found_count()
+        
+        gau_argv = [
+            gau_bin, *self.rate_governor.flags('gau').split(), '--timeout', '20',
+            '--blacklist', 'ttf,woff,woff2,svg,eot', '--providers', 'wayback,commoncrawl,otx,urlscan'
+        ]
+        
+        def fetch_domain(domain):
+            self.logger.debug(f"GAU: Running for domain: {domain}")
+            result = self.tool_runner.run(
+                'gau', gau_argv, input=f"{domain}\n", on_line=add_url,
+                timeout=domain_timeout, env=env, stderr_limit=200
+            )
+            if result.stderr:
+                self.logger.debug(f"GAU stderr for {domain}: {result.stderr}")
+        
+        # Domains run on a bounded pool; URLs are collected as gau prints them
+        self.logger.info(f"GAU: Using {min(workers, len(domains))} workers, {domain_timeout}s timeout per domain")
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(workers, len(domains)) or 1) as executor:
+            futures = {executor.submit(fetch_domain, domain): domain for domain in sorted(domains)}
+            for future in concurrent.futures.as_completed(futures):
+                domain = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    self.logger.error(f"Error running GAU for {domain}: {e}")
+                    continue
+                self.logger.debug(f"GAU: Found {found_count()} total URLs so far after {domain}")
         
         # Write results
+        total = 0
         with open(gau_output, 'w') as f:
-            for url in sorted(all_urls):
+            for url in (all_urls.unique() if budget else sorted(all_urls)):
                 f.write(f"{url}\n")
+                total += 1
+        if budget:
+            all_urls.close()
         
-        self.logger.info(f"GAU: Total {len(all_urls)} URLs saved to {gau_output}")
-        self.tools_status['gau']['count'] = len(all_urls)
+        self.logger.info(f"GAU: Total {total} URLs saved to {gau_output}")
+        self.tools_status['gau']['count'] = total
     
     def _run_gospider(self):
         """Run gospider to extract URLs with stealth settings"""
@@ -1005,14 +2147,14 @@ class DomScoutScanner:
         # Build user agent option
         if self.rotate_user_agents:
             user_agent = self.get_random_user_agent()
-            ua_option = f"-H 'User-Agent: {user_agent}'"
+            ua_option = ['-H', f"User-Agent: {user_agent}"]
             self.logger.info(f"GoSpider: Using custom user agent rotation")
         else:
-            ua_option = "-u web"
+            ua_option = ['-u', 'web']
         
         # Run gospider with stealth flags
         # -S: sites list file
-        # -c: concurrent requests (lower to avoid detection)
+        # -c/-t: concurrent requests per site / sites in parallel, from the scan's rate governor
         # -d: depth  
         # --sitemap --robots: crawl sitemap and robots.txt
         # -m: timeout in seconds
@@ -1020,46 +2162,52 @@ class DomScoutScanner:
         # -u web OR custom UA: user-agent
         # --blacklist: regex pattern to filter static files
         # -a: enable other sources (Archive.org, CommonCrawl, etc.)
-        gospider_cmd = f"{gospider_bin} -S {alive_file} -c 5 -d 3 --sitemap --robots -m 20 -q {ua_option} --blacklist '\\.(css|png|jpeg|jpg|svg|img|gif|mp4|flv|ogv|webm|webp|woff|woff2|ttf|eot|otf|ico)$' -a"
+        gospider_argv = [
+            gospider_bin, '-S', alive_file, *self.rate_governor.flags('gospider').split(),
+            '-d', '3', '--sitemap', '--robots', '-m', '20', '-q', *ua_option,
+            '--blacklist', r'\.(css|png|jpeg|jpg|svg|img|gif|mp4|flv|ogv|webm|webp|woff|woff2|ttf|eot|otf|ico)$', '-a'
+        ]
+        
+        # With a merge memory budget, URLs go to a disk-spilling sorter instead of a set
+        budget = memory_budget_bytes(self.options)
+        urls = ExternalSorter(budget, self.scan_dir) if budget else set()
+        
+        def add_line(line):
+            # Parse gospider output (format: [url_type] - url) as it is printed
+            url = None
+            if ' - ' in line:
+                url = line.split(' - ', 1)[1].strip()
+                if not url.startswith('http'):
+                    url = None
+            # Also handle simple URL lines
+            elif line.startswith('http'):
+                url = line
+            if url:
+                urls.add(url)
+                # The sorter counts every URL; duplicates only go away when writing
+                self.tools_status['gospider']['count'] = urls.count if budget else len(urls)
         
         try:
-            self.logger.debug(f"GoSpider: Running command: {gospider_cmd}")
-            result = subprocess.run(
-                gospider_cmd,
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=600,  # 10 minutes timeout (gospider can be slow)
-                cwd=self.scan_dir
-            )
-            
-            self.logger.info(f"GoSpider completed with exit code: {result.returncode}")
-            if result.stderr:
-                self.logger.debug(f"GoSpider stderr: {result.stderr[:500]}")
-            
-            # Parse gospider output (format: [url_type] - url)
-            urls = set()
-            if result.stdout:
-                for line in result.stdout.strip().split('\n'):
-                    if line.strip():
-                        # Extract URL from gospider format: [type] - url
-                        if ' - ' in line:
-                            parts = line.split(' - ', 1)
-                            if len(parts) >= 2:
-                                url = parts[1].strip()
-                                if url and url.startswith('http'):
-                                    urls.add(url)
-                        # Also handle simple URL lines
-                        elif line.strip().startswith('http'):
-                            urls.add(line.strip())
+            try:
+                # Killed after the gospider tool timeout (10 minutes by default; it can be slow)
+                result = self.tool_runner.run('gospider', gospider_argv, on_line=add_line)
+                self.logger.info(f"GoSpider completed with exit code: {result.returncode}")
+                if result.stderr:
+                    self.logger.debug(f"GoSpider stderr: {result.stderr}")
+            except subprocess.TimeoutExpired as e:
+                self.logger.warning(f"GoSpider: timed out after {e.timeout}s, keeping the URLs found so far")
             
             # Write results
+            total = 0
             with open(gospider_output, 'w') as f:
-                for url in sorted(urls):
+                for url in (urls.unique() if budget else sorted(urls)):
                     f.write(f"{url}\n")
+                    total += 1
+            if budget:
+                urls.close()
             
-            self.logger.info(f"GoSpider: Total {len(urls)} URLs saved to {gospider_output}")
-            self.tools_status['gospider']['count'] = len(urls)
+            self.logger.info(f"GoSpider: Total {total} URLs saved to {gospider_output}")
+            self.tools_status['gospider']['count'] = total
         except Exception as e:
             self.logger.error(f"Error running gospider: {e}")
             import traceback
@@ -1067,6 +2215,10 @@ class DomScoutScanner:
     
     def _run_merge2(self):
         """Merge all URLs from httpx, GAU, and gospider"""
+        budget = memory_budget_bytes(self.options)
+        if budget:
+            return self._run_merge2_external(budget)
+        
         canonical_map = {}
         filtered_images = 0
         
@@ -1095,7 +2247,7 @@ class DomScoutScanner:
                                 elif self._is_better_url_candidate(url, existing):
                                     canonical_map[canonical] = url
                 except Exception as e:
-                    print(f"Error reading {filepath}: {e}")
+                    self.logger.error(f"Merge2: error reading {filepath}: {e}")
         
         # Save merged URLs
         merged_file = os.path.join(self.scan_dir, "all_urls_merged.txt")
@@ -1109,6 +2261,68 @@ class DomScoutScanner:
         self.tools_status['merge2']['count'] = len(canonical_map)
         return len(canonical_map)
 
+    def _run_merge2_external(self, budget):
+        """_run_merge2() with sorted runs spilled to disk past the memory budget
+
+        URLs are sorted by (canonical URL, arrival order), so each canonical
+        group is folded through _is_better_url_candidate in the same order as
+        the in-memory merge; the chosen URLs are then sorted in a second pass.
+        """
+        filtered_images = 0
+        url_files = [
+            os.path.join(self.scan_dir, "alive_webservices.txt"),
+            os.path.join(self.scan_dir, "gau_urls.txt"),
+            os.path.join(self.scan_dir, "gospider_urls.txt")
+        ]
+        
+        # Both sorters are alive during the fold, so each gets half the budget
+        with ExternalSorter(budget // 2, self.scan_dir) as by_canonical, \
+                ExternalSorter(budget // 2, self.scan_dir) as chosen:
+            seq = 0
+            for filepath in url_files:
+                if os.path.exists(filepath):
+                    try:
+                        with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
+                            for line in f:
+                                url = line.strip()
+                                if url:
+                                    if self._is_image_url(url):
+                                        filtered_images += 1
+                                        continue
+                                    by_canonical.add((self._canonicalize_url_for_dedupe(url), seq, url))
+                                    seq += 1
+                    except Exception as e:
+                        self.logger.error(f"Merge2: error reading {filepath}: {e}")
+            
+            current_canonical = best = None
+            for canonical, _, url in by_canonical:
+                if best is not None and canonical == current_canonical:
+                    if self._is_better_url_candidate(url, best):
+                        best = url
+                    continue
+                if best is not None:
+                    chosen.add(best)
+                current_canonical, best = canonical, url
+            if best is not None:
+                chosen.add(best)
+            
+            count = 0
+            merged_file = os.path.join(self.scan_dir, "all_urls_merged.txt")
+            with open(merged_file, 'w') as f:
+                for url in chosen:
+                    f.write(f"{url}\n")
+                    count += 1
+            
+            spilled = by_canonical.spilled_runs + chosen.spilled_runs
+            if spilled:
+                self.logger.info(f"Merge2: merged {by_canonical.count} URLs using {spilled} spilled runs")
+
+        if filtered_images:
+            self.logger.info(f"Merge2: filtered out {filtered_images} image URLs")
+        
+        self.tools_status['merge2']['count'] = count
+        return count
+
     def _is_image_url(self, url):
         """Return True when URL path points to an image asset."""
         try:
@@ -1171,31 +2385,69 @@ class DomScoutScanner:
             self.logger.warning("URL enrichment skipped: all_urls_merged.txt missing or empty")
             return
 
+        # URLs httpx probed earlier in this scan already have their metadata in self.urls
+        with open(merged_file, 'r', encoding='utf-8', errors='ignore') as f:
+            merged_urls = list(dict.fromkeys(line.strip() for line in f if line.strip()))
+        probed = {normalize_url(item['url']) for item in self.urls if item.get('url')}
+        new_urls = [url for url in merged_urls if normalize_url(url) not in probed]
+        self.logger.info(
+            f"URL enrichment: {len(merged_urls) - len(new_urls)} URLs already probed by httpx (skipped), "
+            f"{len(new_urls)} new URLs to probe"
+        )
+        if not new_urls:
+            open(enriched_json, 'w').close()
+            return
+        targets_file = merged_file
+        if len(new_urls) < len(merged_urls):
+            targets_file = os.path.join(self.scan_dir, "enrich_targets.txt")
+            with open(targets_file, 'w') as f:
+                f.write('\n'.join(new_urls) + '\n')
+
+        enriched_urls = []
+        if self.http_engine == 'builtin':
+            # Records come straight from the prober; no need to re-read the JSON file
+            self.logger.info("URL enrichment: probing new URLs with the built-in prober")
+            
+            def probe(targets_file):
+                stats = self.run_builtin_http(
+                    targets_file, enriched_json,
+                    on_record=lambda record: enriched_urls.append(self._enriched_url_entry(record)),
+                    stage='enrich'
+                )
+                # These URLs were crawled from live sites, so timeouts count against the rate too
+                self.observe_http_stage('enrich', enriched_urls, timeouts=stats['timeouts'])
+                return True
+            
+            try:
+                cached = self.probe_with_cache('enrich', targets_file, enriched_json, probe)
+            except Exception as e:
+                self.logger.error(f"URL enrichment error: {e}")
+                return
+            enriched_urls.extend(self._enriched_url_entry(record) for record in cached)
+            self._merge_enriched_urls(enriched_urls)
+            return
+
         if self.rotate_user_agents:
             user_agent = self.get_random_user_agent()
-            ua_option = f"-H 'User-Agent: {user_agent}'"
+            ua_option = ['-H', f"User-Agent: {user_agent}"]
         else:
-            ua_option = "-random-agent"
-
-        enrich_cmd = f"""cat {merged_file} | httpx-toolkit \
-            -silent \
-            -json \
-            -td \
-            -title \
-            -server \
-            -cl \
-            {ua_option} \
-            -retries 2 \
-            -timeout 10 \
-            -rl {self.rate_limit} \
-            -o {enriched_json}"""
-
-        self.logger.info("URL enrichment: running httpx over merged URLs")
+            ua_option = ['-random-agent']
+
+        def probe(targets_file):
+            enrich_argv = [
+                'httpx-toolkit', '-silent', '-json', '-td', '-title', '-server', '-cl', *ua_option,
+                '-retries', '2', '-timeout', '10', *self.rate_governor.flags('enrich').split(),
+                '-o', enriched_json
+            ]
+            result = self.run_tool('enrich', enrich_argv, input_file=targets_file, output_file=os.devnull)
+            if result is not None:
+                self.logger.info(f"URL enrichment: httpx exit code {result.returncode}")
+            self.observe_http_stage('enrich', self.httpx_records(enriched_json))
+            return result is not None and result.returncode == 0
+
+        self.logger.info("URL enrichment: running httpx over new URLs")
         try:
-            result = subprocess.run(enrich_cmd, shell=True, capture_output=True, text=True, cwd=self.scan_dir)
-            self.logger.info(f"URL enrichment: httpx exit code {result.returncode}")
-            if result.stderr:
-                self.logger.debug(f"URL enrichment stderr: {result.stderr[:400]}")
+            self.probe_with_cache('enrich', targets_file, enriched_json, probe)
         except Exception as e:
             self.logger.error(f"URL enrichment error: {e}")
             return
@@ -1204,35 +2456,32 @@ class DomScoutScanner:
             self.logger.warning("URL enrichment output not generated")
             return
 
-        enriched_urls = []
         try:
-            with open(enriched_json, 'r') as f:
-                for line in f:
-                    try:
-                        data = json.loads(line)
-                    except json.JSONDecodeError:
-                        continue
-
-                    url = data.get('url')
-                    if not url:
-                        continue
-
-                    technologies = data.get('tech') or data.get('technologies') or []
-                    if isinstance(technologies, str):
-                        technologies = [item.strip() for item in technologies.split(',') if item.strip()]
-
-                    enriched_urls.append({
-                        'url': url,
-                        'status_code': data.get('status_code') or data.get('status-code'),
-                        'title': data.get('title'),
-                        'webserver': data.get('webserver'),
-                        'technologies': technologies,
-                        'content_length': data.get('content_length') or data.get('content-length')
-                    })
+            records = self.httpx_records(enriched_json)
         except Exception as e:
             self.logger.error(f"URL enrichment parse error: {e}")
             return
+        enriched_urls.extend(self._enriched_url_entry(data) for data in records)
+
+        self._merge_enriched_urls(enriched_urls)
+
+    @staticmethod
+    def _enriched_url_entry(data):
+        """URL metadata entry from one httpx JSON record"""
+        technologies = data.get('tech') or data.get('technologies') or []
+        if isinstance(technologies, str):
+            technologies = [item.strip() for item in technologies.split(',') if item.strip()]
 
+        return {
+            'url': data.get('url'),
+            'status_code': data.get('status_code') or data.get('status-code'),
+            'title': data.get('title'),
+            'webserver': data.get('webserver'),
+            'technologies': technologies,
+            'content_length': data.get('content_length') or data.get('content-length')
+        }
+
+    def _merge_enriched_urls(self, enriched_urls):
         if enriched_urls:
             by_url = {item['url']: item for item in self.urls if item.get('url')}
             for item in enriched_urls:
@@ -1283,34 +2532,27 @@ class DomScoutScanner:
         # --write-db: output to SQLite database (needed for results)
         # --delay: delay between requests  
         # --timeout: timeout for page load
-        # --threads: parallel processing
+        # --threads: parallel processing, from the scan's rate governor
         # --chrome-user-agent: custom user agent  
-        gowitness_cmd = (
-            f"{gowitness_bin} scan file -f {alive_file} "
-            f"--threads 10 "
-            f"--delay 3 "
-            f"--timeout 30 "
-            f"--screenshot-path {scan_screenshots_dir}/ "
-            f"--write-db "
-            f"--write-db-uri sqlite://{gowitness_db} "
-            f"--chrome-user-agent '{user_agent}'"
-        )
+        gowitness_argv = [
+            gowitness_bin, 'scan', 'file', '-f', alive_file,
+            *self.rate_governor.flags('gowitness').split(),
+            '--delay', '3',
+            '--timeout', '30',
+            '--screenshot-path', f"{scan_screenshots_dir}/",
+            '--write-db',
+            '--write-db-uri', f"sqlite://{gowitness_db}",
+            '--chrome-user-agent', user_agent
+        ]
         
         chrome_path = self.get_chrome_path()
         if chrome_path:
-            gowitness_cmd += f' --chrome-path "{chrome_path}"'
+            gowitness_argv += ['--chrome-path', chrome_path]
             self.logger.debug(f"GoWitness: Using Chrome at {chrome_path}")
         
         try:
-            self.logger.debug(f"GoWitness: Running command (truncated): {gowitness_cmd[:200]}...")
-            result = subprocess.run(
-                gowitness_cmd,
-                shell=True,
-                capture_output=True,
-                cwd=self.scan_dir,
-                text=True,
-                timeout=600  # 10 minutes max
-            )
+            # Killed after the gowitness tool timeout (10 minutes by default)
+            result = self.tool_runner.run('gowitness', gowitness_argv)
             self.logger.info(f"GoWitness completed with exit code: {result.returncode}")
             if result.stdout:
                 self.logger.debug(f"GoWitness stdout: {result.stdout[:500]}")
@@ -1322,8 +2564,8 @@ class DomScoutScanner:
                 screenshots = [f for f in os.listdir(scan_screenshots_dir) if f.endswith('.png')]
                 self.logger.info(f"GoWitness: Created {len(screenshots)} screenshot files")
                 
-        except subprocess.TimeoutExpired:
-            self.logger.error(f"GoWitness timed out after 10 minutes")
+        except subprocess.TimeoutExpired as e:
+            self.logger.error(f"GoWitness timed out after {e.timeout}s")
         except Exception as e:
             self.logger.error(f"GoWitness error: {e}")
     
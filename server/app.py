@@ -1,12 +1,13 @@
 #!/usr/bin/env python3
 import os
 import json
+import contextlib
 import time
 import threading
 import sqlite3
 import tempfile
 from datetime import datetime
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_from_directory, stream_with_context
 from flask_cors import CORS
 import subprocess
 import uuid
@@ -15,7 +16,17 @@ import shutil
 # Import domscout functionality
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from scanner import DomScoutScanner
+from scanner import ChangeFeed, DomScoutScanner, TAIL_MAX_LINES, TOOL_NAMES
+from dns_engine import format_nameserver, load_nameservers
+from rate_control import RequestBudget
+from resolver_health import ResolverPool
+from roi_scoring import RoiScorer, load_rules, merge_rules, features_items
+from scan_queue import ScanQueue, ToolSlots
+from bulk_store import DEFAULT_BATCH_SIZE, replace_scan_rows, write_transaction
+from results_view import (
+    RESULT_SORTS, decode_cursor, encode_cursor, keyset_page, like_pattern, merge_results, page_size, parse_sort, result_rows,
+    status_condition, suffix_pattern
+)
 
 app = Flask(__name__, static_folder='static')
 CORS(app)
@@ -26,12 +37,30 @@ SCREENSHOTS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'scre
 TEMP_SCANS_DIR = os.path.join(tempfile.gettempdir(), 'domscout_scans')
 RESOLVERS_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'resolvers.txt')
 SETTINGS_FILE = os.path.join(os.path.dirname(__file__), 'settings.json')
+ROI_RULES_FILE = os.path.join(os.path.dirname(__file__), 'roi_rules.json')
+RESOLVER_STATS_FILE = os.path.join(os.path.dirname(__file__), 'resolver_stats.json')
+DNS_CACHE_FILE = os.path.join(os.path.dirname(__file__), 'dns_cache.db')
+HTTP_CACHE_FILE = os.path.join(os.path.dirname(__file__), 'http_cache.db')
 SUBFINDER_CONFIG_PATH = os.path.expanduser('~/.config/subfinder/provider-config.yaml')
 
-TOOL_NAMES = [
-    'subfinder', 'findomain', 'assetfinder', 'sublist3r',
-    'merge', 'dnsx', 'httpx', 'gau', 'gospider', 'merge2', 'gowitness'
-]
+# Scheduler defaults (overridable in settings.json)
+DEFAULT_MAX_CONCURRENT_SCANS = 2
+DEFAULT_MAX_CONCURRENT_HEAVY_TOOLS = 2
+# Requests per second shared by all running scans (0 = no server-wide cap)
+DEFAULT_GLOBAL_RATE_LIMIT = 300
+
+# Server-Sent Events: keep-alive comment interval and how long bursts of changes are batched
+SSE_HEARTBEAT_SECONDS = 15
+SSE_COALESCE_SECONDS = 0.25
+
+# Most lines one /tail response may carry
+TAIL_MAX_LIMIT = 10000
+
+# SQLite connection tuning (the database runs in WAL mode, where synchronous=NORMAL cannot corrupt it)
+DB_BUSY_TIMEOUT = 30
+DB_SYNCHRONOUS = 'NORMAL'
+DB_CACHE_SIZE_KB = 64 * 1024
+DB_MMAP_SIZE = 256 * 1024 * 1024
 
 # Ensure directories exist
 os.makedirs(SCREENSHOTS_DIR, exist_ok=True)
@@ -112,11 +141,8 @@ active_scans = {}
 deleted_scans = set()
 
 
-def init_db():
-    """Initialize the SQLite database"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
+def _migrate_base_schema(cursor):
+    """Schema 1: the tables, as created before schema versions were tracked"""
     # Scans table
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS scans (
@@ -170,6 +196,27 @@ def init_db():
         )
     ''')
 
+    # Merged results shown on the Results page (rebuilt from urls and screenshots)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS scan_results (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            scan_id TEXT NOT NULL,
+            url TEXT NOT NULL,
+            host TEXT,
+            status_code INTEGER,
+            status_rank INTEGER NOT NULL,
+            title TEXT,
+            webserver TEXT,
+            technologies TEXT,
+            content_length INTEGER,
+            roi_score INTEGER NOT NULL,
+            roi_order INTEGER NOT NULL,
+            screenshot_id INTEGER,
+            screenshot_filename TEXT,
+            FOREIGN KEY (scan_id) REFERENCES scans(id)
+        )
+    ''')
+
     # Tool status cache table
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS tool_status (
@@ -195,7 +242,46 @@ def init_db():
         )
     ''')
 
-    # Lightweight schema migration for existing databases
+    # Resource usage of the external tools run for each scan
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS tool_metrics (
+            scan_id TEXT NOT NULL,
+            tool_name TEXT NOT NULL,
+            runs INTEGER DEFAULT 0,
+            wall_seconds REAL DEFAULT 0,
+            user_cpu_seconds REAL DEFAULT 0,
+            sys_cpu_seconds REAL DEFAULT 0,
+            max_rss_kb INTEGER DEFAULT 0,
+            failures INTEGER DEFAULT 0,
+            timeouts INTEGER DEFAULT 0,
+            cancelled INTEGER DEFAULT 0,
+            last_returncode INTEGER,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (scan_id, tool_name),
+            FOREIGN KEY (scan_id) REFERENCES scans(id)
+        )
+    ''')
+
+    # Scheduler job queue (survives restarts)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS scan_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            scan_id TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            tool_name TEXT,
+            with_deps INTEGER DEFAULT 0,
+            priority INTEGER DEFAULT 0,
+            status TEXT NOT NULL,
+            enqueued_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            started_at TIMESTAMP,
+            finished_at TIMESTAMP
+        )
+    ''')
+    cursor.execute(
+        'CREATE INDEX IF NOT EXISTS idx_scan_jobs_status ON scan_jobs (status, priority, id)'
+    )
+
+    # Columns added to existing databases over time
     url_columns = {
         row[1] for row in cursor.execute('PRAGMA table_info(urls)').fetchall()
     }
@@ -207,16 +293,100 @@ def init_db():
         cursor.execute('ALTER TABLE urls ADD COLUMN technologies TEXT')
     if 'content_length' not in url_columns:
         cursor.execute('ALTER TABLE urls ADD COLUMN content_length INTEGER')
-    
-    conn.commit()
-    conn.close()
+
+    screenshot_columns = {
+        row[1] for row in cursor.execute('PRAGMA table_info(screenshots)').fetchall()
+    }
+    if 'features' not in screenshot_columns:
+        cursor.execute('ALTER TABLE screenshots ADD COLUMN features TEXT')
+
+    scan_columns = {
+        row[1] for row in cursor.execute('PRAGMA table_info(scans)').fetchall()
+    }
+    if 'cache_stats' not in scan_columns:
+        cursor.execute('ALTER TABLE scans ADD COLUMN cache_stats TEXT')
+
+
+def _migrate_scan_indexes(cursor):
+    """Schema 2: indexes led by scan_id for the per-scan lookups, counts, deletes and pages
+
+    Without them every WHERE scan_id = ? (and every foreign key check when a
+    scan is deleted) scans the whole table, across every scan ever run.
+    """
+    for statement in (
+        # Per-scan counts, ordered lists and keyset pages; each also serves plain scan_id lookups
+        'CREATE INDEX IF NOT EXISTS idx_subdomains_scan_subdomain ON subdomains (scan_id, subdomain)',
+        'CREATE INDEX IF NOT EXISTS idx_urls_scan_url ON urls (scan_id, url)',
+        'CREATE INDEX IF NOT EXISTS idx_urls_scan_status ON urls (scan_id, status_code)',
+        'CREATE INDEX IF NOT EXISTS idx_screenshots_scan_roi ON screenshots (scan_id, roi_score DESC, url)',
+        'CREATE INDEX IF NOT EXISTS idx_screenshots_scan_url ON screenshots (scan_id, url)',
+        # Results page: one index per sort order, plus the host and status filters
+        'CREATE INDEX IF NOT EXISTS idx_scan_results_roi ON scan_results (scan_id, roi_order, status_rank)',
+        'CREATE INDEX IF NOT EXISTS idx_scan_results_status ON scan_results (scan_id, status_rank, roi_order)',
+        'CREATE INDEX IF NOT EXISTS idx_scan_results_url ON scan_results (scan_id, url)',
+        'CREATE INDEX IF NOT EXISTS idx_scan_results_host ON scan_results (scan_id, host)',
+        'CREATE INDEX IF NOT EXISTS idx_scan_results_status_code ON scan_results (scan_id, status_code)',
+        # Recent scans list and the scheduler's per-scan queue lookups
+        'CREATE INDEX IF NOT EXISTS idx_scans_created_at ON scans (created_at)',
+        'CREATE INDEX IF NOT EXISTS idx_scan_jobs_scan ON scan_jobs (scan_id, status)',
+    ):
+        cursor.execute(statement)
+
+
+def _migrate_scan_jobs_reset(cursor):
+    """Schema 3: scan_jobs.reset_results, set on jobs queued to rerun an idle scan"""
+    cursor.execute('ALTER TABLE scan_jobs ADD COLUMN reset_results INTEGER DEFAULT 0')
+
+
+# Schema migrations in order; the database's PRAGMA user_version is the number applied so far
+SCHEMA_MIGRATIONS = [
+    _migrate_base_schema,
+    _migrate_scan_indexes,
+    _migrate_scan_jobs_reset,
+]
+
+
+def migrate_db(conn, migrations=None):
+    """Apply the migrations the database has not seen yet, each in its own transaction
+
+    Returns the schema version the database is at.
+    """
+    migrations = SCHEMA_MIGRATIONS if migrations is None else migrations
+    for version, migration in enumerate(migrations, start=1):
+        # IMMEDIATE takes the write lock first, so two processes cannot apply the same step
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if conn.execute('PRAGMA user_version').fetchone()[0] < version:
+                migration(conn.cursor())
+                conn.execute(f'PRAGMA user_version = {version:d}')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def init_db():
+    """Initialize the SQLite database: WAL journal, then any pending schema migrations"""
+    conn = sqlite3.connect(DB_PATH, timeout=DB_BUSY_TIMEOUT)
+    try:
+        # WAL is stored in the database file: readers no longer wait for a scan saving its results
+        conn.execute('PRAGMA journal_mode = WAL')
+        version = migrate_db(conn)
+    finally:
+        conn.close()
+    return version
 
 
 def get_db_connection():
     """Get database connection"""
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(DB_PATH, timeout=DB_BUSY_TIMEOUT)
     conn.row_factory = sqlite3.Row
     conn.execute('PRAGMA foreign_keys = ON')
+    conn.execute(f'PRAGMA synchronous = {DB_SYNCHRONOUS}')
+    conn.execute(f'PRAGMA cache_size = -{DB_CACHE_SIZE_KB:d}')
+    conn.execute('PRAGMA temp_store = MEMORY')
+    conn.execute(f'PRAGMA mmap_size = {DB_MMAP_SIZE:d}')
     return conn
 
 
@@ -281,6 +451,94 @@ def load_tool_status_from_db(scan_id):
     return status_map
 
 
+TOOL_METRIC_FIELDS = (
+    'runs', 'wall_seconds', 'user_cpu_seconds', 'sys_cpu_seconds', 'max_rss_kb',
+    'failures', 'timeouts', 'cancelled', 'last_returncode'
+)
+
+
+def upsert_tool_metrics(conn, scan_id, metrics):
+    """Insert or update the per-tool resource usage of a scan (does not commit)"""
+    conn.executemany(
+        f'''
+        INSERT OR REPLACE INTO tool_metrics (scan_id, tool_name, {', '.join(TOOL_METRIC_FIELDS)}, updated_at)
+        VALUES (?, ?, {', '.join('?' * len(TOOL_METRIC_FIELDS))}, CURRENT_TIMESTAMP)
+        ''',
+        [
+            (scan_id, tool_name, *(totals.get(field) for field in TOOL_METRIC_FIELDS))
+            for tool_name, totals in metrics.items()
+        ]
+    )
+
+
+def load_tool_metrics_from_db(scan_id):
+    """Load the per-tool resource usage of a scan from SQLite."""
+    conn = get_db_connection()
+    try:
+        rows = conn.execute(
+            f"SELECT tool_name, {', '.join(TOOL_METRIC_FIELDS)} FROM tool_metrics WHERE scan_id = ?",
+            (scan_id,)
+        ).fetchall()
+    finally:
+        conn.close()
+    return {row['tool_name']: {field: row[field] for field in TOOL_METRIC_FIELDS} for row in rows}
+
+
+URL_COLUMNS = ('url', 'status_code', 'title', 'webserver', 'technologies', 'content_length')
+SCREENSHOT_COLUMNS = ('url', 'filename', 'status_code', 'title', 'headers', 'roi_score', 'features')
+
+
+def url_rows(urls):
+    """urls rows (URL_COLUMNS order) for URL dicts
+
+    Most URLs share a handful of technology stacks, so each distinct list is serialized once.
+    """
+    serialized = {}
+    for url_data in urls:
+        technologies = url_data.get('technologies')
+        key = tuple(technologies) if isinstance(technologies, list) else technologies
+        try:
+            technologies_json = serialized[key]
+        except KeyError:
+            technologies_json = serialized[key] = serialize_technologies(technologies)
+        except TypeError:
+            technologies_json = serialize_technologies(technologies)
+        yield (
+            url_data['url'],
+            url_data.get('status_code'),
+            url_data.get('title'),
+            url_data.get('webserver'),
+            technologies_json,
+            url_data.get('content_length')
+        )
+
+
+def screenshot_rows(screenshots):
+    """screenshots rows (SCREENSHOT_COLUMNS order) for scored screenshots and their ROI features"""
+    for screenshot in screenshots:
+        yield (
+            screenshot['url'], screenshot.get('filename') or '',
+            screenshot.get('status_code'), screenshot.get('title'),
+            json.dumps(screenshot.get('headers', {})), screenshot.get('roi_score', 50),
+            json.dumps(screenshot['features']) if screenshot.get('features') else None
+        )
+
+
+def bulk_write_options():
+    """replace_scan_rows options from settings.json"""
+    settings = load_settings()
+    return {
+        'batch_size': int(settings.get('db_batch_size', DEFAULT_BATCH_SIZE)),
+        'drop_indexes_ratio': float(settings.get('db_drop_indexes_ratio', 0)),
+    }
+
+
+def replace_rows(conn, table, scan_id, columns, rows, expected_rows=None):
+    """Replace a scan's rows of table in executemany batches (does not commit)"""
+    return replace_scan_rows(conn, table, scan_id, columns, rows, expected_rows=expected_rows,
+                             **bulk_write_options())
+
+
 def load_tool_results_from_db(scan_id, tool_name):
     """Load tool results array for a scan/tool from SQLite cache."""
     conn = get_db_connection()
@@ -300,29 +558,45 @@ def load_tool_results_from_db(scan_id, tool_name):
         return []
 
 
+def save_cache_stats(conn, scanner):
+    """Store the scan's cross-scan cache hit rates (does not commit)"""
+    if scanner.cache_stats:
+        conn.execute(
+            'UPDATE scans SET cache_stats = ? WHERE id = ?',
+            (json.dumps(scanner.cache_stats), scanner.scan_id)
+        )
+
+
 def save_tool_cache(scanner):
     """Persist current tool statuses and results for the scan."""
     conn = get_db_connection()
     try:
-        for tool_name, data in scanner.get_tools_status().items():
-            upsert_tool_status(
-                conn,
-                scanner.scan_id,
-                tool_name,
-                data.get('status', 'idle'),
-                data.get('count', 0)
-            )
-            upsert_tool_results(
-                conn,
-                scanner.scan_id,
-                tool_name,
-                scanner.get_tool_results(tool_name)
-            )
-        conn.commit()
+        with write_transaction(conn):
+            save_tool_cache_rows(conn, scanner)
     finally:
         conn.close()
 
 
+def save_tool_cache_rows(conn, scanner):
+    """Store the scan's tool statuses, metrics and results (does not commit)"""
+    save_cache_stats(conn, scanner)
+    upsert_tool_metrics(conn, scanner.scan_id, scanner.get_tool_metrics())
+    for tool_name, data in scanner.get_tools_status().items():
+        upsert_tool_status(
+            conn,
+            scanner.scan_id,
+            tool_name,
+            data.get('status', 'idle'),
+            data.get('count', 0)
+        )
+        upsert_tool_results(
+            conn,
+            scanner.scan_id,
+            tool_name,
+            scanner.get_tool_results(tool_name)
+        )
+
+
 def serialize_technologies(technologies):
     """Serialize technologies metadata into JSON text."""
     if technologies is None:
@@ -359,6 +633,47 @@ def parse_technologies(technologies_json):
     return []
 
 
+def rebuild_scan_results(conn, scan_id):
+    """Recompute the merged Results page rows of a scan from its urls and screenshots.
+
+    Note: does not commit; the caller is responsible for committing the connection.
+    """
+    urls = []
+    for row in conn.execute(
+        'SELECT url, status_code, title, webserver, technologies, content_length '
+        'FROM urls WHERE scan_id = ? ORDER BY url',
+        (scan_id,)
+    ):
+        item = dict(row)
+        item['technologies'] = parse_technologies(item['technologies'])
+        urls.append(item)
+    screenshots = [
+        dict(row) for row in conn.execute(
+            'SELECT id, url, filename, status_code, title, roi_score FROM screenshots '
+            'WHERE scan_id = ? ORDER BY roi_score DESC, url',
+            (scan_id,)
+        )
+    ]
+
+    conn.execute('DELETE FROM scan_results WHERE scan_id = ?', (scan_id,))
+    conn.executemany(
+        '''
+        INSERT INTO scan_results (scan_id, url, host, status_code, status_rank, title, webserver,
+                                  technologies, content_length, roi_score, roi_order,
+                                  screenshot_id, screenshot_filename)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''',
+        result_rows(scan_id, merge_results(urls, screenshots))
+    )
+
+
+def paging_requested(args):
+    """Whether a list endpoint was asked for a page rather than the whole list"""
+    return any(key in args for key in (
+        'cursor', 'limit', 'sort', 'q', 'status', 'host', 'tech', 'roi_min', 'roi_max'
+    ))
+
+
 @app.route('/')
 def index():
     """Serve the Vue.js frontend"""
@@ -399,22 +714,7 @@ def create_target():
     conn.commit()
     conn.close()
     
-    # Load settings
-    settings = load_settings()
-    rotate_ua = settings.get('rotate_user_agents', False)
-    
-    # Create scanner instance but don't start it
-    scanner = DomScoutScanner(
-        scan_id,
-        domain,
-        rate_limit,
-        RESOLVERS_FILE,
-        SCREENSHOTS_DIR,
-        rotate_ua,
-        TEMP_SCANS_DIR
-    )
-    active_scans[scan_id] = scanner
-    
+    # The scanner itself is created lazily when the first tool or auto scan runs
     return jsonify({'scan_id': scan_id, 'status': 'created'})
 
 
@@ -424,6 +724,7 @@ def start_scan():
     data = request.json
     domain = data.get('domain')
     rate_limit = data.get('rate_limit', 150)
+    priority = data.get('priority', 0)
     
     if not domain:
         return jsonify({'error': 'Domain is required'}), 400
@@ -436,32 +737,74 @@ def start_scan():
     cursor = conn.cursor()
     cursor.execute(
         'INSERT INTO scans (id, domain, status, rate_limit) VALUES (?, ?, ?, ?)',
-        (scan_id, domain, 'running', rate_limit)
+        (scan_id, domain, 'queued', rate_limit)
     )
     conn.commit()
     conn.close()
     
-    # Load settings
+    # The scheduler creates the scanner once a scan slot is free
+    scan_queue.enqueue(scan_id, 'scan', priority=priority)
+    
+    return jsonify({'scan_id': scan_id, 'status': 'queued', 'queue': scan_queue.position(scan_id)})
+
+
+def build_scanner(scan_id, domain, rate_limit):
+    """Create a scanner configured from the current settings"""
     settings = load_settings()
     rotate_ua = settings.get('rotate_user_agents', False)
-    
-    # Start scan in background thread
-    scanner = DomScoutScanner(
+    settings.setdefault('roi_rules_file', ROI_RULES_FILE)
+    settings.setdefault('resolver_stats_file', RESOLVER_STATS_FILE)
+    settings.setdefault('dns_cache_file', DNS_CACHE_FILE)
+    settings.setdefault('http_cache_file', HTTP_CACHE_FILE)
+
+    return DomScoutScanner(
         scan_id,
         domain,
         rate_limit,
         RESOLVERS_FILE,
         SCREENSHOTS_DIR,
         rotate_ua,
-        TEMP_SCANS_DIR
+        TEMP_SCANS_DIR,
+        options=settings,
+        tool_slots=heavy_tool_slots,
+        request_budget=request_budget
     )
-    active_scans[scan_id] = scanner
-    
-    thread = threading.Thread(target=run_scan, args=(scanner,))
-    thread.daemon = True
-    thread.start()
-    
-    return jsonify({'scan_id': scan_id, 'status': 'started'})
+
+
+def notify_scan_activity(scanner=None):
+    """Wake the event streams: a scan started, finished, was queued or deleted"""
+    scan_activity.notify()
+    if scanner is not None:
+        scanner.changes.notify()
+
+
+def execute_job(job):
+    """Run one scheduler job (full scan or single tool) in a worker thread"""
+    scan_id = job['scan_id']
+    if scan_id in deleted_scans:
+        return
+
+    scanner = active_scans.get(scan_id)
+    if scanner is None:
+        conn = get_db_connection()
+        scan = conn.execute('SELECT * FROM scans WHERE id = ?', (scan_id,)).fetchone()
+        conn.close()
+        if not scan:
+            return
+        if _job_starts_rescan(job):
+            _reset_scan(scan_id)
+        scanner = build_scanner(scan_id, scan['domain'], scan['rate_limit'] or 150)
+        active_scans[scan_id] = scanner
+
+    if job['kind'] == 'scan':
+        conn = get_db_connection()
+        conn.execute('UPDATE scans SET status = ? WHERE id = ?', ('running', scan_id))
+        conn.commit()
+        conn.close()
+        notify_scan_activity(scanner)
+        run_scan(scanner)
+    else:
+        run_tool_async(scanner, job['tool_name'], bool(job['with_deps']))
 
 
 def run_scan(scanner):
@@ -472,36 +815,32 @@ def run_scan(scanner):
         if scanner.scan_id in deleted_scans:
             return
 
+        # Status, results and tool cache in one transaction: readers never see a
+        # completed scan without its results, and a failed save leaves nothing behind
         conn = get_db_connection()
-        if not scan_exists(conn, scanner.scan_id):
+        try:
+            with write_transaction(conn):
+                if not scan_exists(conn, scanner.scan_id):
+                    return
+                conn.execute(
+                    'UPDATE scans SET status = ?, completed_at = ?, duration = ? WHERE id = ?',
+                    ('completed', datetime.now(), scanner.duration, scanner.scan_id)
+                )
+                save_scan_results(conn, scanner)
+                save_tool_cache_rows(conn, scanner)
+        finally:
             conn.close()
-            return
-        
-        # Update scan status
-        cursor = conn.cursor()
-        cursor.execute(
-            'UPDATE scans SET status = ?, completed_at = ?, duration = ? WHERE id = ?',
-            ('completed', datetime.now(), scanner.duration, scanner.scan_id)
-        )
-        conn.commit()
-        
-        # Save results to database
-        save_scan_results(scanner)
-
-        # Persist per-tool statuses and results in SQLite
-        save_tool_cache(scanner)
-        
-        conn.close()
     except Exception as e:
         print(f"Scan failed: {e}")
         conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            'UPDATE scans SET status = ? WHERE id = ?',
-            ('failed', scanner.scan_id)
-        )
-        conn.commit()
-        conn.close()
+        try:
+            conn.execute(
+                'UPDATE scans SET status = ? WHERE id = ?',
+                ('failed', scanner.scan_id)
+            )
+            conn.commit()
+        finally:
+            conn.close()
         try:
             save_tool_cache(scanner)
         except Exception:
@@ -518,29 +857,30 @@ def run_scan(scanner):
         if scanner.scan_id in deleted_scans:
             deleted_scans.remove(scanner.scan_id)
 
+        notify_scan_activity(scanner)
 
-def save_scan_results(scanner):
-    """Save scan results to database"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
 
-    if scanner.scan_id in deleted_scans or not scan_exists(conn, scanner.scan_id):
-        conn.close()
-        return
+def save_scan_results(conn, scanner):
+    """Replace the scan's subdomains, URLs, screenshots and Results page rows.
 
-    # Replace previous persisted data for idempotency
-    cursor.execute('DELETE FROM subdomains WHERE scan_id = ?', (scanner.scan_id,))
-    cursor.execute('DELETE FROM urls WHERE scan_id = ?', (scanner.scan_id,))
-    cursor.execute('DELETE FROM screenshots WHERE scan_id = ?', (scanner.scan_id,))
-    
-    # Save subdomains
-    for subdomain in scanner.subdomains:
-        cursor.execute(
-            'INSERT INTO subdomains (scan_id, subdomain) VALUES (?, ?)',
-            (scanner.scan_id, subdomain)
-        )
-    
-    # Save URLs
+    Note: does not commit; run it inside write_transaction.
+    """
+    save_scan_rows(conn, scanner)
+    rebuild_scan_results(conn, scanner.scan_id)
+
+
+def save_scan_rows(conn, scanner):
+    """Replace the scan's subdomains, URLs and screenshots (does not commit)
+
+    Rows go in index key order, so the (scan_id, subdomain) and (scan_id, url)
+    indexes are appended to rather than updated at random pages.
+    """
+    scan_id = scanner.scan_id
+    subdomains = sorted(scanner.subdomains)
+    replace_rows(conn, 'subdomains', scan_id, ('subdomain',),
+                 ((subdomain,) for subdomain in subdomains), len(subdomains))
+
+    # One row per URL, later non-empty values filling the fields
     by_url = {}
     for url_data in scanner.urls:
         url = url_data.get('url')
@@ -562,46 +902,21 @@ def save_scan_results(scanner):
             if value not in (None, '', []):
                 existing[key] = value
 
-    for url_data in by_url.values():
-        cursor.execute(
-            '''
-            INSERT INTO urls (scan_id, url, status_code, title, webserver, technologies, content_length)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''',
-            (
-                scanner.scan_id,
-                url_data['url'],
-                url_data.get('status_code'),
-                url_data.get('title'),
-                url_data.get('webserver'),
-                serialize_technologies(url_data.get('technologies')),
-                url_data.get('content_length')
-            )
-        )
-    
-    # Save screenshots
-    for screenshot in scanner.screenshots:
-        cursor.execute(
-            'INSERT INTO screenshots (scan_id, url, filename, status_code, title, headers, roi_score) VALUES (?, ?, ?, ?, ?, ?, ?)',
-            (scanner.scan_id, screenshot['url'], screenshot['filename'], 
-             screenshot.get('status_code'), screenshot.get('title'), 
-             json.dumps(screenshot.get('headers', {})), screenshot.get('roi_score', 50))
-        )
-    
-    conn.commit()
-    conn.close()
+    replace_rows(conn, 'urls', scan_id, URL_COLUMNS,
+                 url_rows(by_url[url] for url in sorted(by_url)), len(by_url))
+    replace_rows(conn, 'screenshots', scan_id, SCREENSHOT_COLUMNS,
+                 screenshot_rows(scanner.screenshots), len(scanner.screenshots))
 
 
-@app.route('/api/scan/<scan_id>', methods=['GET'])
-def get_scan_info(scan_id):
-    """Get scan information and progress"""
+def scan_info_payload(scan_id):
+    """Scan row, result counts, progress, cache stats, queue position and rate allocation (None if unknown)"""
     conn = get_db_connection()
     cursor = conn.cursor()
     
     scan = cursor.execute('SELECT * FROM scans WHERE id = ?', (scan_id,)).fetchone()
     if not scan:
         conn.close()
-        return jsonify({'error': 'Scan not found'}), 404
+        return None
     
     # Get statistics
     subdomains_count = cursor.execute(
@@ -621,16 +936,26 @@ def get_scan_info(scan_id):
     # Get progress from active scanner
     progress = 0
     message = 'Initializing...'
+    cache = {}
+    rate = None
+    queue = scan_queue.position(scan_id)
     
-    if scan_id in active_scans:
+    if queue and queue['status'] == 'queued':
+        message = f"Queued (position {queue['position']} of {queue['queued_total']})"
+    elif scan_id in active_scans:
         scanner = active_scans[scan_id]
         progress = scanner.progress
         message = scanner.progress_message
+        cache = scanner.cache_stats
+        rate = scanner.rate_governor.allocation()
     elif scan['status'] == 'completed':
         progress = 100
         message = 'Completed'
     
-    return jsonify({
+    if not cache and scan['cache_stats']:
+        cache = json.loads(scan['cache_stats'])
+    
+    return {
         'scan': dict(scan),
         'stats': {
             'subdomains': subdomains_count,
@@ -638,86 +963,438 @@ def get_scan_info(scan_id):
             'screenshots': screenshots_count
         },
         'progress': progress,
-        'message': message
-    })
+        'message': message,
+        'cache': cache,
+        'queue': queue,
+        'rate': rate
+    }
+
+
+@app.route('/api/scan/<scan_id>', methods=['GET'])
+def get_scan_info(scan_id):
+    """Get scan information and progress"""
+    info = scan_info_payload(scan_id)
+    if info is None:
+        return jsonify({'error': 'Scan not found'}), 404
+    return jsonify(info)
+
+
+def sse_event(event, data):
+    """One Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def current_tools_status(scan_id):
+    """Tool statuses from the active scanner, or the SQLite cache"""
+    if scan_id in active_scans:
+        return {name: dict(data) for name, data in active_scans[scan_id].get_tools_status().items()}
+    return load_tool_status_from_db(scan_id)
+
+
+@app.route('/api/scan/<scan_id>/events', methods=['GET'])
+def scan_events(scan_id):
+    """Server-Sent Events stream of a scan's progress and tool status changes
+
+    Starts with a 'snapshot' event (the GET /api/scan/<scan_id> payload plus
+    'tools'). The active scanner's change feed then drives 'progress' events
+    and 'tools' events holding only the tools that changed, with their count
+    delta. A 'scan' event with fresh counts from the database follows each scan
+    start, finish or queue move. Nothing is read from the database in between.
+    """
+    info = scan_info_payload(scan_id)
+    if info is None:
+        return jsonify({'error': 'Scan not found'}), 404
+
+    def stream():
+        tools = current_tools_status(scan_id)
+        yield sse_event('snapshot', dict(info, tools=tools))
+        sent = {
+            'scan': (info['scan']['status'], info['queue']),
+            'progress': (info['progress'], info['message']),
+        }
+        scanner = active_scans.get(scan_id)
+        version = scanner.changes.version if scanner else None
+        activity = scan_activity.version
+
+        while scan_id not in deleted_scans:
+            # Scan activity also bumps the active scanner's feed, so one wait covers both
+            if scanner is not None:
+                idle = scanner.changes.wait(version, SSE_HEARTBEAT_SECONDS) == version
+            else:
+                idle = scan_activity.wait(activity, SSE_HEARTBEAT_SECONDS) == activity
+            if idle:
+                yield ': keep-alive\n\n'
+                continue
+            # Let bursts of count updates settle into one event
+            time.sleep(SSE_COALESCE_SECONDS)
+
+            if scanner is not None:
+                version = scanner.changes.version
+                progress = (scanner.progress, scanner.progress_message)
+                if progress != sent['progress']:
+                    sent['progress'] = progress
+                    yield sse_event('progress', {'progress': progress[0], 'message': progress[1]})
+
+            now_active = active_scans.get(scan_id)
+            if now_active is not scanner or scan_activity.version != activity:
+                # Scan started, finished or moved in the queue: refresh from the database
+                activity = scan_activity.version
+                scanner = now_active
+                version = scanner.changes.version if scanner else None
+                fresh = scan_info_payload(scan_id)
+                if fresh is None:
+                    break
+                state = (fresh['scan']['status'], fresh['queue'])
+                if state != sent['scan']:
+                    sent['scan'] = state
+                    yield sse_event('scan', fresh)
+
+            latest = current_tools_status(scan_id)
+            changed = {
+                name: dict(data, delta=data.get('count', 0) - tools.get(name, {}).get('count', 0))
+                for name, data in latest.items() if data != tools.get(name)
+            }
+            tools = latest
+            if changed:
+                yield sse_event('tools', changed)
+
+        yield sse_event('deleted', {'scan_id': scan_id})
+
+    return Response(
+        stream_with_context(stream()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+def list_page_response(key, items, next_cursor, total):
+    """JSON body of one page of a list endpoint"""
+    return jsonify({key: items, 'next_cursor': next_cursor, 'total': total})
+
+
+def count_rows(conn, table, where, params):
+    """Rows of table matching the filters"""
+    return conn.execute(f"SELECT COUNT(*) FROM {table} WHERE {' AND '.join(where)}", params).fetchone()[0]
 
 
 @app.route('/api/scan/<scan_id>/subdomains', methods=['GET'])
 def get_subdomains(scan_id):
-    """Get subdomains for a scan"""
+    """Get subdomains for a scan
+
+    Without query parameters the whole list is returned. With any of cursor,
+    limit, sort (subdomain or -subdomain) or q (substring) one page is returned.
+    """
     conn = get_db_connection()
     cursor = conn.cursor()
-    
-    rows = cursor.execute(
-        'SELECT subdomain FROM subdomains WHERE scan_id = ? ORDER BY subdomain',
-        (scan_id,)
-    ).fetchall()
-    
-    conn.close()
-    
-    subdomains = [row['subdomain'] for row in rows]
-    return jsonify({'subdomains': subdomains})
+
+    if not paging_requested(request.args):
+        rows = cursor.execute(
+            'SELECT subdomain FROM subdomains WHERE scan_id = ? ORDER BY subdomain',
+            (scan_id,)
+        ).fetchall()
+        conn.close()
+        subdomains = [row['subdomain'] for row in rows]
+        return jsonify({'subdomains': subdomains})
+
+    where, params = ['scan_id = ?'], [scan_id]
+    if request.args.get('q'):
+        where.append("subdomain LIKE ? ESCAPE '\\'")
+        params.append(like_pattern(request.args['q']))
+    try:
+        columns, descending = parse_sort(request.args.get('sort', 'subdomain'), {'subdomain': ('subdomain', 'id')})
+        rows, next_cursor = keyset_page(
+            conn, 'subdomains', where, params, columns, descending,
+            request.args.get('cursor'), page_size(request.args.get('limit')), select='id, subdomain'
+        )
+        total = count_rows(conn, 'subdomains', where, params)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    finally:
+        conn.close()
+
+    return list_page_response('subdomains', [row['subdomain'] for row in rows], next_cursor, total)
 
 
 @app.route('/api/scan/<scan_id>/urls', methods=['GET'])
 def get_urls(scan_id):
-    """Get URLs for a scan"""
+    """Get URLs for a scan
+
+    Without query parameters the whole list is returned. With any of cursor,
+    limit, sort (url or -url), q or status one page is returned.
+    """
     conn = get_db_connection()
     cursor = conn.cursor()
-    
-    rows = cursor.execute(
-        '''
-        SELECT url, status_code, title, webserver, technologies, content_length
-        FROM urls
-        WHERE scan_id = ?
-        ORDER BY url
-        ''',
-        (scan_id,)
-    ).fetchall()
-    
-    conn.close()
-    
+
+    columns_sql = 'url, status_code, title, webserver, technologies, content_length'
+    if not paging_requested(request.args):
+        rows = cursor.execute(
+            f"SELECT {columns_sql} FROM urls WHERE scan_id = ? ORDER BY url",
+            (scan_id,)
+        ).fetchall()
+        conn.close()
+    else:
+        where, params = ['scan_id = ?'], [scan_id]
+        try:
+            if request.args.get('q'):
+                where.append("(url LIKE ? ESCAPE '\\' OR title LIKE ? ESCAPE '\\')")
+                params.extend([like_pattern(request.args['q'])] * 2)
+            if request.args.get('status'):
+                condition, values = status_condition(request.args['status'])
+                if condition:
+                    where.append(condition)
+                    params.extend(values)
+            columns, descending = parse_sort(request.args.get('sort', 'url'), {'url': ('url', 'id')})
+            rows, next_cursor = keyset_page(
+                conn, 'urls', where, params, columns, descending,
+                request.args.get('cursor'), page_size(request.args.get('limit')), select=f"id, {columns_sql}"
+            )
+            total = count_rows(conn, 'urls', where, params)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        finally:
+            conn.close()
+
     urls = []
     for row in rows:
         item = dict(row)
+        item.pop('id', None)
         item['technologies'] = parse_technologies(item.get('technologies'))
         urls.append(item)
 
-    return jsonify({'urls': urls})
+    if not paging_requested(request.args):
+        return jsonify({'urls': urls})
+    return list_page_response('urls', urls, next_cursor, total)
 
 
 @app.route('/api/scan/<scan_id>/screenshots', methods=['GET'])
 def get_screenshots(scan_id):
-    """Get screenshots for a scan"""
+    """Get screenshots for a scan
+
+    Without query parameters the whole list is returned. With any of cursor,
+    limit, sort (roi, url, each optionally prefixed with '-'), q, status,
+    roi_min or roi_max one page is returned.
+    """
     conn = get_db_connection()
     cursor = conn.cursor()
-    
-    rows = cursor.execute(
-        'SELECT * FROM screenshots WHERE scan_id = ? ORDER BY roi_score DESC, url',
-        (scan_id,)
-    ).fetchall()
-    
-    conn.close()
-    
+
+    if not paging_requested(request.args):
+        rows = cursor.execute(
+            'SELECT * FROM screenshots WHERE scan_id = ? ORDER BY roi_score DESC, url',
+            (scan_id,)
+        ).fetchall()
+        conn.close()
+    else:
+        where, params = ['scan_id = ?'], [scan_id]
+        try:
+            if request.args.get('q'):
+                where.append("(url LIKE ? ESCAPE '\\' OR title LIKE ? ESCAPE '\\')")
+                params.extend([like_pattern(request.args['q'])] * 2)
+            if request.args.get('status'):
+                condition, values = status_condition(request.args['status'])
+                if condition:
+                    where.append(condition)
+                    params.extend(values)
+            for arg, op in (('roi_min', '>='), ('roi_max', '<=')):
+                if request.args.get(arg):
+                    where.append(f"-roi_order {op} ?")
+                    params.append(int(request.args[arg]))
+            # roi_order and status_rank are computed in the select so every sort stays ascending
+            columns, descending = parse_sort(request.args.get('sort', 'roi'), {
+                'roi': ('roi_order', 'url', 'id'),
+                'url': ('url', 'id'),
+            })
+            rows, next_cursor = keyset_page(
+                conn, '(SELECT *, -COALESCE(roi_score, 50) AS roi_order FROM screenshots)', where, params,
+                columns, descending, request.args.get('cursor'), page_size(request.args.get('limit'))
+            )
+            total = count_rows(
+                conn, '(SELECT *, -COALESCE(roi_score, 50) AS roi_order FROM screenshots)', where, params
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        finally:
+            conn.close()
+
     screenshots = []
     for row in rows:
         screenshot = dict(row)
+        screenshot.pop('roi_order', None)
         if screenshot.get('headers'):
             try:
                 screenshot['headers'] = json.loads(screenshot['headers'])
             except:
                 pass
         screenshots.append(screenshot)
-    
-    return jsonify({'screenshots': screenshots})
+
+    if not paging_requested(request.args):
+        return jsonify({'screenshots': screenshots})
+    return list_page_response('screenshots', screenshots, next_cursor, total)
+
+
+@app.route('/api/scan/<scan_id>/results', methods=['GET'])
+def get_results(scan_id):
+    """One page of the merged results shown on the Results page
+
+    Each row is a URL with its screenshot, ROI score, status, title and
+    technologies (gaps filled from the same host), one per canonical URL.
+
+    Query params:
+        cursor: next_cursor of the previous page (omit for the first page)
+        limit: Rows per page (default 50, at most 1000)
+        sort: roi (default: ROI score descending, then status), status or url;
+              prefix with '-' to reverse
+        q: Substring of the URL, title or status code
+        status: Status codes or classes, e.g. 200, 4xx or 200,3xx
+        host: Hostname, or *.example.com for the domain and its subdomains
+        tech: Technology name (case-insensitive)
+        roi_min, roi_max: ROI score range
+    """
+    conn = get_db_connection()
+    try:
+        if not scan_exists(conn, scan_id):
+            return jsonify({'error': 'Scan not found'}), 404
+
+        # Scans saved before the results table existed are merged on first view
+        has_results = conn.execute('SELECT 1 FROM scan_results WHERE scan_id = ? LIMIT 1', (scan_id,)).fetchone()
+        if not has_results and conn.execute('SELECT 1 FROM urls WHERE scan_id = ? LIMIT 1', (scan_id,)).fetchone():
+            rebuild_scan_results(conn, scan_id)
+            conn.commit()
+
+        where, params = ['scan_id = ?'], [scan_id]
+        args = request.args
+        if args.get('q'):
+            pattern = like_pattern(args['q'])
+            where.append(
+                "(url LIKE ? ESCAPE '\\' OR title LIKE ? ESCAPE '\\' "
+                "OR CAST(status_code AS TEXT) LIKE ? ESCAPE '\\')"
+            )
+            params.extend([pattern] * 3)
+        if args.get('status'):
+            condition, values = status_condition(args['status'])
+            if condition:
+                where.append(condition)
+                params.extend(values)
+        if args.get('host'):
+            host = args['host'].lower()
+            if host.startswith('*.'):
+                where.append("(host = ? OR host LIKE ? ESCAPE '\\')")
+                params.extend([host[2:], suffix_pattern(host[1:])])
+            else:
+                where.append('host = ?')
+                params.append(host)
+        if args.get('tech'):
+            where.append('EXISTS (SELECT 1 FROM json_each(scan_results.technologies) WHERE lower(value) = ?)')
+            params.append(args['tech'].lower())
+        # roi_order is the negated score
+        if args.get('roi_min'):
+            where.append('roi_order <= ?')
+            params.append(-int(args['roi_min']))
+        if args.get('roi_max'):
+            where.append('roi_order >= ?')
+            params.append(-int(args['roi_max']))
+
+        columns, descending = parse_sort(args.get('sort', 'roi'), RESULT_SORTS)
+        rows, next_cursor = keyset_page(
+            conn, 'scan_results', where, params, columns, descending,
+            args.get('cursor'), page_size(args.get('limit'))
+        )
+        total = count_rows(conn, 'scan_results', where, params)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    finally:
+        conn.close()
+
+    results = []
+    for row in rows:
+        results.append({
+            'url': row['url'],
+            'host': row['host'],
+            'status_code': row['status_code'],
+            'title': row['title'],
+            'webserver': row['webserver'],
+            'technologies': parse_technologies(row['technologies']),
+            'content_length': row['content_length'],
+            'roi_score': row['roi_score'],
+            'screenshot': {'id': row['screenshot_id'], 'filename': row['screenshot_filename']}
+            if row['screenshot_filename'] else None,
+        })
+    return list_page_response('results', results, next_cursor, total)
+
+
+@app.route('/api/scan/<scan_id>/rescore', methods=['POST'])
+def rescore_scan(scan_id):
+    """Re-score all screenshots of a scan from their stored ROI features.
+
+    Uses the saved ROI rule set, or the rule set given as {"rules": {...}}.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        scorer = RoiScorer(data['rules']) if data.get('rules') else load_roi_scorer()
+    except Exception as e:
+        return jsonify({'success': False, 'error': f'Invalid ROI rules: {e}'}), 400
+
+    start = time.perf_counter()
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        scan = cursor.execute('SELECT status FROM scans WHERE id = ?', (scan_id,)).fetchone()
+        if not scan:
+            return jsonify({'success': False, 'error': 'Scan not found'}), 404
+        if scan['status'] in ('running', 'queued'):
+            return jsonify({'success': False, 'error': 'Scan is still running'}), 409
+
+        rows = cursor.execute(
+            'SELECT id, url, roi_score, features FROM screenshots WHERE scan_id = ?', (scan_id,)
+        ).fetchall()
+
+        ids = []
+        features_list = []
+        for row in rows:
+            if not row['features']:
+                continue
+            try:
+                features_list.append(json.loads(row['features']))
+                ids.append(row['id'])
+            except ValueError:
+                pass
+
+        scores, errors = scorer.score_many(features_items(features_list))
+        cursor.executemany(
+            'UPDATE screenshots SET roi_score = ? WHERE id = ?',
+            list(zip(scores, ids))
+        )
+
+        # Refresh the cached gowitness results list shown in the tool view
+        new_scores = dict(zip(ids, scores))
+        ranked = sorted(
+            ((new_scores.get(row['id'], row['roi_score']), row['url']) for row in rows),
+            key=lambda item: (-(item[0] or 0), item[1])
+        )
+        upsert_tool_results(
+            conn, scan_id, 'gowitness',
+            [f"{url} [ROI: {roi_score}]" for roi_score, url in ranked]
+        )
+        rebuild_scan_results(conn, scan_id)
+        conn.commit()
+    finally:
+        conn.close()
+
+    return jsonify({
+        'success': True,
+        'rescored': len(ids),
+        'skipped': len(rows) - len(ids),
+        'errors': errors,
+        'duration_ms': round((time.perf_counter() - start) * 1000, 1)
+    })
 
 
 @app.route('/api/scan/<scan_id>/tools', methods=['GET'])
 def get_tools_status(scan_id):
-    """Get the status of individual tools"""
+    """Get the status and resource usage of individual tools"""
     # Try to get scanner from active scans
     if scan_id in active_scans:
         tools = active_scans[scan_id].get_tools_status()
+        metrics = active_scans[scan_id].get_tool_metrics()
     else:
         # Load from SQLite cache for finished/non-active scans
         conn = get_db_connection()
@@ -729,23 +1406,35 @@ def get_tools_status(scan_id):
             return jsonify({'error': 'Scan not found'}), 404
 
         tools = load_tool_status_from_db(scan_id)
+        metrics = load_tool_metrics_from_db(scan_id)
 
-    return jsonify({'tools': tools})
+    return jsonify({'tools': tools, 'metrics': metrics})
 
 
 @app.route('/api/scan/<scan_id>/tool/<tool_name>', methods=['POST'])
 def run_individual_tool(scan_id, tool_name):
-    """Run an individual tool"""
-    scanner, err = _get_or_recreate_scanner(scan_id)
+    """Run an individual tool (optionally with its missing upstream tools)"""
+    if tool_name not in TOOL_NAMES:
+        return jsonify({'error': f'Unknown tool: {tool_name}'}), 400
+
+    with_deps = request.args.get('with_deps', '').lower() in ('1', 'true', 'yes')
+
+    err = _check_scan_exists(scan_id)
     if err is not None:
         return err
     
-    # Start tool in background thread
-    thread = threading.Thread(target=run_tool_async, args=(scanner, tool_name))
-    thread.daemon = True
-    thread.start()
+    # Queue the tool run; it starts once the scheduler has a free slot
+    scan_queue.enqueue(scan_id, 'tool', tool_name=tool_name, with_deps=with_deps,
+                       reset_results=scan_id not in active_scans)
+    notify_scan_activity(active_scans.get(scan_id))
     
-    return jsonify({'success': True, 'tool': tool_name, 'status': 'started'})
+    return jsonify({
+        'success': True,
+        'tool': tool_name,
+        'status': 'queued',
+        'with_deps': with_deps,
+        'queue': scan_queue.position(scan_id)
+    })
 
 
 def _reset_scan_data(conn, scan_id):
@@ -756,35 +1445,52 @@ def _reset_scan_data(conn, scan_id):
     cursor = conn.cursor()
     cursor.execute('DELETE FROM screenshots WHERE scan_id = ?', (scan_id,))
     cursor.execute('DELETE FROM urls WHERE scan_id = ?', (scan_id,))
+    cursor.execute('DELETE FROM scan_results WHERE scan_id = ?', (scan_id,))
     cursor.execute('DELETE FROM subdomains WHERE scan_id = ?', (scan_id,))
     cursor.execute('DELETE FROM tool_results WHERE scan_id = ?', (scan_id,))
     cursor.execute('DELETE FROM tool_status WHERE scan_id = ?', (scan_id,))
+    cursor.execute('DELETE FROM tool_metrics WHERE scan_id = ?', (scan_id,))
 
 
-def _get_or_recreate_scanner(scan_id):
-    """Return the active scanner for scan_id, recreating it from the DB if needed.
+def _check_scan_exists(scan_id):
+    """Return a 404 response if scan_id is unknown, otherwise None"""
+    conn = get_db_connection()
+    scan = conn.execute('SELECT id FROM scans WHERE id = ?', (scan_id,)).fetchone()
+    conn.close()
+    if not scan:
+        return jsonify({'error': 'Scan not found'}), 404
+    return None
 
-    Returns (scanner, error_response) where exactly one of them is None.
-    """
-    if scan_id in active_scans:
-        return active_scans[scan_id], None
 
-    # Scan not active – look it up in the DB and recreate the scanner for rescan
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    scan = cursor.execute('SELECT * FROM scans WHERE id = ?', (scan_id,)).fetchone()
+def _job_starts_rescan(job):
+    """Whether a job starting now reruns an idle scan and must clear its previous results first
 
-    if not scan:
-        conn.close()
-        return None, (jsonify({'error': 'Scan not found'}), 404)
+    Called by execute_job, when the job is the only one running for its scan.
+    Only a job queued as a rerun does, and only if no other job of the scan
+    has run since it was queued: a tool queued behind an auto scan builds on
+    that scan's results instead of wiping them.
+    """
+    if not job.get('reset_results') or job['scan_id'] in active_scans:
+        return False
+    conn = get_db_connection()
+    ran_since = conn.execute(
+        '''
+        SELECT 1 FROM scan_jobs
+        WHERE scan_id = ? AND id != ? AND status IN ('done', 'failed') AND finished_at >= ?
+        LIMIT 1
+        ''',
+        (job['scan_id'], job['id'], job['enqueued_at'])
+    ).fetchone()
+    conn.close()
+    return ran_since is None
 
-    domain = scan['domain']
-    rate_limit = scan['rate_limit'] or 150
 
-    # Clear previous results so the new run starts fresh
+def _reset_scan(scan_id):
+    """Clear a scan's previous results, temp dir and screenshots before a rescan starts"""
+    conn = get_db_connection()
     _reset_scan_data(conn, scan_id)
-    cursor.execute(
-        'UPDATE scans SET status = ?, completed_at = NULL, duration = NULL WHERE id = ?',
+    conn.execute(
+        'UPDATE scans SET status = ?, completed_at = NULL, duration = NULL, cache_stats = NULL WHERE id = ?',
         ('created', scan_id)
     )
     conn.commit()
@@ -806,172 +1512,144 @@ def _get_or_recreate_scanner(scan_id):
     except Exception as e:
         print(f"Warning: could not remove stale screenshots dir: {e}")
 
-    settings = load_settings()
-    rotate_ua = settings.get('rotate_user_agents', False)
-
-    scanner = DomScoutScanner(
-        scan_id,
-        domain,
-        rate_limit,
-        RESOLVERS_FILE,
-        SCREENSHOTS_DIR,
-        rotate_ua,
-        TEMP_SCANS_DIR
-    )
-    active_scans[scan_id] = scanner
-    return scanner, None
-
 
 @app.route('/api/scan/<scan_id>/auto', methods=['POST'])
 def run_auto_scan(scan_id):
     """Run all tools automatically in sequence"""
-    scanner, err = _get_or_recreate_scanner(scan_id)
+    err = _check_scan_exists(scan_id)
     if err is not None:
         return err
     
+    priority = (request.get_json(silent=True) or {}).get('priority', 0)
+
     # Update scan status
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute('UPDATE scans SET status = ? WHERE id = ?', ('running', scan_id))
+    cursor.execute('UPDATE scans SET status = ? WHERE id = ?', ('queued', scan_id))
     conn.commit()
     conn.close()
     
-    # Start auto scan in background
-    thread = threading.Thread(target=run_scan, args=(scanner,))
-    thread.daemon = True
-    thread.start()
+    # Queue the auto scan; it starts once the scheduler has a free slot
+    scan_queue.enqueue(scan_id, 'scan', priority=priority, reset_results=scan_id not in active_scans)
+    notify_scan_activity(active_scans.get(scan_id))
     
-    return jsonify({'success': True, 'status': 'started'})
+    return jsonify({'success': True, 'status': 'queued', 'queue': scan_queue.position(scan_id)})
 
 
-def run_tool_async(scanner, tool_name):
-    """Run a single tool asynchronously"""
+def run_tool_async(scanner, tool_name, with_deps=False):
+    """Run a single tool (and optionally its upstream graph nodes) asynchronously"""
     try:
-        scanner.run_single_tool(tool_name)
+        if with_deps:
+            executed = scanner.run_tool_with_dependencies(tool_name)
+        else:
+            scanner.run_single_tool(tool_name)
+            executed = [tool_name]
 
         if scanner.scan_id in deleted_scans:
             return
         
-        # Save results to database after tool completion
+        # Save results to database after tool completion, all tools in one transaction
         conn = get_db_connection()
-        cursor = conn.cursor()
-
-        if not scan_exists(conn, scanner.scan_id):
+        try:
+            with write_transaction(conn):
+                if not scan_exists(conn, scanner.scan_id):
+                    return
+                for name in executed:
+                    if name in TOOL_NAMES:
+                        persist_tool_output(conn, scanner, name)
+                save_cache_stats(conn, scanner)
+        finally:
             conn.close()
-            return
-        
-        if tool_name == 'merge':
-            # Save subdomains after merge
-            # First delete existing subdomains for this scan
-            cursor.execute('DELETE FROM subdomains WHERE scan_id = ?', (scanner.scan_id,))
-            for subdomain in scanner.subdomains:
-                cursor.execute(
-                    'INSERT INTO subdomains (scan_id, subdomain) VALUES (?, ?)',
-                    (scanner.scan_id, subdomain)
-                )
-        
-        elif tool_name == 'dnsx':
-            # Save live subdomains after dnsx
-            # DNSx results are stored in scanner.live_subdomains
-            cursor.execute('DELETE FROM subdomains WHERE scan_id = ?', (scanner.scan_id,))
-            for subdomain in scanner.live_subdomains:
-                cursor.execute(
-                    'INSERT INTO subdomains (scan_id, subdomain) VALUES (?, ?)',
-                    (scanner.scan_id, subdomain)
-                )
-        
-        elif tool_name == 'httpx':
-            # Save URLs after httpx
-            # First delete existing urls for this scan
-            cursor.execute('DELETE FROM urls WHERE scan_id = ?', (scanner.scan_id,))
-            for url_data in scanner.urls:
-                cursor.execute(
-                    '''
-                    INSERT INTO urls (scan_id, url, status_code, title, webserver, technologies, content_length)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                    ''',
-                    (
-                        scanner.scan_id,
-                        url_data['url'],
-                        url_data.get('status_code'),
-                        url_data.get('title'),
-                        url_data.get('webserver'),
-                        serialize_technologies(url_data.get('technologies')),
-                        url_data.get('content_length')
-                    )
-                )
-        
-        elif tool_name == 'merge2':
-            # Save merged URLs after merge2
-            # First delete existing urls for this scan
-            cursor.execute('DELETE FROM urls WHERE scan_id = ?', (scanner.scan_id,))
-            # Read from all_urls_merged.txt
-            merged_file = os.path.join(scanner.scan_dir, "all_urls_merged.txt")
-            if os.path.exists(merged_file):
-                with open(merged_file, 'r') as f:
-                    for line in f:
-                        url = line.strip()
-                        if url:
-                            cursor.execute(
-                                '''
-                                INSERT INTO urls (scan_id, url, status_code, title, webserver, technologies, content_length)
-                                VALUES (?, ?, ?, ?, ?, ?, ?)
-                                ''',
-                                (scanner.scan_id, url, None, None, None, None, None)
-                            )
-        
-        elif tool_name == 'gowitness':
-            # Save screenshots after gowitness
-            # First delete existing screenshots for this scan
-            cursor.execute('DELETE FROM screenshots WHERE scan_id = ?', (scanner.scan_id,))
-            for screenshot in scanner.screenshots:
-                cursor.execute(
-                    'INSERT INTO screenshots (scan_id, url, filename, status_code, title, headers, roi_score) VALUES (?, ?, ?, ?, ?, ?, ?)',
-                    (scanner.scan_id, screenshot['url'], screenshot['filename'], 
-                     screenshot.get('status_code'), screenshot.get('title'), 
-                     json.dumps(screenshot.get('headers', {})), screenshot.get('roi_score', 50))
-                )
-
-        # Persist current status/results cache for this tool
-        tool_data = scanner.get_tools_status().get(tool_name, {'status': 'idle', 'count': 0})
-        upsert_tool_status(
-            conn,
-            scanner.scan_id,
-            tool_name,
-            tool_data.get('status', 'idle'),
-            tool_data.get('count', 0)
-        )
-        upsert_tool_results(
-            conn,
-            scanner.scan_id,
-            tool_name,
-            scanner.get_tool_results(tool_name)
-        )
-        
-        conn.commit()
-        conn.close()
     except Exception as e:
         print(f"Tool {tool_name} failed: {e}")
         try:
             conn = get_db_connection()
-            tool_data = scanner.get_tools_status().get(tool_name, {'status': 'failed', 'count': 0})
-            upsert_tool_status(
-                conn,
-                scanner.scan_id,
-                tool_name,
-                tool_data.get('status', 'failed'),
-                tool_data.get('count', 0)
-            )
-            upsert_tool_results(conn, scanner.scan_id, tool_name, [])
-            conn.commit()
-            conn.close()
+            try:
+                tool_data = scanner.get_tools_status().get(tool_name, {'status': 'failed', 'count': 0})
+                upsert_tool_status(
+                    conn,
+                    scanner.scan_id,
+                    tool_name,
+                    tool_data.get('status', 'failed'),
+                    tool_data.get('count', 0)
+                )
+                upsert_tool_results(conn, scanner.scan_id, tool_name, [])
+                conn.commit()
+            finally:
+                conn.close()
         except Exception:
             pass
+    finally:
+        notify_scan_activity(scanner)
+
+
+def persist_tool_output(conn, scanner, tool_name):
+    """Save the database rows and status/results cache produced by one tool.
+
+    Note: does not commit; the caller is responsible for committing the connection.
+    """
+    scan_id = scanner.scan_id
+
+    if tool_name == 'merge':
+        # Save subdomains after merge
+        replace_rows(conn, 'subdomains', scan_id, ('subdomain',),
+                     ((subdomain,) for subdomain in scanner.subdomains), len(scanner.subdomains))
+
+    elif tool_name in ('dnsx', 'wildcard'):
+        # Save live subdomains after dnsx (and again once wildcard hosts are pruned)
+        replace_rows(conn, 'subdomains', scan_id, ('subdomain',),
+                     ((subdomain,) for subdomain in scanner.live_subdomains), len(scanner.live_subdomains))
+
+    elif tool_name == 'httpx':
+        # Save URLs after httpx
+        replace_rows(conn, 'urls', scan_id, URL_COLUMNS, url_rows(scanner.urls), len(scanner.urls))
+
+    elif tool_name == 'merge2':
+        # Save merged URLs after merge2, streamed from all_urls_merged.txt
+        merged_file = os.path.join(scanner.scan_dir, "all_urls_merged.txt")
+        with contextlib.ExitStack() as files:
+            lines = files.enter_context(open(merged_file, 'r')) if os.path.exists(merged_file) else []
+            replace_rows(
+                conn, 'urls', scan_id, ('url',),
+                ((url,) for url in (line.strip() for line in lines) if url),
+                scanner.get_tools_status().get('merge2', {}).get('count')
+            )
+
+    elif tool_name == 'gowitness':
+        # Save screenshots after gowitness
+        replace_rows(conn, 'screenshots', scan_id, SCREENSHOT_COLUMNS,
+                     screenshot_rows(scanner.screenshots), len(scanner.screenshots))
+
+    if tool_name in ('httpx', 'merge2', 'gowitness'):
+        rebuild_scan_results(conn, scanner.scan_id)
+
+    # Persist current status/results cache for this tool
+    tool_data = scanner.get_tools_status().get(tool_name, {'status': 'idle', 'count': 0})
+    upsert_tool_status(
+        conn,
+        scanner.scan_id,
+        tool_name,
+        tool_data.get('status', 'idle'),
+        tool_data.get('count', 0)
+    )
+    upsert_tool_results(
+        conn,
+        scanner.scan_id,
+        tool_name,
+        scanner.get_tool_results(tool_name)
+    )
 
 
 @app.route('/api/scan/<scan_id>/tool/<tool_name>/results', methods=['GET'])
 def get_tool_results(scan_id, tool_name):
-    """Get results from a specific tool"""
+    """Get results from a specific tool
+
+    Without query parameters the whole list is returned. With cursor, limit
+    or q (substring) one page is returned, in the tool's own order.
+    """
+    if paging_requested(request.args):
+        return tool_results_page(scan_id, tool_name)
+
     # Try to get scanner from active scans
     if scan_id in active_scans:
         results = active_scans[scan_id].get_tool_results(tool_name)
@@ -990,11 +1668,123 @@ def get_tool_results(scan_id, tool_name):
     return jsonify({'results': results, 'tool': tool_name})
 
 
+def tool_results_page(scan_id, tool_name):
+    """One page of a tool's results; the cursor is the position of the last result sent
+
+    total (results matching q) is only counted for the first page.
+    """
+    try:
+        limit = page_size(request.args.get('limit'))
+        cursor = request.args.get('cursor')
+        position = decode_cursor(cursor)[0] if cursor else -1
+        if not isinstance(position, int):
+            raise ValueError(f"Invalid cursor: {cursor}")
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    search = request.args.get('q', '').lower()
+
+    if scan_id in active_scans:
+        matches = [
+            (index, result) for index, result in enumerate(active_scans[scan_id].get_tool_results(tool_name))
+            if index > position and (not search or search in result.lower())
+        ]
+        total = len(matches) if position < 0 else None
+        page = matches[:limit + 1]
+    else:
+        conn = get_db_connection()
+        try:
+            if not scan_exists(conn, scan_id):
+                return jsonify({'error': 'Scan not found'}), 404
+            # The cached list is one JSON array; json_each pages it without sending the rest
+            where = "tool_results.scan_id = ? AND tool_results.tool_name = ?"
+            params = [scan_id, tool_name]
+            if search:
+                where += " AND lower(value) LIKE ? ESCAPE '\\'"
+                params.append(like_pattern(search))
+            page = [
+                (row['key'], row['value']) for row in conn.execute(
+                    f"SELECT key, value FROM tool_results, json_each(tool_results.results_json) "
+                    f"WHERE {where} AND key > ? ORDER BY key LIMIT ?",
+                    params + [position, limit + 1]
+                )
+            ]
+            total = None
+            if position < 0:
+                total = conn.execute(
+                    f"SELECT COUNT(*) FROM tool_results, json_each(tool_results.results_json) WHERE {where}",
+                    params
+                ).fetchone()[0]
+        finally:
+            conn.close()
+
+    next_cursor = encode_cursor([page[limit - 1][0]]) if len(page) > limit else None
+    return jsonify({
+        'results': [result for _, result in page[:limit]],
+        'tool': tool_name,
+        'next_cursor': next_cursor,
+        'total': total,
+    })
+
+
+@app.route('/api/scan/<scan_id>/tool/<tool_name>/tail', methods=['GET'])
+def tail_tool_results(scan_id, tool_name):
+    """Results a tool added since a cursor
+
+    Query params: cursor (from the previous response; omit to start from the
+    beginning) and limit (lines per response, up to TAIL_MAX_LIMIT). Active
+    scans are read from the tool's output file at the cursor's byte offset;
+    finished scans page through the SQLite cache. 'reset' tells the client to
+    drop what it has (the output was rewritten, or the scan finished and is
+    now served from the cache); 'more' that the next page is already there.
+    """
+    if tool_name not in TOOL_NAMES:
+        return jsonify({'error': f'Unknown tool: {tool_name}'}), 400
+    cursor = request.args.get('cursor') or None
+    try:
+        limit = min(max(1, int(request.args.get('limit', TAIL_MAX_LINES))), TAIL_MAX_LIMIT)
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+
+    scanner = active_scans.get(scan_id)
+    if scanner is not None:
+        tail = scanner.tail_tool_results(tool_name, cursor, limit)
+    else:
+        conn = get_db_connection()
+        scan = conn.execute('SELECT id FROM scans WHERE id = ?', (scan_id,)).fetchone()
+        conn.close()
+        if not scan:
+            return jsonify({'error': 'Scan not found'}), 404
+
+        # Cached results are paged by index; a cursor from the live scan starts over
+        start = 0
+        reset = cursor is not None
+        if cursor and cursor.startswith('db:') and cursor[3:].isdigit():
+            start = int(cursor[3:])
+            reset = False
+        results = load_tool_results_from_db(scan_id, tool_name)
+        if start > len(results):
+            start, reset = 0, True
+        lines = results[start:start + limit]
+        tail = {
+            'lines': lines,
+            'cursor': f"db:{start + len(lines)}",
+            'reset': reset,
+            'more': start + len(lines) < len(results),
+        }
+
+    return jsonify(dict(tail, tool=tool_name))
+
+
 @app.route('/api/scan/<scan_id>', methods=['DELETE'])
 def delete_scan(scan_id):
     """Delete a scan and all its data"""
     try:
         deleted_scans.add(scan_id)
+        scan_queue.cancel(scan_id)
+        if scan_id in active_scans:
+            # Kill the scan's running tools instead of letting them finish for nothing
+            active_scans[scan_id].cancel()
+        notify_scan_activity(active_scans.get(scan_id))
 
         conn = get_db_connection()
         cursor = conn.cursor()
@@ -1002,9 +1792,11 @@ def delete_scan(scan_id):
         # Delete from all tables
         cursor.execute('DELETE FROM screenshots WHERE scan_id = ?', (scan_id,))
         cursor.execute('DELETE FROM urls WHERE scan_id = ?', (scan_id,))
+        cursor.execute('DELETE FROM scan_results WHERE scan_id = ?', (scan_id,))
         cursor.execute('DELETE FROM subdomains WHERE scan_id = ?', (scan_id,))
         cursor.execute('DELETE FROM tool_results WHERE scan_id = ?', (scan_id,))
         cursor.execute('DELETE FROM tool_status WHERE scan_id = ?', (scan_id,))
+        cursor.execute('DELETE FROM tool_metrics WHERE scan_id = ?', (scan_id,))
         cursor.execute('DELETE FROM scans WHERE id = ?', (scan_id,))
         
         conn.commit()
@@ -1103,6 +1895,144 @@ def update_user_agents_setting():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+@app.route('/api/settings/scheduler', methods=['POST'])
+def update_scheduler_settings():
+    """Update scan/heavy-tool concurrency limits and the global request budget (applied immediately)"""
+    try:
+        data = request.get_json() or {}
+        settings = load_settings()
+
+        for key in ('max_concurrent_scans', 'max_concurrent_heavy_tools'):
+            if key in data:
+                value = int(data[key])
+                if value < 1:
+                    return jsonify({'success': False, 'error': f'{key} must be at least 1'}), 400
+                settings[key] = value
+
+        if 'global_rate_limit' in data:
+            value = int(data['global_rate_limit'])
+            if value < 0:
+                return jsonify({'success': False, 'error': 'global_rate_limit must be 0 or more'}), 400
+            settings['global_rate_limit'] = value
+
+        if not save_settings(settings):
+            return jsonify({'success': False, 'error': 'Failed to save settings'}), 500
+
+        scan_queue.set_max_concurrent(settings.get('max_concurrent_scans', DEFAULT_MAX_CONCURRENT_SCANS))
+        heavy_tool_slots.set_limit(settings.get('max_concurrent_heavy_tools', DEFAULT_MAX_CONCURRENT_HEAVY_TOOLS))
+        request_budget.set_rate(settings.get('global_rate_limit', DEFAULT_GLOBAL_RATE_LIMIT))
+        return jsonify({'success': True, 'message': 'Scheduler settings updated'})
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'error': 'Limits must be integers'}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+def load_roi_scorer():
+    """Compile the saved ROI rule set (defaults when no rule file exists)"""
+    rules_file = load_settings().get('roi_rules_file', ROI_RULES_FILE)
+    if os.path.exists(rules_file):
+        return RoiScorer(load_rules(rules_file))
+    return RoiScorer()
+
+
+@app.route('/api/settings/roi-rules', methods=['GET'])
+def get_roi_rules():
+    """Get the effective ROI rule set"""
+    rules_file = load_settings().get('roi_rules_file', ROI_RULES_FILE)
+    try:
+        rules = load_rules(rules_file) if os.path.exists(rules_file) else {}
+        return jsonify({'success': True, 'rules': merge_rules(rules), 'path': rules_file})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@app.route('/api/settings/roi-rules', methods=['POST'])
+def update_roi_rules():
+    """Save an ROI rule set (partial rule sets are merged with the defaults)"""
+    data = request.get_json(silent=True) or {}
+    rules = data.get('rules')
+    if not isinstance(rules, dict):
+        return jsonify({'success': False, 'error': 'rules must be an object'}), 400
+
+    try:
+        # Compiling validates the structure before anything is written
+        RoiScorer(rules)
+    except Exception as e:
+        return jsonify({'success': False, 'error': f'Invalid ROI rules: {e}'}), 400
+
+    rules_file = load_settings().get('roi_rules_file', ROI_RULES_FILE)
+    try:
+        with open(rules_file, 'w') as f:
+            json.dump(merge_rules(rules), f, indent=2)
+        return jsonify({'success': True, 'message': 'ROI rules updated', 'path': rules_file})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+RESOLVER_SETTINGS = {
+    'resolver_health': bool,
+    'resolver_pool_size': int,
+    'resolver_max_error_rate': float,
+    'resolver_max_latency_ms': float,
+    'resolver_check_interval': float,
+}
+
+
+def load_resolver_pool():
+    """Resolver health stats configured from the current settings"""
+    settings = load_settings()
+    settings.setdefault('resolver_stats_file', RESOLVER_STATS_FILE)
+    return ResolverPool.from_options(settings)
+
+
+def resolver_pool_state(pool):
+    addresses = load_nameservers(RESOLVERS_FILE)
+    selected = pool.select(addresses)
+    return {
+        'resolvers': pool.report(addresses),
+        'selected': [{'resolver': format_nameserver(address), 'weight': weight} for address, weight in selected],
+        'settings': {key: load_settings().get(key) for key in RESOLVER_SETTINGS},
+    }
+
+
+@app.route('/api/settings/resolvers', methods=['GET'])
+def get_resolver_health():
+    """Per-resolver health stats and the subset new scans would use"""
+    try:
+        return jsonify(dict(success=True, **resolver_pool_state(load_resolver_pool())))
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@app.route('/api/settings/resolvers', methods=['POST'])
+def update_resolver_health():
+    """Update resolver selection settings; {"check": true} re-checks every resolver now"""
+    data = request.get_json(silent=True) or {}
+    settings = load_settings()
+    try:
+        for key, cast in RESOLVER_SETTINGS.items():
+            if key in data:
+                value = cast(data[key])
+                if cast is not bool and value <= 0:
+                    return jsonify({'success': False, 'error': f'{key} must be positive'}), 400
+                settings[key] = value
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'error': 'Invalid resolver setting value'}), 400
+
+    if not save_settings(settings):
+        return jsonify({'success': False, 'error': 'Failed to save settings'}), 500
+
+    try:
+        pool = load_resolver_pool()
+        if data.get('check'):
+            pool.check(load_nameservers(RESOLVERS_FILE))
+            pool.save()
+        return jsonify(dict(success=True, message='Resolver settings updated', **resolver_pool_state(pool)))
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
 @app.route('/api/settings/subfinder-config', methods=['GET'])
 def get_subfinder_config():
     """Get subfinder provider config"""
@@ -1137,8 +2067,31 @@ def update_subfinder_config():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+# Global scheduler: bounded concurrent scans plus shared heavy-tool slots and request budget
+_scheduler_settings = load_settings()
+heavy_tool_slots = ToolSlots(
+    _scheduler_settings.get('max_concurrent_heavy_tools', DEFAULT_MAX_CONCURRENT_HEAVY_TOOLS)
+)
+request_budget = RequestBudget(
+    _scheduler_settings.get('global_rate_limit', DEFAULT_GLOBAL_RATE_LIMIT)
+)
+# Bumped whenever a scan starts, finishes, is queued or deleted (wakes the event streams)
+scan_activity = ChangeFeed()
+scan_queue = ScanQueue(
+    get_db_connection,
+    execute_job,
+    _scheduler_settings.get('max_concurrent_scans', DEFAULT_MAX_CONCURRENT_SCANS)
+)
+
+
 if __name__ == '__main__':
     init_db()
+    # With the debug reloader only the serving child process runs jobs
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        requeued = scan_queue.recover()
+        if requeued:
+            print(f"Scheduler: re-queued {requeued} interrupted jobs")
+        scan_queue.start()
     print("=" * 60)
     print("DomScout v2 Server Starting...")
     print("=" * 60)
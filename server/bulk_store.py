@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Bulk writes to the results database.
+
+A scan's subdomains, URLs and screenshots are written with ``executemany``
+in batches of ``batch_size`` rows, all inside one transaction. The rows are
+streamed from generators, so a large scan is never copied into one big
+parameter list. The transaction takes the write lock up front (``BEGIN
+IMMEDIATE``). A deferred transaction that has already read can fail at once
+with "database is locked" when it upgrades to a write, while an immediate one
+waits its turn under the busy timeout.
+
+When a load is large compared to the table it goes into, the table's
+secondary indexes can be dropped first and rebuilt once at the end. Building
+an index from sorted keys is cheaper than updating it row by row. It is off
+by default, because the rebuild covers the rows of every scan in the table.
+"""
+import contextlib
+import itertools
+
+DEFAULT_BATCH_SIZE = 5000
+
+
+@contextlib.contextmanager
+def write_transaction(conn):
+    """Run the block in one transaction holding the write lock; committed on success
+
+    Inside a transaction the caller already opened, the block just joins it.
+    """
+    if conn.in_transaction:
+        yield conn
+        return
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+
+def batched(rows, size):
+    """Lists of at most size rows from an iterable"""
+    rows = iter(rows)
+    while True:
+        batch = list(itertools.islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def insert_rows(conn, table, columns, rows, batch_size=DEFAULT_BATCH_SIZE):
+    """INSERT rows (tuples in columns order) into table in executemany batches; returns the row count"""
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    count = 0
+    for batch in batched(rows, max(1, int(batch_size))):
+        conn.executemany(sql, batch)
+        count += len(batch)
+    return count
+
+
+def secondary_indexes(conn, table):
+    """(name, CREATE INDEX sql) of the indexes of table that can be dropped and recreated"""
+    return [
+        (row[0], row[1]) for row in conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+            (table,)
+        )
+    ]
+
+
+@contextlib.contextmanager
+def indexes_dropped(conn, table, enabled=True):
+    """Drop table's secondary indexes for the block and recreate them after it (run inside a transaction)"""
+    indexes = secondary_indexes(conn, table) if enabled else []
+    for name, _ in indexes:
+        conn.execute(f'DROP INDEX "{name}"')
+    yield
+    for _, sql in indexes:
+        conn.execute(sql)
+
+
+def worth_dropping_indexes(conn, table, expected_rows, ratio):
+    """Whether a load of expected_rows is at least ratio times the rows table already holds
+
+    The table size is MAX(rowid), an upper bound read in constant time.
+    """
+    if not ratio or not expected_rows:
+        return False
+    existing = conn.execute(f'SELECT MAX(rowid) FROM {table}').fetchone()[0] or 0
+    return expected_rows >= ratio * existing
+
+
+def replace_scan_rows(conn, table, scan_id, columns, rows, batch_size=DEFAULT_BATCH_SIZE,
+                      expected_rows=None, drop_indexes_ratio=0):
+    """Replace the rows of scan_id in table with rows (tuples in columns order, without scan_id)
+
+    Args:
+        conn: Connection inside a write transaction
+        table: Table with a scan_id column
+        scan_id: Scan whose rows are replaced
+        columns: Inserted columns besides scan_id
+        rows: Iterable of row tuples; consumed once
+        batch_size: Rows per executemany call
+        expected_rows: Number of rows, when known (enables dropping the indexes)
+        drop_indexes_ratio: Drop and rebuild the table's indexes when expected_rows is at
+            least this many times the rows already in the table (0 = never)
+
+    Returns:
+        Number of rows inserted
+    """
+    conn.execute(f'DELETE FROM {table} WHERE scan_id = ?', (scan_id,))
+    drop = worth_dropping_indexes(conn, table, expected_rows, drop_indexes_ratio)
+    with indexes_dropped(conn, table, drop):
+        return insert_rows(
+            conn, table, ('scan_id',) + tuple(columns), ((scan_id,) + tuple(row) for row in rows), batch_size
+        )
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""Merged results view of a scan, paged with keyset cursors.
+
+The Results page shows one row per canonical URL: the ``urls`` row joined
+with its screenshot, gaps in status, title and technologies filled from
+other URLs and screenshots of the same host. ``merge_results`` builds those
+rows once, when URLs or screenshots are saved, into the ``scan_results``
+table; pages are then read from it with ``WHERE (sort key) > (cursor)``, so
+the cost of a page does not grow with how deep it is.
+
+Every sort is ascending on stored columns (``roi_order`` is the negated ROI
+score) so that a single row-value comparison resumes it from an index.
+"""
+import base64
+import json
+from urllib.parse import urlsplit
+
+# Sort name -> columns ascending, the last one unique; '-' prefixed names are reversed
+RESULT_SORTS = {
+    'roi': ('roi_order', 'status_rank', 'id'),
+    'status': ('status_rank', 'roi_order', 'id'),
+    'url': ('url', 'id'),
+}
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+
+# Status filter classes, as in the Results page buttons
+STATUS_CLASSES = {
+    '2xx': (200, 299),
+    '3xx': (300, 399),
+    '4xx': (400, 499),
+    '5xx': (500, 999),
+}
+
+
+def hostname(url):
+    """Lowercase hostname of a URL or bare host, or None"""
+    if not url:
+        return None
+    normalized = url if url.startswith(('http://', 'https://')) else f"https://{url}"
+    try:
+        return (urlsplit(normalized).hostname or '').lower() or None
+    except ValueError:
+        return None
+
+
+def canonical_url(url):
+    """scheme://host[:port]/path without query, default port or trailing slash"""
+    if not url:
+        return ''
+    normalized = url if url.startswith(('http://', 'https://')) else f"https://{url}"
+    try:
+        parts = urlsplit(normalized)
+        port = parts.port
+    except ValueError:
+        return url.strip().lower()
+    scheme = parts.scheme.lower()
+    netloc = (parts.hostname or '').lower()
+    if port is not None and (scheme, port) not in (('https', 443), ('http', 80)):
+        netloc = f"{netloc}:{port}"
+    path = parts.path or '/'
+    if path != '/':
+        path = path.rstrip('/') or '/'
+    return f"{scheme}://{netloc}{path}"
+
+
+def _screenshot_score(item):
+    return (item.get('status_code') is not None) + bool(item.get('title')) + bool(item.get('filename'))
+
+
+def _meta_score(result):
+    return (result['status_code'] is not None) + bool(result['title']) + bool(result['technologies'])
+
+
+def _better_candidate(candidate, current):
+    """Prefer URLs without a query, then more metadata, then the shorter URL"""
+    candidate_query = '?' in candidate['url']
+    current_query = '?' in current['url']
+    if candidate_query != current_query:
+        return not candidate_query
+    if _meta_score(candidate) != _meta_score(current):
+        return _meta_score(candidate) > _meta_score(current)
+    if len(candidate['url']) != len(current['url']):
+        return len(candidate['url']) < len(current['url'])
+    return candidate['url'] < current['url']
+
+
+def merge_results(urls, screenshots):
+    """Result rows of a scan, best first
+
+    Args:
+        urls: urls rows ordered by url, technologies already parsed into lists
+        screenshots: screenshots rows ordered by ROI score descending, then url
+    """
+    by_url = {}
+    by_host = {}
+    for screenshot in screenshots:
+        if screenshot.get('url'):
+            existing = by_url.get(screenshot['url'])
+            if existing is None or _screenshot_score(screenshot) >= _screenshot_score(existing):
+                by_url[screenshot['url']] = screenshot
+        host = hostname(screenshot.get('url'))
+        if host:
+            existing = by_host.get(host)
+            if existing is None or _screenshot_score(screenshot) >= _screenshot_score(existing):
+                by_host[host] = screenshot
+
+    # First non-empty value of each field across the URLs of a host; technologies are merged
+    host_metadata = {}
+    for url_data in urls:
+        host = hostname(url_data['url'])
+        if not host:
+            continue
+        current = host_metadata.setdefault(host, {
+            'status_code': None, 'webserver': None, 'technologies': [], 'content_length': None, 'title': None
+        })
+        for key in ('status_code', 'content_length'):
+            if url_data.get(key) is not None and current[key] is None:
+                current[key] = url_data[key]
+        for key in ('webserver', 'title'):
+            if url_data.get(key) and not current[key]:
+                current[key] = url_data[key]
+        for tech in url_data.get('technologies') or []:
+            if tech not in current['technologies']:
+                current['technologies'].append(tech)
+
+    deduped = {}
+    for url_data in urls:
+        url = url_data['url']
+        screenshot = by_url.get(url)
+        host = hostname(url)
+        metadata = host_metadata.get(host) or {}
+        host_screenshot = by_host.get(host) or {}
+
+        status_code = url_data.get('status_code')
+        for fallback in (screenshot or {}, metadata, host_screenshot):
+            if status_code is None:
+                status_code = fallback.get('status_code')
+        title = ((screenshot or {}).get('title') or url_data.get('title')
+                 or metadata.get('title') or host_screenshot.get('title'))
+
+        result = {
+            'url': url,
+            'host': host,
+            'status_code': status_code,
+            'title': title,
+            'webserver': url_data.get('webserver') or metadata.get('webserver'),
+            'technologies': url_data.get('technologies') or list(metadata.get('technologies') or []),
+            'content_length': url_data.get('content_length') or metadata.get('content_length'),
+            'screenshot': screenshot,
+            'roi_score': screenshot['roi_score'] if screenshot else 50,
+        }
+        key = canonical_url(url)
+        if key not in deduped or _better_candidate(result, deduped[key]):
+            deduped[key] = result
+
+    results = list(deduped.values())
+    results.sort(key=lambda result: (-(result['roi_score'] or 50), result['status_code'] or 999))
+    return results
+
+
+def result_rows(scan_id, results):
+    """scan_results insert parameters for merged results"""
+    for result in results:
+        screenshot = result['screenshot'] or {}
+        yield (
+            scan_id, result['url'], result['host'], result['status_code'], result['status_code'] or 999,
+            result['title'], result['webserver'], json.dumps(result['technologies']),
+            result['content_length'], result['roi_score'] or 50, -(result['roi_score'] or 50),
+            screenshot.get('id'), screenshot.get('filename') or None
+        )
+
+
+def encode_cursor(values):
+    """Opaque cursor for the sort key values of the last row of a page"""
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Sort key values of a cursor; ValueError if it was not made by encode_cursor"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if not isinstance(values, list):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return values
+
+
+def parse_sort(sort, sorts):
+    """(columns, descending) for a sort name such as 'roi' or '-url'; ValueError if unknown"""
+    descending = sort.startswith('-')
+    columns = sorts.get(sort.lstrip('-'))
+    if columns is None:
+        raise ValueError(f"Unknown sort: {sort} (expected one of {', '.join(sorted(sorts))}, optionally prefixed with '-')")
+    return columns, descending
+
+
+def page_size(limit):
+    """Page size from a request's limit parameter; ValueError if it is not a number"""
+    if limit in (None, ''):
+        return DEFAULT_PAGE_SIZE
+    return min(max(1, int(limit)), MAX_PAGE_SIZE)
+
+
+def keyset_page(conn, table, where, params, columns, descending, cursor, limit, select='*'):
+    """One page of rows from table plus the cursor of the next page (None on the last page)
+
+    Args:
+        conn: sqlite3 connection with a Row factory
+        table: Table to read
+        where: SQL conditions ANDed together (filters)
+        params: Parameters of where
+        columns: Sort columns; the last one must be unique
+        descending: Walk the sort backwards
+        cursor: Cursor of the previous page, or None for the first page
+        limit: Rows per page
+        select: Selected columns (must include the sort columns)
+    """
+    where = list(where)
+    params = list(params)
+    key = f"({', '.join(columns)})"
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != len(columns):
+            raise ValueError(f"Invalid cursor: {cursor}")
+        where.append(f"{key} {'<' if descending else '>'} ({', '.join('?' * len(columns))})")
+        params.extend(values)
+    direction = ' DESC' if descending else ''
+    rows = conn.execute(
+        f"SELECT {select} FROM {table} WHERE {' AND '.join(where) or '1'} "
+        f"ORDER BY {', '.join(column + direction for column in columns)} LIMIT ?",
+        params + [limit + 1]
+    ).fetchall()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1][column] for column in columns])
+    return rows, next_cursor
+
+
+def status_condition(value, column='status_code'):
+    """SQL condition and parameters for a status filter such as '200', '4xx' or '200,3xx'"""
+    conditions = []
+    params = []
+    for item in str(value).split(','):
+        item = item.strip().lower()
+        if not item:
+            continue
+        if item in STATUS_CLASSES:
+            conditions.append(f"{column} BETWEEN ? AND ?")
+            params.extend(STATUS_CLASSES[item])
+        elif item.isdigit():
+            conditions.append(f"{column} = ?")
+            params.append(int(item))
+        else:
+            raise ValueError(f"Invalid status filter: {item}")
+    if not conditions:
+        return None, []
+    return f"({' OR '.join(conditions)})", params
+
+
+def _like_escape(text):
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def like_pattern(text):
+    """LIKE pattern matching text anywhere (used with ESCAPE '\\')"""
+    return f"%{_like_escape(text)}%"
+
+
+def suffix_pattern(text):
+    """LIKE pattern matching values that end with text (used with ESCAPE '\\')"""
+    return f"%{_like_escape(text)}"
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""Server-side scan scheduler.
+
+Scan and tool runs are stored as jobs in the ``scan_jobs`` table and executed
+by a dispatcher that never runs more than ``max_concurrent`` jobs at once.
+Pending jobs survive a server restart and are picked in priority order, then
+FIFO. Heavy tools (dnsx, httpx, crawlers, Chrome) additionally share a
+``ToolSlots`` limiter so concurrent scans cannot pile up those processes.
+"""
+import threading
+import traceback
+
+
+class ToolSlots:
+    """Resizable counting semaphore limiting concurrently running heavy tools"""
+
+    def __init__(self, limit):
+        self._cond = threading.Condition()
+        self.limit = max(1, int(limit))
+        self.in_use = 0
+
+    def set_limit(self, limit):
+        """Change the number of slots; waiting tools are woken up if it grew"""
+        with self._cond:
+            self.limit = max(1, int(limit))
+            self._cond.notify_all()
+
+    def __enter__(self):
+        with self._cond:
+            while self.in_use >= self.limit:
+                self._cond.wait()
+            self.in_use += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        with self._cond:
+            self.in_use -= 1
+            self._cond.notify_all()
+        return False
+
+
+class ScanQueue:
+    """Persistent priority/FIFO job queue with bounded concurrency"""
+
+    def __init__(self, connect, execute_job, max_concurrent=2):
+        """
+        Args:
+            connect: Callable returning a sqlite3 connection with Row factory
+            execute_job: Callable run in a worker thread with the job dict
+            max_concurrent: Maximum number of jobs running at the same time
+        """
+        self.connect = connect
+        self.execute_job = execute_job
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.running = {}
+        self._cond = threading.Condition()
+        self._dispatcher = None
+
+    def start(self):
+        """Start the dispatcher thread (idempotent)"""
+        with self._cond:
+            if self._dispatcher is not None:
+                return
+            self._dispatcher = threading.Thread(target=self._dispatch_loop, daemon=True)
+            self._dispatcher.start()
+
+    def recover(self):
+        """Re-queue jobs that were running when the server last stopped"""
+        conn = self.connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                "UPDATE scan_jobs SET status = 'queued', started_at = NULL WHERE status = 'running'"
+            )
+            conn.commit()
+            return cursor.rowcount
+        finally:
+            conn.close()
+
+    def set_max_concurrent(self, max_concurrent):
+        """Change the number of concurrently running jobs"""
+        with self._cond:
+            self.max_concurrent = max(1, int(max_concurrent))
+            self._cond.notify_all()
+
+    def enqueue(self, scan_id, kind='scan', tool_name=None, with_deps=False, priority=0, reset_results=False):
+        """Add a job to the queue and return its id
+
+        reset_results marks a job queued to rerun an idle scan; execute_job decides
+        when the job starts whether the scan's previous results are cleared.
+        """
+        conn = self.connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                '''
+                INSERT INTO scan_jobs (scan_id, kind, tool_name, with_deps, priority, reset_results, status)
+                VALUES (?, ?, ?, ?, ?, ?, 'queued')
+                ''',
+                (scan_id, kind, tool_name, int(bool(with_deps)), int(priority or 0), int(bool(reset_results)))
+            )
+            conn.commit()
+            job_id = cursor.lastrowid
+        finally:
+            conn.close()
+
+        self.start()
+        with self._cond:
+            self._cond.notify_all()
+        return job_id
+
+    def cancel(self, scan_id):
+        """Drop queued (not yet running) jobs for a scan"""
+        conn = self.connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                "UPDATE scan_jobs SET status = 'cancelled', finished_at = CURRENT_TIMESTAMP "
+                "WHERE scan_id = ? AND status = 'queued'",
+                (scan_id,)
+            )
+            conn.commit()
+            return cursor.rowcount
+        finally:
+            conn.close()
+
+    def position(self, scan_id):
+        """Return queue info for the scan's oldest pending job, or None"""
+        conn = self.connect()
+        try:
+            cursor = conn.cursor()
+            job = cursor.execute(
+                '''
+                SELECT id, kind, tool_name, priority, status FROM scan_jobs
+                WHERE scan_id = ? AND status IN ('queued', 'running')
+                ORDER BY status = 'running' DESC, priority DESC, id
+                LIMIT 1
+                ''',
+                (scan_id,)
+            ).fetchone()
+            if not job:
+                return None
+
+            info = {
+                'job_id': job['id'],
+                'kind': job['kind'],
+                'tool': job['tool_name'],
+                'status': job['status'],
+                'position': 0,
+                'queued_total': cursor.execute(
+                    "SELECT COUNT(*) FROM scan_jobs WHERE status = 'queued'"
+                ).fetchone()[0],
+                'running_total': len(self.running),
+                'max_concurrent': self.max_concurrent
+            }
+            if job['status'] == 'queued':
+                ahead = cursor.execute(
+                    '''
+                    SELECT COUNT(*) FROM scan_jobs
+                    WHERE status = 'queued' AND (priority > ? OR (priority = ? AND id < ?))
+                    ''',
+                    (job['priority'], job['priority'], job['id'])
+                ).fetchone()[0]
+                info['position'] = ahead + 1
+            return info
+        finally:
+            conn.close()
+
+    def _claim_next(self):
+        """Mark the next queued job as running and return it, or None
+
+        Jobs of a scan that already has a running job wait: two jobs of one
+        scan would share (and clean up) the same scan directory.
+        """
+        conn = self.connect()
+        try:
+            cursor = conn.cursor()
+            job = cursor.execute(
+                '''
+                SELECT * FROM scan_jobs
+                WHERE status = 'queued'
+                  AND scan_id NOT IN (SELECT scan_id FROM scan_jobs WHERE status = 'running')
+                ORDER BY priority DESC, id LIMIT 1
+                '''
+            ).fetchone()
+            if not job:
+                return None
+            cursor.execute(
+                "UPDATE scan_jobs SET status = 'running', started_at = CURRENT_TIMESTAMP "
+                "WHERE id = ? AND status = 'queued'",
+                (job['id'],)
+            )
+            conn.commit()
+            return dict(job) if cursor.rowcount else None
+        finally:
+            conn.close()
+
+    def _finish(self, job_id, status):
+        conn = self.connect()
+        try:
+            conn.execute(
+                'UPDATE scan_jobs SET status = ?, finished_at = CURRENT_TIMESTAMP WHERE id = ?',
+                (status, job_id)
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _dispatch_loop(self):
+        while True:
+            with self._cond:
+                while len(self.running) >= self.max_concurrent:
+                    self._cond.wait()
+            try:
+                job = self._claim_next()
+            except Exception as e:
+                print(f"Scan queue: failed to claim job: {e}")
+                job = None
+
+            if job is None:
+                with self._cond:
+                    # Woken by enqueue() or a finishing job; poll occasionally as a safety net
+                    self._cond.wait(timeout=5)
+                continue
+
+            with self._cond:
+                worker = threading.Thread(target=self._run_job, args=(job,), daemon=True)
+                self.running[job['id']] = job
+                worker.start()
+
+    def _run_job(self, job):
+        status = 'done'
+        try:
+            self.execute_job(job)
+        except Exception as e:
+            status = 'failed'
+            print(f"Scan queue: job {job['id']} ({job['kind']} for {job['scan_id']}) failed: {e}")
+            traceback.print_exc()
+        finally:
+            try:
+                self._finish(job['id'], status)
+            except Exception as e:
+                print(f"Scan queue: could not record job {job['id']} result: {e}")
+            with self._cond:
+                self.running.pop(job['id'], None)
+                self._cond.notify_all()
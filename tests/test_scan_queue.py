@@ -0,0 +1,51 @@
+"""Scheduler claims: one running job per scan, rescan resets decided when a job starts"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'server'))
+
+import pytest
+
+import app as server
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    monkeypatch.setattr(server, 'DB_PATH', str(tmp_path / 'domscout.db'))
+    server.init_db()
+    conn = server.get_db_connection()
+    for scan_id in ('s1', 's2'):
+        conn.execute("INSERT INTO scans (id, domain, status) VALUES (?, 'example.com', 'completed')", (scan_id,))
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(server.scan_queue, 'start', lambda: None)
+    monkeypatch.setattr(server.scan_queue, 'max_concurrent', 4)
+    return server.scan_queue
+
+
+def test_jobs_of_a_running_scan_wait(queue):
+    queue.enqueue('s1', 'scan')
+    queue.enqueue('s1', 'tool', tool_name='subfinder')
+    queue.enqueue('s2', 'tool', tool_name='subfinder')
+
+    first = queue._claim_next()
+    second = queue._claim_next()
+    assert (first['scan_id'], second['scan_id']) == ('s1', 's2')
+    assert queue._claim_next() is None
+
+    queue._finish(first['id'], 'done')
+    third = queue._claim_next()
+    assert (third['scan_id'], third['kind']) == ('s1', 'tool')
+
+
+def test_rescan_reset_skipped_once_another_job_ran(queue, monkeypatch):
+    monkeypatch.setattr(server, 'active_scans', {})
+    queue.enqueue('s1', 'scan', reset_results=True)
+    queue.enqueue('s1', 'tool', tool_name='subfinder', reset_results=True)
+
+    scan_job = queue._claim_next()
+    assert server._job_starts_rescan(scan_job)
+    queue._finish(scan_job['id'], 'done')
+
+    tool_job = queue._claim_next()
+    assert not server._job_starts_rescan(tool_job)
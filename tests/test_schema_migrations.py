@@ -0,0 +1,42 @@
+"""Schema migrations applied by init_db to databases created by older versions"""
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'server'))
+
+import app as server
+
+
+def _columns(conn, table):
+    return {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+
+
+def test_version_2_database_gets_scan_jobs_reset_results(tmp_path, monkeypatch):
+    monkeypatch.setattr(server, 'DB_PATH', str(tmp_path / 'domscout.db'))
+    conn = sqlite3.connect(server.DB_PATH)
+    server.migrate_db(conn, server.SCHEMA_MIGRATIONS[:2])
+    assert conn.execute('PRAGMA user_version').fetchone()[0] == 2
+    assert 'reset_results' not in _columns(conn, 'scan_jobs')
+    conn.execute("INSERT INTO scans (id, domain, status) VALUES ('s1', 'example.com', 'completed')")
+    conn.commit()
+    conn.close()
+
+    assert server.init_db() == len(server.SCHEMA_MIGRATIONS)
+
+    conn = sqlite3.connect(server.DB_PATH)
+    assert 'reset_results' in _columns(conn, 'scan_jobs')
+    assert conn.execute('SELECT domain FROM scans').fetchall() == [('example.com',)]
+    conn.close()
+
+    monkeypatch.setattr(server.scan_queue, 'start', lambda: None)
+    job_id = server.scan_queue.enqueue('s1', 'tool', tool_name='subfinder', reset_results=True)
+    conn = sqlite3.connect(server.DB_PATH)
+    assert conn.execute('SELECT reset_results FROM scan_jobs WHERE id = ?', (job_id,)).fetchone() == (1,)
+    conn.close()
+
+
+def test_init_db_is_idempotent(tmp_path, monkeypatch):
+    monkeypatch.setattr(server, 'DB_PATH', str(tmp_path / 'domscout.db'))
+    assert server.init_db() == len(server.SCHEMA_MIGRATIONS)
+    assert server.init_db() == len(server.SCHEMA_MIGRATIONS)
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Runner for the external tools of a scan.
+
+Tools are started from argument lists (no shell), each in its own process
+group, so a timeout or a cancelled scan kills the tool together with any
+children it spawned. Every child is reaped with os.wait4, which also returns
+its CPU time and peak RSS; wall time, user/system CPU and memory are added
+up per tool and reported by the scan's API.
+
+A child's ru_maxrss starts at the server's own peak RSS, copied in at fork.
+When it is no higher than that, the peak comes from the tool's VmHWM, sampled
+from /proc while it runs (Linux).
+"""
+import contextlib
+import os
+import resource
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+# Seconds a single run of each tool may take (gau runs once per domain)
+DEFAULT_TOOL_TIMEOUTS = {
+    'subfinder': 900,
+    'findomain': 600,
+    'assetfinder': 600,
+    'sublist3r': 900,
+    'dnsx': 3600,
+    'httpx': 3600,
+    'gau': 120,
+    'gospider': 600,
+    'enrich': 3600,
+    'gowitness': 600,
+}
+
+# ru_maxrss is in kilobytes on Linux and in bytes on macOS
+RSS_UNIT_KB = 1024 if sys.platform == 'darwin' else 1
+
+# Seconds between VmHWM samples of a running tool
+RSS_SAMPLE_INTERVAL = 0.5
+
+
+def proc_peak_rss_kb(pid):
+    """VmHWM of a running process in kilobytes, or None (no /proc, or the process has exited)"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+class ToolCancelled(Exception):
+    """The scan was cancelled before or while the tool ran"""
+
+
+class ToolRunner:
+    """Start, time out, cancel and account for the external tools of one scan"""
+
+    def __init__(self, cwd, timeouts=None, logger=None):
+        """
+        Args:
+            cwd: Working directory of every tool (the scan directory)
+            timeouts: {tool: seconds} overriding DEFAULT_TOOL_TIMEOUTS (0 = no timeout)
+            logger: Logger for command lines and failures
+        """
+        self.cwd = cwd
+        self.timeouts = dict(DEFAULT_TOOL_TIMEOUTS, **(timeouts or {}))
+        self.logger = logger
+        self.metrics = {}
+        self._running = set()
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """Kill every running tool; tools started afterwards raise ToolCancelled"""
+        self._cancelled.set()
+        with self._lock:
+            running = list(self._running)
+        for proc in running:
+            self._kill(proc)
+        return len(running)
+
+    @staticmethod
+    def _kill(proc):
+        with contextlib.suppress(ProcessLookupError, PermissionError):
+            os.killpg(proc.pid, signal.SIGKILL)
+
+    @contextlib.contextmanager
+    def process(self, tool, argv, timeout=None, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE, env=None):
+        """Start argv as tool and yield its Popen; the tool is reaped and accounted on exit
+
+        The body must consume the pipes it asked for. The tool is killed if the
+        body raises, after timeout seconds (default: the tool's timeout) or when
+        the scan is cancelled; subprocess.TimeoutExpired or ToolCancelled is then
+        raised once the body has finished.
+        """
+        if self.cancelled:
+            raise ToolCancelled(tool)
+        timeout = self.timeouts.get(tool) if timeout is None else timeout
+        if self.logger:
+            self.logger.debug(f"Running {tool}: {subprocess.list2cmdline(argv)[:200]}")
+
+        started_at = time.monotonic()
+        baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // RSS_UNIT_KB
+        proc = subprocess.Popen(
+            argv,
+            stdin=stdin,
+            stdout=stdout,
+            stderr=stderr,
+            text=True,
+            errors='ignore',
+            cwd=self.cwd,
+            env=env,
+            start_new_session=True
+        )
+        with self._lock:
+            self._running.add(proc)
+
+        timed_out = threading.Event()
+
+        def on_timeout():
+            timed_out.set()
+            self._kill(proc)
+
+        timer = threading.Timer(timeout, on_timeout) if timeout else None
+        if timer:
+            timer.daemon = True
+            timer.start()
+
+        # Popen returns after the exec, so /proc already shows the tool's own memory
+        sampled_kb = [0]
+        exited = threading.Event()
+
+        def sample_rss():
+            while True:
+                peak = proc_peak_rss_kb(proc.pid)
+                if peak:
+                    sampled_kb[0] = max(sampled_kb[0], peak)
+                if exited.wait(RSS_SAMPLE_INTERVAL):
+                    return
+
+        sampler = threading.Thread(target=sample_rss, daemon=True)
+        sampler.start()
+        try:
+            yield proc
+        except BaseException:
+            self._kill(proc)
+            raise
+        finally:
+            if timer:
+                timer.cancel()
+            for pipe in (proc.stdin, proc.stdout, proc.stderr):
+                if pipe:
+                    with contextlib.suppress(OSError):
+                        pipe.close()
+            # The pid stays ours until it is reaped, so stop sampling first
+            exited.set()
+            sampler.join()
+            rusage = self._reap(proc)
+            with self._lock:
+                self._running.discard(proc)
+            max_rss_kb = None
+            if rusage is not None:
+                max_rss_kb = rusage.ru_maxrss // RSS_UNIT_KB
+                if max_rss_kb <= baseline_kb and sampled_kb[0]:
+                    max_rss_kb = sampled_kb[0]
+            self._record(tool, time.monotonic() - started_at, rusage, max_rss_kb, proc.returncode,
+                         timed_out.is_set(), self.cancelled)
+
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(argv, timeout)
+        if self.cancelled:
+            raise ToolCancelled(tool)
+
+    def run(self, tool, argv, input_file=None, input=None, output_file=None, on_line=None,
+            timeout=None, env=None, stderr_limit=500):
+        """Run argv as tool to completion
+
+        Args:
+            tool: Name the run is accounted under
+            argv: Program and arguments
+            input_file: File fed to the tool's stdin
+            input: Text written to the tool's stdin
+            output_file: File the tool's stdout is written to (os.devnull to drop it)
+            on_line: Called with each non-empty stdout line as it arrives; output is not kept
+            timeout: Seconds before the tool is killed (default: the tool's timeout)
+            env: Environment of the tool
+            stderr_limit: Characters of stderr kept
+
+        Returns:
+            subprocess.CompletedProcess with the captured stdout (None when it went
+            to output_file or on_line) and the first stderr_limit characters of stderr
+        """
+        with contextlib.ExitStack() as files:
+            if input_file:
+                stdin = files.enter_context(open(input_file, 'rb'))
+            else:
+                stdin = subprocess.PIPE if input is not None else subprocess.DEVNULL
+            stdout = files.enter_context(open(output_file, 'w')) if output_file else subprocess.PIPE
+
+            with self.process(tool, argv, timeout, stdin=stdin, stdout=stdout, env=env) as proc:
+                stderr_head = []
+
+                def drain_stderr():
+                    kept = 0
+                    for chunk in proc.stderr:
+                        if kept < stderr_limit:
+                            stderr_head.append(chunk[:stderr_limit - kept])
+                            kept += len(stderr_head[-1])
+
+                def feed_input():
+                    with contextlib.suppress(BrokenPipeError, OSError):
+                        proc.stdin.write(input)
+                        proc.stdin.close()
+
+                helpers = [threading.Thread(target=drain_stderr, daemon=True)]
+                if input is not None:
+                    helpers.append(threading.Thread(target=feed_input, daemon=True))
+                for helper in helpers:
+                    helper.start()
+
+                captured = None
+                if proc.stdout is not None:
+                    if on_line:
+                        for line in proc.stdout:
+                            line = line.strip()
+                            if line:
+                                on_line(line)
+                    else:
+                        captured = proc.stdout.read()
+                for helper in helpers:
+                    helper.join()
+
+        return subprocess.CompletedProcess(argv, proc.returncode, captured, ''.join(stderr_head))
+
+    @staticmethod
+    def _reap(proc):
+        """Wait for proc with os.wait4; returns its rusage (None if it was already reaped)"""
+        while True:
+            try:
+                _, status, rusage = os.wait4(proc.pid, 0)
+            except InterruptedError:
+                continue
+            except ChildProcessError:
+                proc.wait()
+                return None
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            return rusage
+
+    def _record(self, tool, wall_seconds, rusage, max_rss_kb, returncode, timed_out, cancelled):
+        with self._lock:
+            totals = self.metrics.setdefault(tool, {
+                'runs': 0, 'wall_seconds': 0.0, 'user_cpu_seconds': 0.0, 'sys_cpu_seconds': 0.0,
+                'max_rss_kb': 0, 'failures': 0, 'timeouts': 0, 'cancelled': 0, 'last_returncode': None,
+            })
+            totals['runs'] += 1
+            totals['wall_seconds'] = round(totals['wall_seconds'] + wall_seconds, 3)
+            if rusage is not None:
+                totals['user_cpu_seconds'] = round(totals['user_cpu_seconds'] + rusage.ru_utime, 3)
+                totals['sys_cpu_seconds'] = round(totals['sys_cpu_seconds'] + rusage.ru_stime, 3)
+                totals['max_rss_kb'] = max(totals['max_rss_kb'], max_rss_kb)
+            if returncode:
+                totals['failures'] += 1
+            totals['timeouts'] += int(timed_out)
+            totals['cancelled'] += int(cancelled)
+            totals['last_returncode'] = returncode
+
+    def get_metrics(self):
+        """Copy of the per-tool totals"""
+        with self._lock:
+            return {tool: dict(totals) for tool, totals in self.metrics.items()}